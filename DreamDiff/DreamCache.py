@@ -0,0 +1,87 @@
+from collections import OrderedDict, namedtuple
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    '''
+    Bounded least-recently-used cache that keeps hit, miss, and eviction
+    counts. Used by DreamDiff to keep compiled string functions for the
+    lifetime of the process.
+
+    EXAMPLES
+    ========
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.put('a', 1)
+    >>> cache.get('a')
+    1
+    >>> cache.get('b') is None
+    True
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, evictions=0, maxsize=2, currsize=1)
+    '''
+
+    def __init__(self, maxsize=128):
+        '''
+        Constructs an empty LRUCache holding at most 'maxsize' entries.
+        '''
+        if maxsize < 1:
+            raise AssertionError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        '''
+        Returns the number of cached entries.
+        '''
+        return len(self._entries)
+
+    def __contains__(self, key):
+        '''
+        Returns True if 'key' is cached, without counting a hit or miss.
+        '''
+        return key in self._entries
+
+    def get(self, key):
+        '''
+        Returns the value cached for 'key' and marks it as most recently
+        used, or None if 'key' is not cached.
+        '''
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key, value):
+        '''
+        Caches 'value' for 'key', evicting the least recently used entries
+        if the cache is full.
+        '''
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def info(self):
+        '''
+        Returns a CacheInfo named tuple with the cache statistics.
+        '''
+        return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._entries))
+
+    def clear(self):
+        '''
+        Removes all entries and resets the statistics.
+        '''
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
@@ -0,0 +1,326 @@
+from DreamDiff.DreamDiff import DreamDiff, ElementaryRecorder
+from DreamDiff.DreamSimplify import optimize_graph, _needed_nodes
+import builtins
+import numpy as np
+
+
+# Value and partial derivative code of the elementary functions, in terms
+# of the argument 'a' and the result 'v'
+_ELEMENTARY = {
+    'sin': ('np.sin({a})', 'np.cos({a})'),
+    'cos': ('np.cos({a})', '-np.sin({a})'),
+    'tan': ('np.tan({a})', '1 / (np.cos({a})**2)'),
+    'arcsin': ('np.arcsin({a})', '1 / np.sqrt(1 - {a}**2)'),
+    'arccos': ('np.arccos({a})', '-1 / np.sqrt(1 - {a}**2)'),
+    'arctan': ('np.arctan({a})', '1 / (1 + {a}**2)'),
+    'sinh': ('np.sinh({a})', 'np.cosh({a})'),
+    'cosh': ('np.cosh({a})', 'np.sinh({a})'),
+    'tanh': ('np.tanh({a})', '1 / (np.cosh({a})**2)'),
+    'sqrt': ('np.sqrt({a})', '0.5 / {v}'),
+    'exp': ('np.exp({a})', '{v}'),
+    'log': ('np.log({a})', '1 / {a}'),
+    'log2': ('np.log2({a})', '1 / ({a}*_LN2)'),
+    'log10': ('np.log10({a})', '1 / ({a}*_LN10)'),
+    'logistic': ('1 / (1 + np.exp(-{a}))', '{v}*(1 - {v})'),
+    'abs': ('abs({a})', '{a} / abs({a})'),
+    'neg': ('-{a}', '-1'),
+}
+
+# Value code of the binary operations and partial derivative code with
+# respect to each argument
+_BINARY = {
+    'add': ('{a} + {b}', '1', '1'),
+    'sub': ('{a} - {b}', '1', '-1'),
+    'mul': ('{a}*{b}', '{b}', '{a}'),
+    'div': ('{a} / {b}', '1 / {b}', '-{v} / {b}'),
+    'pow': ('{a}**{b}', '{b}*{a}**({b} - 1)', 'np.log(np.abs({a}))*{v}'),
+}
+
+
+class Graph:
+    '''
+    Directed acyclic graph of the operations recorded while tracing a
+    function with Tracer variables. Each node is an (op, args) pair, where
+    args holds the indices of the argument nodes, or the value of a 'const'
+    node or the position of an 'input' node.
+    '''
+
+    def __init__(self):
+        self.nodes = []
+
+    def __len__(self):
+        '''
+        Returns the number of nodes in the graph.
+        '''
+        return len(self.nodes)
+
+    def add(self, op, args):
+        '''
+        Appends a node to the graph and returns a Tracer pointing at it.
+        '''
+        self.nodes.append((op, args))
+        return Tracer(self, len(self.nodes) - 1)
+
+    def constant(self, value):
+        '''
+        Appends a constant node and returns a Tracer pointing at it.
+        '''
+        return self.add('const', value)
+
+
+class Tracer(ElementaryRecorder):
+    '''
+    Variable type that records the operations performed on it in a Graph
+    rather than computing them.
+    '''
+
+    def __init__(self, graph, index):
+        self.graph = graph
+        self.index = index
+
+    @property
+    def val(self):
+        '''
+        Placeholder value, so that DreamDiff([...]) can hold traced outputs.
+        '''
+        return np.array([self], dtype=object)
+
+    @property
+    def der(self):
+        '''
+        Placeholder derivative, so that DreamDiff([...]) can hold traced
+        outputs.
+        '''
+        return np.zeros(0)
+
+    def _operand(self, other):
+        '''
+        Internal method that returns 'other' as a node index of the graph.
+        '''
+        if isinstance(other, Tracer):
+            if other.graph is not self.graph:
+                raise Exception('Tracer variables must belong to the same graph')
+            return other.index
+        return self.graph.constant(other).index
+
+    def _binary(self, op, other):
+        return self.graph.add(op, (self.index, self._operand(other)))
+
+    def _rbinary(self, op, other):
+        return self.graph.add(op, (self._operand(other), self.index))
+
+    def __add__(self, other):
+        return self._binary('add', other)
+
+    def __radd__(self, other):
+        return self._rbinary('add', other)
+
+    def __sub__(self, other):
+        return self._binary('sub', other)
+
+    def __rsub__(self, other):
+        return self._rbinary('sub', other)
+
+    def __mul__(self, other):
+        return self._binary('mul', other)
+
+    def __rmul__(self, other):
+        return self._rbinary('mul', other)
+
+    def __truediv__(self, other):
+        return self._binary('div', other)
+
+    def __rtruediv__(self, other):
+        return self._rbinary('div', other)
+
+    def __pow__(self, other):
+        if not isinstance(other, Tracer) and np.all(np.equal(other, 0)):
+            return self.graph.constant(1.0)
+        return self._binary('pow', other)
+
+    def __rpow__(self, other):
+        return self._rbinary('pow', other)
+
+    def __neg__(self):
+        return self.graph.add('neg', (self.index,))
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self.graph.add('abs', (self.index,))
+
+    def _compare(self, other):
+        raise Exception('Cannot branch on the value of a traced variable')
+
+    __lt__ = __gt__ = __le__ = __ge__ = _compare
+
+    def _elementary(self, name):
+        return self.graph.add(name, (self.index,))
+
+def trace(f, n_inputs):
+    '''
+    Traces 'f' over 'n_inputs' Tracer variables. Returns the Graph and the
+    list of output node indices, and whether 'f' is vector-valued.
+    '''
+    graph = Graph()
+    inputs = [graph.add('input', j) for j in range(n_inputs)]
+    result = f(inputs)
+    vector = isinstance(result, (list, tuple)) or (isinstance(result, DreamDiff) and len(result.val) > 1)
+    if isinstance(result, DreamDiff):
+        result = list(result.val)
+    elif not isinstance(result, (list, tuple)):
+        result = [result]
+    outputs = []
+    for out in result:
+        if isinstance(out, np.ndarray):
+            out = out.ravel()[0]
+        if not isinstance(out, Tracer):
+            out = graph.constant(out)
+        outputs.append(out.index)
+    return graph, outputs, vector
+
+
+def _generate(graph, outputs, n_inputs, vector):
+    '''
+    Generates the source code of a function computing the values and
+    Jacobian of the traced outputs with straight-line statements. Each
+    derivative is kept as one scalar per input it depends on, so that
+    structurally zero entries cost nothing. Value and partial derivative
+    expressions with the same code are computed once and shared.
+    '''
+    # Only the nodes that the outputs depend on are emitted
+    needed = _needed_nodes(graph, outputs)
+
+    constants = {}
+    lines = []
+    ders = {}
+    computed = {}
+    for k in sorted(needed):
+        op, args = graph.nodes[k]
+        v = 'v{}'.format(k)
+        if op == 'input':
+            lines.append('{} = x[{}]'.format(v, args))
+            ders[k] = {args: '1'}
+            continue
+        if op == 'const':
+            constants[v] = args
+            ders[k] = {}
+            continue
+        names = ['v{}'.format(a) for a in args]
+        if op in _BINARY:
+            code, *partials = _BINARY[op]
+            fields = {'a': names[0], 'b': names[1], 'v': v}
+        else:
+            code, partial = _ELEMENTARY[op]
+            partials = [partial]
+            fields = {'a': names[0], 'v': v}
+        code = code.format(**fields)
+        if code in computed:
+            lines.append('{} = {}'.format(v, computed[code]))
+        else:
+            lines.append('{} = {}'.format(v, code))
+            computed[code] = v
+
+        # Partial derivatives with respect to each non-constant argument
+        terms = {}
+        for i, (a, partial) in enumerate(zip(args, partials)):
+            if not ders[a]:
+                continue
+            partial = partial.format(**fields)
+            if partial in computed:
+                partial = computed[partial]
+            elif partial not in ('1', '-1') and len(ders[a]) > 1:
+                lines.append('p{}_{} = {}'.format(k, i, partial))
+                computed[partial] = 'p{}_{}'.format(k, i)
+                partial = computed[partial]
+            for j, d in ders[a].items():
+                if partial == '1':
+                    term = d
+                elif d == '1':
+                    term = '({})'.format(partial)
+                elif partial == '-1':
+                    term = '-' + d
+                else:
+                    term = '({})*{}'.format(partial, d)
+                terms.setdefault(j, []).append(term)
+        ders[k] = {}
+        for j, js in terms.items():
+            if len(js) == 1 and (js[0] == '1' or js[0].startswith('d')):
+                ders[k][j] = js[0]
+                continue
+            name = 'd{}_{}'.format(k, j)
+            lines.append('{} = {}'.format(name, ' + '.join(js)))
+            ders[k][j] = name
+
+    m = len(outputs)
+    header = ['def compiled(x, val=None, jac=None):',
+              '    if val is None:',
+              '        val = np.empty({})'.format(m if vector else 1),
+              '    if jac is None:',
+              '        jac = np.zeros({})'.format((m, n_inputs) if vector else n_inputs),
+              '    else:',
+              '        jac.fill(0.0)',
+              '    x = np.asarray(x, dtype=float)']
+    footer = []
+    for i, k in enumerate(outputs):
+        footer.append('val[{}] = v{}'.format(i, k))
+        for j, d in sorted(ders[k].items()):
+            target = 'jac[{}, {}]'.format(i, j) if vector else 'jac[{}]'.format(j)
+            footer.append('{} = {}'.format(target, '1.0' if d == '1' else d))
+    footer.append('return val, jac')
+    source = '\n'.join(header + ['    ' + line for line in lines + footer]) + '\n'
+    return source, constants
+
+
+def compile(f, n_inputs, optimize=True):
+    '''
+    Compiles a function built from DreamDiff operations and Function
+    elementaries into a single generated Python function. 'f' is traced once
+    into a Graph, and the generated function computes the value(s) and
+    Jacobian with straight-line NumPy statements, avoiding the creation of
+    intermediate DreamDiff objects.
+
+    INPUTS
+    ======
+    f: function, required
+        Function taking a list of 'n_inputs' variables and returning a
+        scalar, a list, or a DreamDiff vector of results, e.g.
+        lambda x: DreamDiff([x[0]*x[1], Function.sin(x[0])]).
+        'f' must not branch on the values of its inputs.
+    n_inputs: int, required
+        The number of input variables.
+    optimize: bool, optional, default is True
+        If True, the traced graph is simplified with optimize_graph before
+        code is generated.
+
+    RETURNS
+    =======
+    A function taking a point 'x' of length 'n_inputs' and returning the
+    tuple (val, jac), matching the val and der of the interpreted DreamDiff
+    result (jac has shape (n_inputs,) for a scalar 'f' and (m, n_inputs)
+    for a vector 'f' with 'm' outputs). Optional 'val' and 'jac' arrays can
+    be passed to be filled in place. The generated code is stored in the
+    function's 'source' attribute, and the number of graph nodes removed by
+    the optimizer in its 'eliminated' attribute.
+
+    EXAMPLES
+    ========
+    >>> from DreamDiff.DreamDiff import Function
+    >>> g = compile(lambda x: x[0]*Function.exp(x[1]), 2)
+    >>> g([2.0, 0.0])
+    (array([2.]), array([1., 2.]))
+    '''
+    graph, outputs, vector = trace(f, n_inputs)
+    eliminated = 0
+    if optimize:
+        graph, outputs, eliminated = optimize_graph(graph, outputs)
+    source, constants = _generate(graph, outputs, n_inputs, vector)
+    namespace = {'np': np, '_LN2': np.log(2), '_LN10': np.log(10)}
+    namespace.update(constants)
+    exec(builtins.compile(source, '<DreamDiff compiled>', 'exec'), namespace)
+    compiled = namespace['compiled']
+    compiled.source = source
+    compiled.graph = graph
+    compiled.eliminated = eliminated
+    return compiled
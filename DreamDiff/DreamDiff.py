@@ -1,7 +1,95 @@
+import re
 import numpy as np
+from DreamDiff.DreamCache import LRUCache
+from DreamDiff.DreamSimplify import optimize_expression
+from DreamDiff.DreamSparse import SparseDer
+
+
+# Compiled string functions, keyed by the input string
+_PARSE_CACHE = LRUCache(maxsize=128)
+
+
+def _as_der(der):
+    '''
+    Helper that stores a derivative as a SparseDer or a dense np.ndarray.
+    '''
+    if isinstance(der, SparseDer):
+        return der
+    return np.array(der)
+
+
+def _der_of(v):
+    '''
+    Helper that returns the stored derivative of a variable without
+    densifying it, if it is a DreamDiff object.
+    '''
+    if isinstance(v, DreamDiff):
+        return v._der
+    return v.der
+
+
+def _chain(partial, der):
+    '''
+    Helper that multiplies derivative(s) 'der' by the partial derivative(s)
+    of an operation. When 'der' is a 2-D Jacobian (e.g. a batch of points),
+    each partial scales its own row.
+    '''
+    if np.ndim(der) == 2 and np.ndim(partial) == 1:
+        return partial[:, None]*der
+    return partial*der
+
+
+def _new(val, der):
+    '''
+    Helper that creates a DreamDiff object directly from a value np.ndarray
+    and a derivative (np.ndarray or SparseDer), adopting both without
+    copying or validation. Used for the results of operations, which are
+    already arrays.
+    '''
+    result = object.__new__(DreamDiff)
+    result._val = val
+    result._der = der
+    return result
+
+
+def _spread(x, other):
+    '''
+    Helper that returns the derivative of DreamDiff object 'x' ready to be
+    combined with 'other'. When 'x' is a scalar function of several
+    variables, with a gradient of shape (n,), and 'other' is a vector of m
+    elements, the gradient is repeated into an (m, n) Jacobian so that it
+    broadcasts like the values.
+    '''
+    der = x._der
+    if der.ndim != 1 or len(x._val) != 1 or isinstance(other, (int, float)):
+        return der
+    m = len(other._val) if isinstance(other, DreamDiff) else np.size(other)
+    if m == 1 or (der.shape[0] == 1 and not isinstance(other, DreamDiff)):
+        return der
+    row = SparseDer((1,) + der.shape, der.index, der.data) if isinstance(der, SparseDer) else der[None, :]
+    return _chain(np.ones(m), row)
+
+
+def _align(a, b):
+    '''
+    Helper that returns the derivatives of DreamDiff objects 'a' and 'b'
+    ready to be combined, spreading a gradient over the rows of the other
+    operand's Jacobian when one is a scalar function and the other a vector.
+    '''
+    da = a._der
+    db = b._der
+    if da.ndim == db.ndim:
+        return da, db
+    return _spread(a, b), _spread(b, a)
 
 
 class DreamDiff():
+
+    __slots__ = ('_val', '_der')
+
+    # Make numpy defer to the reflected operators, e.g. for np.ndarray @
+    # DreamDiff, instead of treating DreamDiff objects as sequences
+    __array_ufunc__ = None
     
     def __init__(self, val, der=[1], input_pos=None):
         '''
@@ -66,7 +154,7 @@ class DreamDiff():
          [0. 0. 0. 1. 0.]
          [0. 0. 0. 0. 1.]]
         '''
-        if input_pos != None:
+        if input_pos is not None:
             if not isinstance(input_pos, (list, np.ndarray)):
                 raise AssertionError('input_pos must be a list or np.ndarray')
             if len(input_pos) != 2:
@@ -74,22 +162,26 @@ class DreamDiff():
             if input_pos[0] <= input_pos[1]:
                 raise AssertionError('variable index must not exceed total number of variables')
             else:
-                der = np.zeros((input_pos[0]))
-                der[input_pos[1]] = 1
+                # Only the seeded entry is stored, the rest are implicit zeros
+                der = SparseDer((input_pos[0],), [input_pos[1]], [1.0])
         if isinstance(val, (int, float)):
             val = [val]
-        if len(val) == 1:
+        if isinstance(val, np.ndarray) and val.dtype != object:
+            # Numeric arrays (e.g. batches of points) need no per-element checks
+            self._val = np.array(val, ndmin=1)
+            self._der = _as_der(der)
+        elif len(val) == 1:
             try:
                 self._val = val[0].val
-                self._der = val[0].der
+                self._der = _der_of(val[0])
             except:
                 self._val = np.array(val)
-                self._der = np.array(der)
+                self._der = _as_der(der)
         else:
             all_scalar = self._check_all_scalar(val)
             if all_scalar:
                 self._val = np.array(val)
-                self._der = np.array(der)
+                self._der = _as_der(der)
             else:
                 vals = []
                 ders = []
@@ -97,12 +189,16 @@ class DreamDiff():
                 for v in val:
                     try:
                         vals.append(v.val)
-                        ders.append(v.der)
+                        ders.append(_der_of(v))
                     except:
                         vals.append(v)
-                        ders.append(np.zeros(total_vars))
+                        ders.append(None)
                 self._val = np.array(vals)
-                self._der = np.array(ders)
+                if any(isinstance(d, SparseDer) for d in ders):
+                    # Constants are left as implicit zero rows
+                    self._der = SparseDer.vstack(ders, total_vars)
+                else:
+                    self._der = np.array([np.zeros(total_vars) if d is None else d for d in ders])
             
     def _check_all_scalar(self, val):
         '''
@@ -111,7 +207,7 @@ class DreamDiff():
         '''
         scalar_list = []
         for v in val:
-            if isinstance(v, DreamDiff):
+            if hasattr(v, 'der'):
                 scalar_list.append(v)
         return len(scalar_list) == 0
 
@@ -122,11 +218,8 @@ class DreamDiff():
         '''
         num_vars = []
         for v in val:
-            if isinstance(v, DreamDiff):
-                try:
-                    num_vars.append(len(v.der[0]))
-                except:
-                    num_vars.append(len(v.der))
+            if hasattr(v, 'der'):
+                num_vars.append(np.shape(_der_of(v))[-1])
             else:
                 num_vars.append(0)
         return np.max(num_vars)
@@ -141,8 +234,11 @@ class DreamDiff():
     @property
     def der(self):
         '''
-        Returns the derivative(s) (Jacobian) of the DreamDiff object.
+        Returns the derivative(s) (Jacobian) of the DreamDiff object. Sparse
+        derivatives are converted to a dense np.ndarray.
         '''
+        if isinstance(self._der, SparseDer):
+            return self._der.toarray()
         return self._der
 
     def __add__(self, other):
@@ -150,9 +246,10 @@ class DreamDiff():
         Performs addition of self and other.
         '''
         try:
-            return DreamDiff(self.val + other.val, self.der + other.der)
+            sd, od = _align(self, other)
+            return _new(self.val + other.val, sd + od)
         except AttributeError:
-            return DreamDiff(self.val + other, self.der)
+            return _new(self.val + other, _spread(self, other))
 
     def __radd__(self, other):
         '''
@@ -165,18 +262,20 @@ class DreamDiff():
         Performs subtraction of other from self.
         '''
         try:
-            return DreamDiff(self.val - other.val, self.der - other.der)
+            sd, od = _align(self, other)
+            return _new(self.val - other.val, sd - od)
         except AttributeError:
-            return DreamDiff(self.val - other, self.der)
+            return _new(self.val - other, _spread(self, other))
 
     def __rsub__(self, other):
         '''
         Performs subtraction of self from other.
         '''
         try:
-            return DreamDiff(other.val - self.val, other.der - self.der)
+            sd, od = _align(self, other)
+            return _new(other.val - self.val, od - sd)
         except AttributeError:
-            return DreamDiff(other - self.val, -self.der)
+            return _new(other - self.val, -_spread(self, other))
 
     def __mul__(self, other):
         '''
@@ -184,9 +283,10 @@ class DreamDiff():
         '''
         try:
             # Use the product rule to calculate derivative
-            return DreamDiff(self.val*other.val, self.val*other.der + other.val*self.der)
+            sd, od = _align(self, other)
+            return _new(self.val*other.val, _chain(self.val, od) + _chain(other.val, sd))
         except AttributeError:
-            return DreamDiff(self.val*other, self.der*other)
+            return _new(self.val*other, _chain(other, _spread(self, other)))
 
     def __rmul__(self, other):
         '''
@@ -198,11 +298,20 @@ class DreamDiff():
         '''
         Performs division of self by other.
         '''
+        if isinstance(other, (int, float)):
+            # Fast path for a scalar constant, which scales every derivative
+            return _new(self._val / other, self._der / other)
         try:
             # Use the quotient rule to calculate derivative
-            return DreamDiff(self.val / other.val, (self.der*other.val - self.val*other.der) / other.val**2)
+            sd, od = self._der, other._der
+            if sd.ndim == 1 and od.ndim == 1:
+                # Fast path for unbatched derivatives, which need no broadcasting
+                return _new(self._val / other._val, (other._val*sd - self._val*od) / other._val**2)
+            sd, od = _align(self, other)
+            val = self._val / other._val
+            return _new(val, _chain(1 / other._val, sd) - _chain(val / other._val, od))
         except AttributeError:
-            return DreamDiff(self.val / other, self.der / other)
+            return _new(self.val / other, _chain(np.divide(1, other), _spread(self, other)))
 
     def __rtruediv__(self, other):
         '''
@@ -210,21 +319,38 @@ class DreamDiff():
         '''
         try:
             # Use the quotient rule to calculate derivative
-            return DreamDiff(other.val / self.val, (other.der*self.val - other.val*self.der) / self.val**2)
+            sd, od = _align(self, other)
+            return _new(other.val / self.val, _chain(1 / self.val**2, _chain(self.val, od) - _chain(other.val, sd)))
         except AttributeError:
-            return DreamDiff(other / self.val, -other*self.der / self.val**2)
+            return _new(other / self.val, _chain(-other / self.val**2, _spread(self, other)))
         
     def __pow__(self, other):
         '''
         Raises self to the power of other.
         '''
+        if isinstance(other, (int, float)):
+            # Fast path for a scalar constant power
+            if other == 0:
+                return self._zero_power()
+            return _new(self._val**other, _chain(other*self._val**(other-1), self._der))
         try:
             # Use the chain rule to calculate derivative
-            return DreamDiff(self.val**other.val, other.val*(self.val**(other.val-1))*self.der + np.log(np.abs(self.val))*(self.val**other.val)*other.der)
+            sd, od = _align(self, other)
+            val = self.val**other.val
+            return _new(val, _chain(other.val*(self.val**(other.val-1)), sd) + _chain(np.log(np.abs(self.val))*val, od))
         except AttributeError:
-            if other == 0:
-                return DreamDiff(1, der=[0])
-            return DreamDiff(self.val**other, other*(self.val**(other-1))*self.der)
+            if np.all(np.equal(other, 0)):
+                return self._zero_power()
+            return _new(self.val**other, _chain(other*(self.val**(other-1)), _spread(self, other)))
+
+    def _zero_power(self):
+        '''
+        Helper that returns self raised to the power of zero, a constant one
+        with a zero derivative of the same shape and storage.
+        '''
+        if isinstance(self._der, SparseDer):
+            return _new(np.ones_like(self._val), SparseDer(self._der.shape, [], []))
+        return _new(np.ones_like(self._val), np.zeros_like(self._der))
 
     def __rpow__(self, other):
         '''
@@ -232,15 +358,16 @@ class DreamDiff():
         '''
         try:
             # Use the chain rule to calculate derivative
-            return DreamDiff(other.val**self.val, other.val*(self.val**(other.val-1))*self.der + np.log(np.abs(self.val))*(self.val**other.val)*other.der)
+            return _new(other.val**self.val, other.val*(self.val**(other.val-1))*self._der + np.log(np.abs(self.val))*(self.val**other.val)*other._der)
         except AttributeError:
-            return DreamDiff(other**self.val, np.log(other)*(other**self.val)*self.der)
+            val = other**self.val
+            return _new(val, _chain(np.log(other)*val, _spread(self, other)))
 
     def __neg__(self):
         '''
         Negates the function value(s) and derivative(s).
         '''
-        return DreamDiff(-1*self.val, -1*self.der)
+        return _new(-1*self.val, -1*self._der)
 
     def __pos__(self):
         '''
@@ -252,7 +379,7 @@ class DreamDiff():
         '''
         Applies the absolute value to the function(s).
         '''
-        return DreamDiff(abs(self.val), (self.val*self.der / abs(self.val)))
+        return _new(abs(self.val), _chain(self.val / abs(self.val), self._der))
 
     def __eq__(self, other):
         '''
@@ -305,31 +432,167 @@ class DreamDiff():
         '''
         return self.__gt__(other) or self.__eq__(other)
 
+    @staticmethod
+    def variables(values, sparse=False):
+        '''
+        Creates a vector of 'n' input variables as a single DreamDiff object,
+        seeded with the n by n identity in one allocation. Elements are
+        accessed by indexing, and whole-vector operations (elementwise
+        arithmetic, Function elementaries, sum, dot, and @) propagate the
+        full Jacobian.
+
+        INPUTS
+        ======
+        values: list or np.ndarray, required
+            Values of the 'n' input variables.
+        sparse: bool, optional, default is False
+            If True, the identity seed is stored as a SparseDer, which keeps
+            elementwise models over many variables proportional to 'n'.
+
+        RETURNS
+        =======
+        A DreamDiff object with value of shape (n,) and Jacobian of shape
+        (n, n).
+
+        EXAMPLES
+        ========
+        >>> x = DreamDiff.variables([1.0, 2.0, 3.0])
+        >>> f = (x*x).sum() + x[0]*x[2]
+        >>> print(f)
+        Values:
+        [17.]
+        Jacobian:
+        [5. 4. 7.]
+        '''
+        val = np.array(values, dtype=float, ndmin=1)
+        n = len(val)
+        if sparse:
+            return _new(val, SparseDer((n, n), np.arange(n)*(n + 1), np.ones(n)))
+        return _new(val, np.eye(n))
+
+    def __len__(self):
+        '''
+        Returns the number of function values.
+        '''
+        return len(self._val)
+
+    def __getitem__(self, key):
+        '''
+        Returns the function(s) selected by 'key' (an int, slice, or index
+        array) with the matching rows of the Jacobian.
+        '''
+        val = np.array(self._val[key], ndmin=1)
+        der = self._der
+        if der.ndim == 2:
+            der = der[key]
+        elif len(der) == len(self._val) > 1:
+            # Derivatives of a single variable at each of several points
+            der = np.array(der[key], ndmin=1)
+        return _new(val, der)
+
+    def sum(self):
+        '''
+        Returns the sum of the function values, with its gradient.
+        '''
+        der = self._der
+        if der.ndim == 2:
+            der = der.sum(axis=0)
+        elif len(self._val) > 1:
+            der = np.array([np.broadcast_to(der, self._val.shape).sum()])
+        return _new(np.array([self._val.sum()]), der)
+
+    def dot(self, other):
+        '''
+        Returns the dot product of self with a DreamDiff object or a constant
+        vector 'other'.
+        '''
+        return (self*other).sum()
+
+    def _jacobian(self):
+        '''
+        Internal method that returns the derivative as a 2-D Jacobian with one
+        row per function value.
+        '''
+        der = self._der
+        if der.ndim == 2:
+            return der
+        if len(self._val) == 1 and isinstance(der, SparseDer):
+            return SparseDer((1,) + der.shape, der.index, der.data)
+        if len(self._val) == 1:
+            return der.reshape(1, -1)
+        # Derivatives of a single variable at each of several points
+        return np.broadcast_to(der, self._val.shape)[:, None]
+
+    def __matmul__(self, other):
+        '''
+        Performs the matrix product of the vector self with a constant matrix,
+        or the dot product with a vector.
+        '''
+        if isinstance(other, DreamDiff) or np.ndim(other) == 1:
+            return self.dot(other)
+        other = np.asarray(other, dtype=float)
+        return _new(self.val @ other, other.T @ self._jacobian())
+
+    def __rmatmul__(self, other):
+        '''
+        Performs the matrix product of a constant matrix with the vector self,
+        or the dot product with a vector.
+        '''
+        if np.ndim(other) == 1:
+            return self.dot(other)
+        other = np.asarray(other, dtype=float)
+        return _new(other @ self.val, other @ self._jacobian())
+
     def _parse_input(self, input_function):
         '''
         Internal method that takes in an input function in string format, 
         e.g. 'x^2 + sin(x) + cos(log(x))'
         Returns a lambda expression with functions replaced by their Function.
-        '''
-        func_list = ['exp(', 'cos(', 'sin(', 'tan(', 'log(', 'arcsin(', 'arccos(', 
-                'arctan(', 'sinh(', 'cosh(', 'tanh(', 'sqrt(', 'log2(', 'log10(', 'logistic('] 
-        expression = ''
-        for i in range(len(input_function)):
-            for j in range(5):
-                try:
-                    if input_function[i:i+j+4] in func_list:
-                        expression +='Function.'
-                        if input_function[i+3] != '(':
-                            input_function[i+3] = '0' # nullifies to make prefix free
-                except IndexError:
-                    pass
-            if input_function[i] == '^':
-                expression += '**'
-            else:
-                expression += input_function[i]
-        function = lambda x: eval(expression)
+        Its 'values' attribute evaluates the same expression for values only,
+        with the elementary functions bound to NumPy ufuncs, so that a whole
+        grid of points is evaluated in one vectorized call.
+        The expression is compiled once and cached by its string, so later
+        calls with the same string skip parsing and compilation. Repeated
+        subexpressions are computed once and constant arithmetic is folded;
+        the number of operations saved is stored in the function's
+        'eliminated' attribute.
+        '''
+        function = _PARSE_CACHE.get(input_function)
+        if function is None:
+            func_list = ['exp', 'cos', 'sin', 'tan', 'log', 'arcsin', 'arccos', 
+                    'arctan', 'sinh', 'cosh', 'tanh', 'sqrt', 'log2', 'log10', 'logistic'] 
+            # Prefix each elementary function with 'Function.', skipping names
+            # that are part of a longer name, e.g. 'sin(' within 'arcsin('
+            expression = re.sub(r'(?<![\w.])(' + '|'.join(func_list) + r')\(', r'Function.\1(', input_function)
+            expression = expression.replace('^', '**')
+            source, eliminated = optimize_expression(expression)
+            namespace = {}
+            exec(source, globals(), namespace)
+            function = namespace['function']
+            # The same code with Function bound to plain NumPy ufuncs
+            exec(source, {'Function': ValueFunction}, namespace)
+            function.values = namespace['function']
+            function.expression = expression
+            function.eliminated = eliminated
+            _PARSE_CACHE.put(input_function, function)
         return function
 
+    @staticmethod
+    def parse_cache_info():
+        '''
+        Returns the hits, misses, evictions, maximum size, and current size
+        of the cache of compiled string functions used by _parse_input.
+        '''
+        return _PARSE_CACHE.info()
+
+    @staticmethod
+    def parse_cache_clear():
+        '''
+        Empties the cache of compiled string functions and resets its
+        statistics.
+        '''
+        _PARSE_CACHE.clear()
+
     def _evaluate_function(self, function, a):
         '''
         Internal method to evaluate a lambda function at a given point 'a'.
@@ -340,6 +603,55 @@ class DreamDiff():
         new_vals = function(ad_object)
         return new_vals
 
+    def _evaluate_batch(self, function, points):
+        '''
+        Internal method to evaluate a lambda function at N points in a single
+        pass. Returns an DreamDiff object whose value has shape (N,) and whose
+        derivative has shape (N, nvars).
+        '''
+        return function(DreamDiff.batch(points))
+
+    @staticmethod
+    def batch(points):
+        '''
+        Creates batched DreamDiff inputs, so that a function can be evaluated
+        at N points at once with every operation broadcasting over the batch.
+
+        INPUTS
+        ======
+        points: list or np.ndarray, required
+            Points at which to evaluate, of shape (N,) for a function of one
+            variable or (N, nvars) for a function of 'nvars' variables.
+
+        RETURNS
+        =======
+        A single DreamDiff object if 'points' is 1-D, otherwise a list of
+        'nvars' DreamDiff objects. Each has value of shape (N,) and derivative
+        of shape (N, nvars) seeded with the variable's column of the identity.
+
+        EXAMPLES
+        ========
+        >>> x = DreamDiff.batch([0.0, 1.0, 2.0])
+        >>> f = x**2
+        >>> print(f)
+        Values:
+        [0. 1. 4.]
+        Jacobian:
+        [[0.]
+         [2.]
+         [4.]]
+        '''
+        points = np.array(points, dtype=float)
+        if points.ndim == 1:
+            return DreamDiff(points, np.ones((len(points), 1)))
+        n_points, nvars = points.shape
+        variables = []
+        for j in range(nvars):
+            seed = np.zeros((n_points, nvars))
+            seed[:, j] = 1
+            variables.append(DreamDiff(points[:, j], seed))
+        return variables
+
     def __str__(self):
         '''
         Returns a string representation of the function value(s) and 
@@ -348,6 +660,24 @@ class DreamDiff():
         return 'Values:\n{}\nJacobian:\n{}'.format(self.val, self.der)
     
 
+def _elementary(rule):
+    '''
+    Decorator for the methods of Function. DreamDiff inputs are handled by
+    the decorated rule, while any other variable type (e.g. DreamReverse)
+    is expected to provide a method of the same name, which is called instead.
+    '''
+    name = rule.__name__
+
+    def dispatch(x):
+        if isinstance(x, DreamDiff):
+            return rule(x)
+        return getattr(x, name)()
+
+    dispatch.__name__ = name
+    dispatch.__doc__ = rule.__doc__
+    return dispatch
+
+
 class Function: 
     '''
     Class to hold elementary functions for DreamDiff objects, including
@@ -355,96 +685,176 @@ class Function:
     logarithm, and square root functions.
     '''
 
+    @_elementary
     def sin(x):
         '''
         Returns the sine of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.sin(x.val), np.cos(x.val)*x.der)
+        return _new(np.sin(x.val), _chain(np.cos(x.val), x._der))
 
+    @_elementary
     def cos(x):
         '''
         Returns the cosine of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.cos(x.val), -np.sin(x.val)*x.der)
+        return _new(np.cos(x.val), _chain(-np.sin(x.val), x._der))
 
+    @_elementary
     def tan(x):
         '''
         Returns the tangent of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.tan(x.val), (1 / (np.cos(x.val)**2))*x.der)
+        return _new(np.tan(x.val), _chain(1 / (np.cos(x.val)**2), x._der))
 
+    @_elementary
     def arcsin(x):
         '''
         Returns the arcsine of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.arcsin(x.val), (1 / np.sqrt(1 - (x.val**2))*x.der))
+        return _new(np.arcsin(x.val), _chain(1 / np.sqrt(1 - (x.val**2)), x._der))
 
+    @_elementary
     def arccos(x):
         '''
         Returns the arccosine of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.arccos(x.val), (-1 / np.sqrt(1 - (x.val**2))*x.der))
+        return _new(np.arccos(x.val), _chain(-1 / np.sqrt(1 - (x.val**2)), x._der))
     
+    @_elementary
     def arctan(x):
         '''
         Returns the arctangent of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.arctan(x.val), (1 / (1 + x.val**2))*x.der)
+        return _new(np.arctan(x.val), _chain(1 / (1 + x.val**2), x._der))
 
+    @_elementary
     def sinh(x):
         '''
         Returns the sinh of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.sinh(x.val), (np.cosh(x.val))*x.der)
+        return _new(np.sinh(x.val), _chain(np.cosh(x.val), x._der))
 
+    @_elementary
     def cosh(x):
         '''
         Returns the cosh of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.cosh(x.val), (np.sinh(x.val))*x.der)
+        return _new(np.cosh(x.val), _chain(np.sinh(x.val), x._der))
 
+    @_elementary
     def tanh(x):
         '''
         Returns the tanh of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.tanh(x.val), (1 / (np.cosh(x.val)**2))*x.der)
+        return _new(np.tanh(x.val), _chain(1 / (np.cosh(x.val)**2), x._der))
 
+    @_elementary
     def sqrt(x):
         '''
         Returns the square root of an DreamDiff object with its updated derivative.
         '''
-        return DreamDiff(np.sqrt(x.val), 0.5*(x.val**(-0.5))*x.der)
+        val = np.sqrt(x.val)
+        return _new(val, _chain(0.5 / val, x._der))
 
+    @_elementary
     def exp(x):
         '''
         Returns the exponential of an DreamDiff object and its updated derivative.
         '''
-        return DreamDiff(np.exp(x.val), np.exp(x.val)*x.der)
+        val = np.exp(x.val)
+        return _new(val, _chain(val, x._der))
 
+    @_elementary
     def log(x):
         '''
         Returns the log (base e) of an DreamDiff object and its updated derivative.
         '''
-        return DreamDiff(np.log(x.val), (1 / (x.val))*x.der)
+        return _new(np.log(x.val), _chain(1 / x.val, x._der))
 
+    @_elementary
     def log2(x):
         '''
         Returns the log (base 2) of an DreamDiff object and its updated derivative.
         '''
-        return DreamDiff(np.log2(x.val), (1 / (x.val*np.log(2)))*x.der)
+        return _new(np.log2(x.val), _chain(1 / (x.val*np.log(2)), x._der))
     
+    @_elementary
     def log10(x):
         '''
         Returns the log (base 10) of an DreamDiff object and its updated derivative.
         '''
-        return DreamDiff(np.log10(x.val), (1 / (x.val*np.log(10)))*x.der)
+        return _new(np.log10(x.val), _chain(1 / (x.val*np.log(10)), x._der))
 
+    @_elementary
     def logistic(x):
         '''
         Applies the logistic function to an DreamDiff object and returns its
         updated derivative.
         '''
-        return DreamDiff(1 / (1 + np.exp(-x.val)), (np.exp(x.val) / (1 + np.exp(x.val))**2)*x.der)
+        val = 1 / (1 + np.exp(-x.val))
+        return _new(val, _chain(val*(1 - val), x._der))
+
+
+
+class ValueFunction:
+    '''
+    Value-only counterparts of the elementary functions of Function, as
+    NumPy ufuncs. Used by the 'values' variant of parsed string functions,
+    which evaluates plain numbers or arrays without derivatives.
+    '''
+    sin = np.sin
+    cos = np.cos
+    tan = np.tan
+    arcsin = np.arcsin
+    arccos = np.arccos
+    arctan = np.arctan
+    sinh = np.sinh
+    cosh = np.cosh
+    tanh = np.tanh
+    sqrt = np.sqrt
+    exp = np.exp
+    log = np.log
+    log2 = np.log2
+    log10 = np.log10
+
+    @staticmethod
+    def logistic(x):
+        '''
+        Returns the logistic function of x.
+        '''
+        return 1 / (1 + np.exp(-x))
+
+
+
+# Names of the elementary functions of Function
+ELEMENTARY_FUNCTIONS = ('sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'sinh', 'cosh',
+                        'tanh', 'sqrt', 'exp', 'log', 'log2', 'log10', 'logistic')
+
+
+def _deferred(name):
+    '''
+    Helper that returns the elementary method 'name' of ElementaryRecorder,
+    which calls self._elementary(name).
+    '''
+    def method(self):
+        return self._elementary(name)
+
+    method.__name__ = name
+    method.__doc__ = 'Applies {} to the variable through _elementary.'.format(name)
+    return method
+
+
+class ElementaryRecorder:
+    '''
+    Mixin for variable types that handle every elementary function of
+    Function in the same way, e.g. by recording the operation's name in a
+    graph. Subclasses define _elementary(self, name), which is called by
+    the methods sin, cos, ... that Function dispatches to.
+    '''
+
+
+for _name in ELEMENTARY_FUNCTIONS:
+    setattr(ElementaryRecorder, _name, _deferred(_name))
 
 
 np.warnings.filterwarnings('ignore', category=np.VisibleDeprecationWarning)
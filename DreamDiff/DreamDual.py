@@ -0,0 +1,403 @@
+from DreamDiff.DreamDiff import DreamDiff, Function
+import math
+import operator
+import numpy as np
+
+
+# Errors raised by float arithmetic and math where NumPy returns inf or nan
+_MATH_ERRORS = (ValueError, ZeroDivisionError, OverflowError)
+
+_LN2 = math.log(2)
+_LN10 = math.log(10)
+
+
+def _dual(val, der):
+    '''
+    Helper that creates a ScalarDual object from two floats without
+    conversion.
+    '''
+    result = object.__new__(ScalarDual)
+    result._val = val
+    result._der = der
+    return result
+
+
+def _numpy_fallback(op, *args):
+    '''
+    Helper that repeats an operation with DreamDiff, and so NumPy, when the
+    float version raises or returns a complex number. This gives the same
+    inf and nan results as DreamDiff, e.g. for log(0) or sqrt(-1).
+    '''
+    args = [DreamDiff(a._val, [a._der]) if isinstance(a, ScalarDual) else a for a in args]
+    with np.errstate(all='ignore'):
+        result = op(*args)
+    return _dual(float(result.val[0]), float(np.ravel(result.der)[0]))
+
+
+class ScalarDual:
+
+    __slots__ = ('_val', '_der')
+
+    def __init__(self, val, der=1.0):
+        '''
+        Constructs a ScalarDual object, a dual number for functions of a
+        single scalar variable. The value and derivative are plain Python
+        floats and the elementary functions use the math module, so no
+        NumPy arrays are created. Where math raises (e.g. log(0) or
+        sqrt(-1)), the operation is repeated with NumPy to give the same
+        inf or nan as DreamDiff.
+
+        INPUTS
+        ======
+        val: int or float, required
+            Value of the variable.
+        der: int or float, optional, default is 1.0
+            Derivative (seed) of the variable.
+
+        RETURNS
+        =======
+        A ScalarDual object.
+
+        EXAMPLES
+        ========
+        >>> x = ScalarDual(2.0)
+        >>> f = x**2 + Function.sin(x)
+        >>> print(f)
+        Values:
+        [4.90929743]
+        Jacobian:
+        [3.58385316]
+        '''
+        self._val = float(val)
+        self._der = float(der)
+
+    @property
+    def val(self):
+        '''
+        Returns the value of the ScalarDual object, as for DreamDiff.
+        '''
+        return np.array([self._val])
+
+    @property
+    def der(self):
+        '''
+        Returns the derivative of the ScalarDual object, as for DreamDiff.
+        '''
+        return np.array([self._der])
+
+    def __add__(self, other):
+        '''
+        Performs addition of self and other.
+        '''
+        try:
+            return _dual(self._val + other._val, self._der + other._der)
+        except AttributeError:
+            return _dual(self._val + other, self._der)
+
+    def __radd__(self, other):
+        '''
+        Performs addition of other and self (commutative).
+        '''
+        return _dual(other + self._val, self._der)
+
+    def __sub__(self, other):
+        '''
+        Performs subtraction of other from self.
+        '''
+        try:
+            return _dual(self._val - other._val, self._der - other._der)
+        except AttributeError:
+            return _dual(self._val - other, self._der)
+
+    def __rsub__(self, other):
+        '''
+        Performs subtraction of self from other.
+        '''
+        return _dual(other - self._val, -self._der)
+
+    def __mul__(self, other):
+        '''
+        Performs multiplication of self with other.
+        '''
+        try:
+            return _dual(self._val*other._val, self._val*other._der + other._val*self._der)
+        except AttributeError:
+            return _dual(self._val*other, other*self._der)
+
+    def __rmul__(self, other):
+        '''
+        Performs multiplication of other with self (commutative).
+        '''
+        return _dual(other*self._val, other*self._der)
+
+    def __truediv__(self, other):
+        '''
+        Performs division of self by other.
+        '''
+        try:
+            try:
+                return _dual(self._val / other._val, (other._val*self._der - self._val*other._der) / other._val**2)
+            except AttributeError:
+                return _dual(self._val / other, self._der / other)
+        except _MATH_ERRORS:
+            return _numpy_fallback(operator.truediv, self, other)
+
+    def __rtruediv__(self, other):
+        '''
+        Performs division of other by self.
+        '''
+        try:
+            return _dual(other / self._val, -other / self._val**2*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(operator.truediv, other, self)
+
+    def __pow__(self, other):
+        '''
+        Raises self to the power of other.
+        '''
+        try:
+            try:
+                val = self._val**other._val
+                der = other._val*self._val**(other._val - 1)*self._der + math.log(abs(self._val))*val*other._der
+            except AttributeError:
+                if other == 0:
+                    return _dual(1.0, 0.0)
+                val = self._val**other
+                der = other*self._val**(other - 1)*self._der
+            if isinstance(val, complex) or isinstance(der, complex):
+                raise ValueError('complex result')
+            return _dual(val, der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(operator.pow, self, other)
+
+    def __rpow__(self, other):
+        '''
+        Raises other to the power of self.
+        '''
+        try:
+            val = other**self._val
+            if isinstance(val, complex):
+                raise ValueError('complex result')
+            return _dual(val, math.log(other)*val*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(operator.pow, other, self)
+
+    def __neg__(self):
+        '''
+        Negates the function value and derivative.
+        '''
+        return _dual(-self._val, -self._der)
+
+    def __pos__(self):
+        '''
+        Applies the unary + operator to self.
+        '''
+        return self
+
+    def __abs__(self):
+        '''
+        Applies the absolute value to the function.
+        '''
+        try:
+            return _dual(abs(self._val), self._val / abs(self._val)*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(operator.abs, self)
+
+    def __eq__(self, other):
+        '''
+        Returns True if self and other have the same value and derivative,
+        False otherwise.
+        '''
+        try:
+            return self._val == other._val and self._der == other._der
+        except AttributeError:
+            return self._val == other and self._der == 1
+
+    def __ne__(self, other):
+        '''
+        Returns False if self and other have the same value and derivative,
+        True otherwise.
+        '''
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        '''
+        Returns True if the value of self is less than the value of other.
+        '''
+        return self._val < getattr(other, '_val', other)
+
+    def __gt__(self, other):
+        '''
+        Returns True if the value of self is greater than the value of other.
+        '''
+        return self._val > getattr(other, '_val', other)
+
+    def __le__(self, other):
+        '''
+        Returns True if the value of self is less than or equal to the value
+        of other.
+        '''
+        return self._val <= getattr(other, '_val', other)
+
+    def __ge__(self, other):
+        '''
+        Returns True if the value of self is greater than or equal to the
+        value of other.
+        '''
+        return self._val >= getattr(other, '_val', other)
+
+    def sin(self):
+        '''
+        Returns the sine of the ScalarDual object with its updated derivative.
+        '''
+        try:
+            return _dual(math.sin(self._val), math.cos(self._val)*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.sin, self)
+
+    def cos(self):
+        '''
+        Returns the cosine of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            return _dual(math.cos(self._val), -math.sin(self._val)*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.cos, self)
+
+    def tan(self):
+        '''
+        Returns the tangent of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            return _dual(math.tan(self._val), self._der / math.cos(self._val)**2)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.tan, self)
+
+    def arcsin(self):
+        '''
+        Returns the arcsine of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            return _dual(math.asin(self._val), self._der / math.sqrt(1 - self._val**2))
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.arcsin, self)
+
+    def arccos(self):
+        '''
+        Returns the arccosine of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            return _dual(math.acos(self._val), -self._der / math.sqrt(1 - self._val**2))
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.arccos, self)
+
+    def arctan(self):
+        '''
+        Returns the arctangent of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            return _dual(math.atan(self._val), self._der / (1 + self._val**2))
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.arctan, self)
+
+    def sinh(self):
+        '''
+        Returns the sinh of the ScalarDual object with its updated derivative.
+        '''
+        try:
+            return _dual(math.sinh(self._val), math.cosh(self._val)*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.sinh, self)
+
+    def cosh(self):
+        '''
+        Returns the cosh of the ScalarDual object with its updated derivative.
+        '''
+        try:
+            return _dual(math.cosh(self._val), math.sinh(self._val)*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.cosh, self)
+
+    def tanh(self):
+        '''
+        Returns the tanh of the ScalarDual object with its updated derivative.
+        '''
+        try:
+            return _dual(math.tanh(self._val), self._der / math.cosh(self._val)**2)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.tanh, self)
+
+    def sqrt(self):
+        '''
+        Returns the square root of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            val = math.sqrt(self._val)
+            return _dual(val, 0.5 / val*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.sqrt, self)
+
+    def exp(self):
+        '''
+        Returns the exponential of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            val = math.exp(self._val)
+            return _dual(val, val*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.exp, self)
+
+    def log(self):
+        '''
+        Returns the log (base e) of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            return _dual(math.log(self._val), self._der / self._val)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.log, self)
+
+    def log2(self):
+        '''
+        Returns the log (base 2) of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            return _dual(math.log2(self._val), self._der / (self._val*_LN2))
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.log2, self)
+
+    def log10(self):
+        '''
+        Returns the log (base 10) of the ScalarDual object with its updated
+        derivative.
+        '''
+        try:
+            return _dual(math.log10(self._val), self._der / (self._val*_LN10))
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.log10, self)
+
+    def logistic(self):
+        '''
+        Returns the logistic function of the ScalarDual object with its
+        updated derivative.
+        '''
+        try:
+            val = 1 / (1 + math.exp(-self._val))
+            return _dual(val, val*(1 - val)*self._der)
+        except _MATH_ERRORS:
+            return _numpy_fallback(Function.logistic, self)
+
+    def __str__(self):
+        '''
+        Returns a string representation of the function value and
+        derivative.
+        '''
+        return 'Values:\n{}\nJacobian:\n{}'.format(self.val, self.der)
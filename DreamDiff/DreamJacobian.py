@@ -0,0 +1,224 @@
+from DreamDiff.DreamDiff import DreamDiff
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+import os
+
+
+# Cache size assumed when the platform does not report one
+_DEFAULT_CACHE_SIZE = 256*1024
+
+# Number of derivative slabs assumed to be live at once during a pass
+_LIVE_SLABS = 4
+
+# Below this number of inputs, parallel_jacobian runs serially
+_SERIAL_THRESHOLD = 8
+
+# Function and point shipped once to each worker process
+_worker = {}
+
+
+def _cache_size():
+    '''
+    Helper that returns the size of the L2 cache in bytes, or a default
+    when it cannot be queried.
+    '''
+    try:
+        size = os.sysconf('SC_LEVEL2_CACHE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        size = 0
+    return size if size and size > 0 else _DEFAULT_CACHE_SIZE
+
+
+def default_chunk_size(n):
+    '''
+    Returns the number of seed directions propagated per pass by jacobian for
+    a function of 'n' variables. The chunk is chosen so that the derivative
+    slabs of an n-row Jacobian block, k doubles wide, fit in the L2 cache.
+
+    INPUTS
+    ======
+    n: int, required
+        The number of input variables.
+
+    RETURNS
+    =======
+    An int between 1 and n.
+    '''
+    k = _cache_size() // (8*_LIVE_SLABS*max(n, 1))
+    return int(max(1, min(n, k)))
+
+
+def jvp(f, x, V):
+    '''
+    Computes Jacobian-vector products of 'f' at 'x' for a block of k
+    directions in a single forward pass. Each input carries a k-wide
+    derivative slab, so every DreamDiff operation propagates all k
+    directions at once.
+
+    INPUTS
+    ======
+    f: function, required
+        Function taking a list of n variables and returning a DreamDiff
+        object, e.g. lambda x: DreamDiff([x[0]*x[1], Function.sin(x[0])]).
+    x: list or np.ndarray, required
+        Point of length n at which to evaluate.
+    V: list or np.ndarray, required
+        Directions, of shape (n,) for a single direction or (n, k) for k
+        directions.
+
+    RETURNS
+    =======
+    A DreamDiff object whose value is f(x) and whose derivative is J V, of
+    shape (k,) for a scalar 'f' and (m, k) for a vector 'f' with m outputs.
+
+    EXAMPLES
+    ========
+    >>> f = lambda x: x[0]*x[1]
+    >>> jvp(f, [2.0, 3.0], [[1.0, 0.0], [0.0, 1.0]]).der
+    array([3., 2.])
+    '''
+    x = np.array(x, dtype=float, ndmin=1)
+    V = np.array(V, dtype=float)
+    if V.ndim == 1:
+        V = V[:, None]
+    if V.shape[0] != len(x):
+        raise AssertionError('V must have one row per input variable')
+    return f([DreamDiff(x[j], V[j]) for j in range(len(x))])
+
+
+def jacobian(f, x, chunk_size=None):
+    '''
+    Computes the Jacobian of 'f' at 'x' by chunked forward mode. The n
+    columns of the identity are propagated k at a time with jvp, so the
+    Python dispatch of each DreamDiff operation is paid once per chunk
+    rather than once per column.
+
+    INPUTS
+    ======
+    f: function, required
+        Function taking a list of n variables and returning a DreamDiff
+        object, e.g. lambda x: DreamDiff([x[0]*x[1], Function.sin(x[0])]).
+    x: list or np.ndarray, required
+        Point of length n at which to evaluate.
+    chunk_size: int, optional, default is None
+        Number of directions k propagated per pass. If None, it is chosen
+        by default_chunk_size from n and the cache size.
+
+    RETURNS
+    =======
+    A DreamDiff object whose value is f(x) and whose derivative is the
+    Jacobian, of shape (n,) for a scalar 'f' and (m, n) for a vector 'f'.
+
+    EXAMPLES
+    ========
+    >>> f = lambda x: DreamDiff([x[0]**2, x[0]*x[1], x[2] - x[1]])
+    >>> print(jacobian(f, [1.0, 2.0, 3.0], chunk_size=2))
+    Values:
+    [[1.]
+     [2.]
+     [1.]]
+    Jacobian:
+    [[ 2.  0.  0.]
+     [ 2.  1.  0.]
+     [ 0. -1.  1.]]
+    '''
+    x = np.array(x, dtype=float, ndmin=1)
+    n = len(x)
+    if chunk_size is None:
+        chunk_size = default_chunk_size(n)
+    if chunk_size < 1:
+        raise AssertionError('chunk_size must be a positive integer')
+
+    val = None
+    blocks = []
+    for start in range(0, n, chunk_size):
+        result = jvp(f, x, _identity_columns(n, start, min(start + chunk_size, n)))
+        if val is None:
+            val = result.val
+        blocks.append(np.asarray(result.der))
+    return DreamDiff(val, np.concatenate(blocks, axis=-1))
+
+
+def _identity_columns(n, start, stop):
+    '''
+    Helper that returns columns start to stop of the n by n identity.
+    '''
+    V = np.zeros((n, stop - start))
+    V[np.arange(start, stop), np.arange(stop - start)] = 1
+    return V
+
+
+def _init_worker(f, x):
+    '''
+    Helper that stores the function and point in a worker process.
+    '''
+    _worker['f'] = f
+    _worker['x'] = x
+
+
+def _worker_columns(start, stop):
+    '''
+    Helper that computes columns start to stop of the Jacobian in a worker
+    process. Returns the value and the block of columns.
+    '''
+    x = _worker['x']
+    result = jvp(_worker['f'], x, _identity_columns(len(x), start, stop))
+    return np.asarray(result.val), np.asarray(result.der)
+
+
+def parallel_jacobian(f, x, workers=None, chunk_size=None):
+    '''
+    Computes the Jacobian of 'f' at 'x' by splitting the seed directions
+    across a pool of processes. 'f' and 'x' are shipped once to each worker
+    when it starts, each task then computes a block of columns with jvp, and
+    the blocks are reassembled in input order. Worthwhile when a single
+    forward pass of 'f' is expensive; for fewer than 8 inputs or a single
+    worker the Jacobian is computed serially by jacobian.
+
+    INPUTS
+    ======
+    f: function, required
+        Function taking a list of n variables and returning a DreamDiff
+        object. Where processes cannot be forked, 'f' must be picklable
+        (e.g. defined at module level rather than a lambda).
+    x: list or np.ndarray, required
+        Point of length n at which to evaluate.
+    workers: int, optional, default is None
+        Number of worker processes. If None, the number of CPUs is used.
+    chunk_size: int, optional, default is None
+        Number of directions per task. If None, the columns are split
+        evenly over the workers, capped at default_chunk_size(n).
+
+    RETURNS
+    =======
+    A DreamDiff object whose value is f(x) and whose derivative is the
+    Jacobian, as returned by jacobian.
+
+    EXAMPLES
+    ========
+    >>> f = lambda x: DreamDiff([x[j]*x[j + 1] for j in range(9)])
+    >>> parallel_jacobian(f, np.arange(10.0), workers=2).der[0]
+    array([1., 0., 0., 0., 0., 0., 0., 0., 0., 0.])
+    '''
+    x = np.array(x, dtype=float, ndmin=1)
+    n = len(x)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise AssertionError('workers must be a positive integer')
+    if workers == 1 or n < _SERIAL_THRESHOLD:
+        return jacobian(f, x, chunk_size)
+    if chunk_size is None:
+        chunk_size = min(-(-n // workers), default_chunk_size(n))
+    if chunk_size < 1:
+        raise AssertionError('chunk_size must be a positive integer')
+
+    starts = list(range(0, n, chunk_size))
+    stops = [min(start + chunk_size, n) for start in starts]
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with ProcessPoolExecutor(max_workers=min(workers, len(starts)), mp_context=context,
+                             initializer=_init_worker, initargs=(f, x)) as executor:
+        results = list(executor.map(_worker_columns, starts, stops))
+    return DreamDiff(results[0][0], np.concatenate([der for val, der in results], axis=-1))
@@ -0,0 +1,185 @@
+from DreamDiff.DreamDiff import DreamDiff, ElementaryRecorder, Function
+from DreamDiff.DreamSimplify import NUMERIC_OPERATIONS
+import operator
+
+
+# DreamDiff versions of the recorded operations, used to propagate derivatives
+_DUALS = {
+    'add': operator.add, 'sub': operator.sub, 'mul': operator.mul,
+    'div': operator.truediv, 'pow': operator.pow, 'neg': operator.neg,
+    'abs': operator.abs, 'sin': Function.sin, 'cos': Function.cos,
+    'tan': Function.tan, 'arcsin': Function.arcsin, 'arccos': Function.arccos,
+    'arctan': Function.arctan, 'sinh': Function.sinh, 'cosh': Function.cosh,
+    'tanh': Function.tanh, 'sqrt': Function.sqrt, 'exp': Function.exp,
+    'log': Function.log, 'log2': Function.log2, 'log10': Function.log10,
+    'logistic': Function.logistic,
+}
+
+
+class LazyDiff(ElementaryRecorder):
+
+    def __init__(self, val, der=[1], input_pos=None):
+        '''
+        Constructs a LazyDiff object, which takes the same inputs as
+        DreamDiff. Operations on LazyDiff objects are only recorded. Reading
+        .val of a result evaluates the values with plain NumPy and no
+        derivatives, while reading .der propagates derivatives with the
+        DreamDiff rules. Both are cached on every node of the graph, so
+        each is computed at most once.
+
+        INPUTS
+        ======
+        val: int, float, list, or np.ndarray, required
+            Value of the input variable(s).
+        der: list or np.ndarray, optional, default is [1]
+            Seed vector of the input, as for DreamDiff.
+        input_pos: list or np.ndarray, optional, default is None
+            Total number of inputs and index of the variable, as for
+            DreamDiff.
+
+        RETURNS
+        =======
+        A LazyDiff input variable.
+
+        EXAMPLES
+        ========
+        >>> import numpy as np
+        >>> x = LazyDiff(np.array([0.0, 1.0, 2.0]))
+        >>> f = Function.exp(x) - x**2
+        >>> f.val
+        array([1.        , 1.71828183, 3.3890561 ])
+        '''
+        self._dual = DreamDiff(val, der, input_pos)
+        self._val = self._dual.val
+        self._op = None
+        self._args = ()
+
+    @staticmethod
+    def _node(op, args):
+        '''
+        Internal method that records an operation without evaluating it.
+        '''
+        node = object.__new__(LazyDiff)
+        node._dual = None
+        node._val = None
+        node._op = op
+        node._args = args
+        return node
+
+    def _evaluate(self, attr, compute):
+        '''
+        Internal method that fills the cached attribute 'attr' of this node
+        and of every uncached node it depends on, in dependency order.
+        '''
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            if getattr(node, attr) is not None:
+                stack.pop()
+                continue
+            pending = [a for a in node._args if isinstance(a, LazyDiff) and getattr(a, attr) is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            setattr(node, attr, compute(node))
+            stack.pop()
+        return getattr(self, attr)
+
+    @property
+    def val(self):
+        '''
+        Returns the value(s), evaluating only the value path of the graph.
+        '''
+        if self._val is None:
+            self._evaluate('_val', lambda node: NUMERIC_OPERATIONS[node._op](*[a._val if isinstance(a, LazyDiff) else a for a in node._args]))
+        return self._val
+
+    @property
+    def der(self):
+        '''
+        Returns the derivative(s) (Jacobian), propagating derivatives through
+        the graph with the DreamDiff rules.
+        '''
+        return self.dual.der
+
+    @property
+    def dual(self):
+        '''
+        Returns the equivalent DreamDiff object, with value and derivative.
+        '''
+        if self._dual is None:
+            self._evaluate('_dual', lambda node: _DUALS[node._op](*[a._dual if isinstance(a, LazyDiff) else a for a in node._args]))
+            if self._val is None:
+                self._val = self._dual.val
+        return self._dual
+
+    def __add__(self, other):
+        return LazyDiff._node('add', (self, other))
+
+    def __radd__(self, other):
+        return LazyDiff._node('add', (other, self))
+
+    def __sub__(self, other):
+        return LazyDiff._node('sub', (self, other))
+
+    def __rsub__(self, other):
+        return LazyDiff._node('sub', (other, self))
+
+    def __mul__(self, other):
+        return LazyDiff._node('mul', (self, other))
+
+    def __rmul__(self, other):
+        return LazyDiff._node('mul', (other, self))
+
+    def __truediv__(self, other):
+        return LazyDiff._node('div', (self, other))
+
+    def __rtruediv__(self, other):
+        return LazyDiff._node('div', (other, self))
+
+    def __pow__(self, other):
+        return LazyDiff._node('pow', (self, other))
+
+    def __rpow__(self, other):
+        return LazyDiff._node('pow', (other, self))
+
+    def __neg__(self):
+        return LazyDiff._node('neg', (self,))
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return LazyDiff._node('abs', (self,))
+
+    def __eq__(self, other):
+        return self.dual == getattr(other, 'dual', other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        return self.val < getattr(other, 'val', other)
+
+    def __gt__(self, other):
+        return self.val > getattr(other, 'val', other)
+
+    def __le__(self, other):
+        return self.val <= getattr(other, 'val', other)
+
+    def __ge__(self, other):
+        return self.val >= getattr(other, 'val', other)
+
+    def _elementary(self, name):
+        '''
+        Internal method that records the elementary function 'name'.
+        '''
+        return LazyDiff._node(name, (self,))
+
+    def __str__(self):
+        '''
+        Returns a string representation of the function value(s) and
+        derivative(s) (Jacobian).
+        '''
+        return str(self.dual)
+
@@ -1,9 +1,955 @@
 #from DreamDiff import DreamDiff as ad
 from DreamDiff.DreamDiff import DreamDiff as ad
+from DreamDiff.DreamDual import ScalarDual
+from DreamDiff.DreamJacobian import jacobian, jvp
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import math
+import multiprocessing
 import numpy as np
+import os
 import matplotlib.pyplot as plt
 
 
+# Below this number of brackets, find_roots runs serially
+_SERIAL_BRACKETS = 64
+
+# Function and settings shipped once to each find_roots worker process
+_root_worker = {}
+
+# State yielded by the solver iterators after each evaluation: the point
+# 'x' where 'f' and 'grad' were evaluated, the 'step' taken from it (None if
+# no step is possible), and the cumulative number of evaluations
+OptimizeState = namedtuple('OptimizeState', ['iteration', 'x', 'f', 'grad', 'step', 'evals'])
+
+# State yielded by the iterators of the system solvers: the point 'x', the
+# residual F(x) and its norm, the 'step' taken from x (None if no step is
+# possible), and a dict of the cumulative evaluation counts
+SystemState = namedtuple('SystemState', ['iteration', 'x', 'residual', 'norm', 'step', 'evals'])
+
+# Messages printed when a solver stops without a solution
+_FAILURES = {
+    'max iters': 'No solution found after max iterations.',
+    'zero derivative': 'Reached zero derivative. No solution found.',
+    'line search failed': 'Line search failed. No solution found.',
+    'singular jacobian': 'Reached singular Jacobian. No solution found.',
+}
+
+
+def _evaluate_scalar(x, function, a):
+    '''
+    Helper that evaluates a parsed function and its derivative at 'a' and
+    returns them as a 2-tuple. Scalar points use ScalarDual, so that each
+    iteration of a solver works with plain floats rather than NumPy arrays.
+    '''
+    if np.isscalar(a):
+        result = function(ScalarDual(a))
+        if isinstance(result, ScalarDual):
+            return result._val, result._der
+        return float(result), 0.0
+    result = x._evaluate_function(function, a)
+    return result.val[0], result.der[0]
+
+
+def _evaluate_vector(function, a):
+    '''
+    Helper that evaluates a scalar function of the vector point 'a' and its
+    gradient in one forward pass, seeding 'a' as a sparse DreamDiff vector
+    of variables. Returns the value and the gradient as a 2-tuple.
+    '''
+    result = function(ad.variables(a, sparse=True))
+    der = result.der
+    if hasattr(der, 'toarray'):
+        der = der.toarray()
+    return float(np.ravel(result.val)[0]), np.asarray(der, dtype=float).ravel()
+
+
+def _converged(criterion, grad, step, epsilon):
+    '''
+    Helper that returns True if the gradient norm ('grad') or the step norm
+    ('step') of a descent iteration is below 'epsilon'.
+    '''
+    if criterion == 'grad':
+        return np.linalg.norm(grad) < epsilon
+    return np.linalg.norm(step) < epsilon
+
+
+def _scalar_descent_steps(x, function, x0, epsilon, max_iters, eta, criterion, momentum):
+    '''
+    Helper generator for gradient descent, or Nesterov's method if
+    'momentum' is True, from the scalar point 'x0'. Yields an OptimizeState
+    per iteration and returns the final status.
+    '''
+    xn = y = x0
+    t = 1.0
+    for i in range(max_iters):
+        yn, der = _evaluate_scalar(x, function, y)
+        step = -eta*der
+        new_xn = y + step
+        done = abs(der if criterion == 'grad' else new_xn - xn) < epsilon
+        yield OptimizeState(i, y, yn, der, step, i + 1)
+        if done:
+            return 'converged'
+
+        # Nesterov's momentum update, with the reset condition
+        new_y = new_xn
+        if momentum:
+            new_t = 0.5*(1 + math.sqrt(1 + 4*t**2))
+            if np.dot(y - new_xn, new_xn - xn) > 0:
+                new_t = 1
+            else:
+                new_y = new_xn + (t - 1.0)/(new_t)*(new_xn - xn)
+            t = new_t
+        xn, y = new_xn, new_y
+    return 'max iters'
+
+
+def _vector_descent_steps(function, x0, epsilon, max_iters, eta, criterion, momentum):
+    '''
+    Helper generator for gradient descent, or Nesterov's method if
+    'momentum' is True, from the vector point 'x0'. The iterates are
+    updated in place on preallocated arrays, which the yielded states
+    share.
+    '''
+    xn = np.array(x0, dtype=float)
+    y = xn.copy() if momentum else xn
+    new_xn = np.empty_like(xn)
+    step = np.empty_like(xn)
+    diff = np.empty_like(xn)
+    t = 1.0
+    for i in range(max_iters):
+        yn, grad = _evaluate_vector(function, y)
+        np.multiply(grad, -eta, out=step)
+        if momentum:
+            np.add(y, step, out=new_xn)
+            np.subtract(new_xn, xn, out=diff)
+        done = _converged(criterion, grad, diff if momentum else step, epsilon)
+        yield OptimizeState(i, y, yn, grad, step, i + 1)
+        if done:
+            return 'converged'
+        if not momentum:
+            xn += step
+            continue
+
+        # Reset the momentum when the step opposes it (y - new_xn = -step)
+        new_t = 0.5*(1 + math.sqrt(1 + 4*t**2))
+        if step @ diff < 0:
+            y[:] = new_xn
+            new_t = 1
+        else:
+            np.multiply(diff, (t - 1.0)/new_t, out=y)
+            y += new_xn
+        xn, new_xn = new_xn, xn
+        t = new_t
+    return 'max iters'
+
+
+def _with_callback(steps, callback):
+    '''
+    Helper generator that passes on the states of 'steps' and stops once
+    callback(state) returns True. Returns the final status of 'steps', or
+    'stopped'.
+    '''
+    while True:
+        try:
+            state = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        yield state
+        if callback is not None and callback(state):
+            steps.close()
+            return 'stopped'
+
+
+def _finish(steps):
+    '''
+    Helper that runs a solver iterator to the end and returns its last
+    state and final status.
+    '''
+    state = None
+    while True:
+        try:
+            state = next(steps)
+        except StopIteration as stop:
+            return state, stop.value
+
+
+def _run(steps):
+    '''
+    Helper that runs a solver iterator to the end. Returns the last state,
+    the final status, and the histories of the points, values, and
+    derivatives in a 3-tuple.
+    '''
+    xn_history = []
+    yn_history = []
+    der_history = []
+    state = None
+    while True:
+        try:
+            state = next(steps)
+        except StopIteration as stop:
+            return state, stop.value, (xn_history, yn_history, der_history)
+        xn_history.append(np.copy(state.x) if isinstance(state.x, np.ndarray) else state.x)
+        yn_history.append(state.f)
+        der_history.append(state.grad)
+
+
+def _report(state, status):
+    '''
+    Helper that prints the outcome of a solver run and returns the solution
+    for a converged run, or None.
+    '''
+    if status != 'converged':
+        print(_FAILURES[status])
+        return None
+    solution = state.x + state.step
+    print('Found solution after {} iterations.'.format(state.iteration))
+    print('Solution is: {}'.format(solution))
+    return solution
+
+
+def _system_function(f):
+    '''
+    Helper that returns a vector function 'f', given as a string in terms of
+    x[0], x[1], ... (e.g. '[x[0]^2 - 2, x[0]*x[1] - 1]') or as a function of
+    a list of variables, as a function returning a DreamDiff object.
+    '''
+    if isinstance(f, str):
+        f = ad(1.0)._parse_input(f)
+
+    def function(x):
+        result = f(x)
+        if isinstance(result, (list, tuple)):
+            result = ad(list(result))
+        return result
+    return function
+
+
+def _residual(f, x):
+    '''
+    Helper that evaluates the vector function 'f' at 'x' without derivatives,
+    by propagating zero-width derivative slabs.
+    '''
+    return np.array(jvp(f, x, np.zeros((len(x), 0))).val, dtype=float).ravel()
+
+
+def _residual_jacobian(f, x):
+    '''
+    Helper that evaluates the vector function 'f' and its Jacobian at 'x'.
+    '''
+    result = jacobian(f, x)
+    J = np.array(result.der, dtype=float)
+    return np.array(result.val, dtype=float).ravel(), J.reshape(-1, len(x))
+
+
+def _lu_factor(A):
+    '''
+    Helper that computes the LU factorization with partial pivoting of the
+    square matrix A. Returns the 2-tuple (lu, piv), where lu holds the unit
+    lower triangular L below the diagonal and U on and above it, and piv the
+    row permutation, or None if A is singular.
+    '''
+    lu = np.array(A, dtype=float)
+    n = len(lu)
+    piv = np.arange(n)
+    tol = np.finfo(float).eps*n*max(np.abs(lu).max(initial=0.0), 1e-300)
+    for k in range(n):
+        p = k + np.argmax(np.abs(lu[k:, k]))
+        if abs(lu[p, k]) <= tol:
+            return None
+        if p != k:
+            lu[[k, p]] = lu[[p, k]]
+            piv[[k, p]] = piv[[p, k]]
+        lu[k + 1:, k] /= lu[k, k]
+        lu[k + 1:, k + 1:] -= np.outer(lu[k + 1:, k], lu[k, k + 1:])
+    return lu, piv
+
+
+def _lu_solve(factor, b):
+    '''
+    Helper that solves A x = b given the factorization of A from _lu_factor.
+    '''
+    lu, piv = factor
+    y = np.array(b, dtype=float)[piv]
+    for k in range(1, len(y)):
+        y[k] -= lu[k, :k] @ y[:k]
+    for k in range(len(y) - 1, -1, -1):
+        y[k] = (y[k] - lu[k, k + 1:] @ y[k + 1:]) / lu[k, k]
+    return y
+
+
+def _directional(f, x, v):
+    '''
+    Helper that evaluates the vector function 'f' at 'x' and its directional
+    derivative J v in a single forward pass seeded with the direction 'v'.
+    Returns the 2-tuple (F, Jv).
+    '''
+    result = jvp(f, x, v)
+    return np.array(result.val, dtype=float).ravel(), np.array(result.der, dtype=float).ravel()
+
+
+def _gmres(matvec, b, tol, restart, max_restarts):
+    '''
+    Helper that solves A x = b by restarted GMRES, given only the product
+    x -> A x, starting from x = 0. At most 'restart' Krylov vectors of
+    length n are stored, and the Arnoldi process is restarted at most
+    'max_restarts' times. Stops when the residual norm is below 'tol' times
+    the norm of b. Returns the 2-tuple (x, number of products).
+    '''
+    n = len(b)
+    x = np.zeros(n)
+    b_norm = np.linalg.norm(b)
+    if b_norm == 0:
+        return x, 0
+    r = np.array(b, dtype=float)
+    n_matvec = 0
+    V = np.empty((restart + 1, n))
+    for _ in range(max_restarts):
+        beta = np.linalg.norm(r)
+        if beta <= tol*b_norm:
+            break
+        H = np.zeros((restart + 1, restart))
+        cs = np.zeros(restart)
+        sn = np.zeros(restart)
+        g = np.zeros(restart + 1)
+        g[0] = beta
+        V[0] = r / beta
+
+        k = 0
+        for j in range(restart):
+            # Arnoldi step with modified Gram-Schmidt
+            w = np.array(matvec(V[j]), dtype=float)
+            n_matvec += 1
+            for i in range(j + 1):
+                H[i, j] = w @ V[i]
+                w -= H[i, j]*V[i]
+            h = np.linalg.norm(w)
+            H[j + 1, j] = h
+
+            # Apply the previous Givens rotations, then eliminate H[j + 1, j]
+            for i in range(j):
+                H[i, j], H[i + 1, j] = cs[i]*H[i, j] + sn[i]*H[i + 1, j], cs[i]*H[i + 1, j] - sn[i]*H[i, j]
+            denominator = np.hypot(H[j, j], h)
+            if denominator == 0:
+                break
+            cs[j], sn[j] = H[j, j] / denominator, h / denominator
+            H[j, j], H[j + 1, j] = denominator, 0.0
+            g[j], g[j + 1] = cs[j]*g[j], -sn[j]*g[j]
+            k = j + 1
+            if abs(g[k]) <= tol*b_norm or h == 0:
+                break
+            V[k] = w / h
+        if k == 0:
+            break
+
+        # Back substitution on the triangular system, then update x
+        y = np.zeros(k)
+        for i in range(k - 1, -1, -1):
+            y[i] = (g[i] - H[i, i + 1:k] @ y[i + 1:]) / H[i, i]
+        x += V[:k].T @ y
+        r = b - matvec(x)
+        n_matvec += 1
+    return x, n_matvec
+
+
+def _newton_system_steps(function, xn, F, epsilon, max_iters, refresh):
+    '''
+    Helper generator for newtons_system from the point 'xn', where the
+    residual is 'F'. Yields a SystemState per iteration and returns the
+    final status.
+    '''
+    n_jacobian = 0
+    factor = None
+    age = 0
+
+    for i in range(max_iters + 1):
+        norm = np.linalg.norm(F)
+        if norm < epsilon:
+            yield SystemState(i, xn, F, norm, np.zeros_like(xn), {'jacobian': n_jacobian})
+            return 'converged'
+        if i == max_iters:
+            break
+
+        while True:
+            if factor is None or (refresh is not None and age >= refresh):
+                # Evaluate and factorize a fresh Jacobian
+                F, J = _residual_jacobian(function, xn)
+                n_jacobian += 1
+                factor = _lu_factor(J)
+                age = 0
+                if factor is None:
+                    yield SystemState(i, xn, F, norm, None, {'jacobian': n_jacobian})
+                    return 'singular jacobian'
+
+            # Newton step with the current factorization
+            step = -_lu_solve(factor, F)
+            x_new = xn + step
+            F_new = _residual(function, x_new)
+            if age == 0 or np.linalg.norm(F_new) < norm:
+                break
+
+            # The stale Jacobian made no progress, so refresh it and redo
+            # the step
+            factor = None
+
+        yield SystemState(i, xn, F, norm, step, {'jacobian': n_jacobian})
+        xn, F = x_new, F_new
+        age += 1
+    return 'max iters'
+
+
+def _broyden_steps(function, xn, F, epsilon, max_iters, method):
+    '''
+    Helper generator for broyden from the point 'xn', where the residual is
+    'F'. Yields a SystemState per iteration and returns the final status.
+    '''
+    n_jacobian = 0
+    n_residual = 1
+    H = None
+
+    for i in range(max_iters + 1):
+        norm = np.linalg.norm(F)
+        if norm < epsilon:
+            yield SystemState(i, xn, F, norm, np.zeros_like(xn), {'jacobian': n_jacobian, 'residual': n_residual})
+            return 'converged'
+        if i == max_iters:
+            break
+
+        while True:
+            fresh = H is None
+            if fresh:
+                # Seed (or reseed) the inverse Jacobian with DreamDiff
+                F, J = _residual_jacobian(function, xn)
+                n_jacobian += 1
+                try:
+                    H = np.linalg.inv(J)
+                except np.linalg.LinAlgError:
+                    yield SystemState(i, xn, F, norm, None, {'jacobian': n_jacobian, 'residual': n_residual})
+                    return 'singular jacobian'
+
+            step = -(H @ F)
+            x_new = xn + step
+            F_new = _residual(function, x_new)
+            n_residual += 1
+            if fresh or np.linalg.norm(F_new) < norm:
+                break
+
+            # The updated inverse made no progress, so refresh it
+            H = None
+
+        yield SystemState(i, xn, F, norm, step, {'jacobian': n_jacobian, 'residual': n_residual})
+
+        # Rank-one update of the inverse Jacobian (Sherman-Morrison for the
+        # good method)
+        y = F_new - F
+        Hy = H @ y
+        if method == 'good':
+            sH = step @ H
+            denominator = sH @ y
+            if abs(denominator) > np.finfo(float).eps*np.linalg.norm(step)*np.linalg.norm(Hy):
+                H += np.outer(step - Hy, sH) / denominator
+            else:
+                H = None
+        else:
+            denominator = y @ y
+            if denominator > 0:
+                H += np.outer(step - Hy, y) / denominator
+            else:
+                H = None
+        xn, F = x_new, F_new
+    return 'max iters'
+
+
+def _newton_krylov_steps(function, xn, F, epsilon, max_iters, restart, gmres_tol, max_restarts):
+    '''
+    Helper generator for newton_krylov from the point 'xn', where the
+    residual is 'F'. Yields a SystemState per iteration and returns the
+    final status.
+    '''
+    n_jvp = 0
+
+    for i in range(max_iters + 1):
+        norm = np.linalg.norm(F)
+        if norm < epsilon:
+            yield SystemState(i, xn, F, norm, np.zeros_like(xn), {'jvp': n_jvp})
+            return 'converged'
+        if i == max_iters:
+            break
+
+        # Inexact Newton step from Jacobian-vector products only
+        step, n_matvec = _gmres(lambda v: _directional(function, xn, v)[1], -F,
+                                gmres_tol, min(restart, len(xn)), max_restarts)
+        n_jvp += n_matvec
+
+        # Backtrack until the residual norm decreases
+        t = 1.0
+        while t > epsilon:
+            F_new = _residual(function, xn + t*step)
+            if np.linalg.norm(F_new) < (1 - 0.0001*t)*norm:
+                break
+            t /= 2
+        else:
+            yield SystemState(i, xn, F, norm, None, {'jvp': n_jvp})
+            return 'line search failed'
+        step = t*step
+        yield SystemState(i, xn, F, norm, step, {'jvp': n_jvp})
+        xn, F = xn + step, F_new
+    return 'max iters'
+
+
+def _system_results(steps, counts):
+    '''
+    Helper that runs the iterator of a system solver, prints the outcome,
+    and returns the root, the list of residual norms, and the evaluation
+    counts named in 'counts', or None if no root is found.
+    '''
+    residual_norms = []
+    state = None
+    while True:
+        try:
+            state = next(steps)
+        except StopIteration as stop:
+            status = stop.value
+            break
+        residual_norms.append(state.norm)
+    if status != 'converged':
+        print(_FAILURES[status])
+        return None
+    print('Found solution after {} iterations.'.format(state.iteration))
+    return (state.x, residual_norms) + tuple(state.evals[name] for name in counts)
+
+
+def _value_noise(f0):
+    '''
+    Helper that returns the size of rounding errors in function values near
+    'f0'. Line searches treat smaller differences as ties, so that steps
+    near a minimum are still accepted once decreases are lost to rounding.
+    '''
+    return 10*np.finfo(float).eps*abs(f0)
+
+
+def _interpolate(lo, f_lo, dphi_lo, hi, f_hi, dphi_hi):
+    '''
+    Helper that returns the minimizer of the cubic interpolating the values
+    and slopes at 'lo' and 'hi', or the midpoint if the cubic minimizer is
+    not well inside the interval.
+    '''
+    d1 = dphi_lo + dphi_hi - 3*(f_lo - f_hi)/(lo - hi)
+    d2 = d1**2 - dphi_lo*dphi_hi
+    if np.isfinite(d2) and d2 >= 0:
+        d2 = math.copysign(math.sqrt(d2), hi - lo)
+        alpha = hi - (hi - lo)*(dphi_hi + d2 - d1)/(dphi_hi - dphi_lo + 2*d2)
+        margin = 0.1*abs(hi - lo)
+        if min(lo, hi) + margin <= alpha <= max(lo, hi) - margin:
+            return alpha
+    return 0.5*(lo + hi)
+
+
+def _wolfe_search(evaluate, x, f0, g0, d, alpha=1.0, c1=0.0001, c2=0.9, max_evals=25):
+    '''
+    Helper that searches along the direction 'd' from 'x' (a float or an
+    np.ndarray) for a step satisfying the strong Wolfe conditions.
+    'evaluate' returns the value and gradient at a point, so each trial step
+    costs one evaluation, and 'f0' and 'g0' are those at 'x'. Returns the
+    4-tuple (step, value, gradient, number of evaluations), where step is
+    None if no acceptable step was found.
+    '''
+    dphi0 = np.dot(g0, d)
+    noise = _value_noise(f0)
+    lo, f_lo, g_lo, dphi_lo = 0.0, f0, g0, dphi0
+    hi = None
+    n_evals = 0
+    while n_evals < max_evals:
+        if hi is not None:
+            alpha = _interpolate(lo, f_lo, dphi_lo, hi, f_hi, dphi_hi)
+        f, g = evaluate(x + alpha*d)
+        n_evals += 1
+        dphi = np.dot(g, d)
+
+        if not np.isfinite(f) or f > f0 + c1*alpha*dphi0 + noise or f >= f_lo + noise:
+            # Too far: the minimizer is bracketed by lo and alpha
+            hi, f_hi, dphi_hi = alpha, f, dphi
+            if not np.isfinite(f):
+                dphi_hi = np.nan
+            continue
+        if abs(dphi) <= -c2*dphi0:
+            return alpha, f, g, n_evals
+        if hi is None and dphi < 0:
+            # Still descending: expand the step
+            lo, f_lo, g_lo, dphi_lo = alpha, f, g, dphi
+            alpha *= 2
+            continue
+        if hi is None or dphi*(hi - lo) >= 0:
+            hi, f_hi, dphi_hi = lo, f_lo, dphi_lo
+        lo, f_lo, g_lo, dphi_lo = alpha, f, g, dphi
+
+    # Fall back to the best step with sufficient decrease, if any
+    if lo > 0:
+        return lo, f_lo, g_lo, n_evals
+    return None, f0, g0, n_evals
+
+
+def _armijo_search(evaluate, x, f0, g0, d, alpha=1.0, c1=0.0001, shrink=0.5, max_evals=30):
+    '''
+    Helper that backtracks along the direction 'd' from 'x' until the Armijo
+    sufficient decrease condition holds, with arguments as for
+    _wolfe_search. Once decreases are lost to rounding, a step is accepted
+    if the slope along 'd' has shrunk. The gradient of the accepted trial
+    step comes from the same evaluation as its value. Returns the 4-tuple
+    (step, value, gradient, number of evaluations), where step is None if
+    no acceptable step was found.
+    '''
+    dphi0 = np.dot(g0, d)
+    noise = _value_noise(f0)
+    for n_evals in range(1, max_evals + 1):
+        f, g = evaluate(x + alpha*d)
+        if f <= f0 + c1*alpha*dphi0 or f <= f0 + noise and abs(np.dot(g, d)) < -dphi0:
+            return alpha, f, g, n_evals
+        alpha *= shrink
+    return None, f0, g0, max_evals
+
+
+def _descent_results(steps, line_search):
+    '''
+    Helper that runs a descent iterator and returns the results of
+    grad_descent, with the number of evaluations appended when a line
+    search is used, or None.
+    '''
+    state, status, history = _run(steps)
+    solution = _report(state, status)
+    if solution is None:
+        return None
+    if line_search is not None:
+        return (solution,) + history + (state.evals,)
+    return (solution,) + history
+
+
+def _line_search_steps(evaluate, x0, epsilon, max_iters, eta, criterion, line_search, momentum):
+    '''
+    Helper generator for gradient descent, or Nesterov's method if
+    'momentum' is True, from the scalar or vector point 'x0' with step
+    lengths chosen by an 'armijo' or 'wolfe' line search starting from
+    'eta'. The value and gradient of the accepted trial step are reused for
+    the next iteration whenever it starts there.
+    '''
+    search = _wolfe_search if line_search == 'wolfe' else _armijo_search
+
+    # Momentum needs near-exact Wolfe steps, as in nonlinear conjugate gradient
+    options = {'c2': 0.1} if momentum and search is _wolfe_search else {}
+    xn = x0 if np.isscalar(x0) else np.array(x0, dtype=float)
+    y = xn
+    yn, der = evaluate(y)
+    n_evals = 1
+    alpha = eta
+    t = 1.0
+
+    for i in range(max_iters):
+
+        # Steepest descent step from y with a searched step length
+        step, new_yn, new_der, evals = search(evaluate, y, yn, der, -der, alpha, **options)
+        n_evals += evals
+        if step is None:
+            # No decrease is possible along -der in floating point, which
+            # is a solution only if y already meets the threshold
+            if _converged(criterion, der, y - xn, epsilon):
+                yield OptimizeState(i, y, yn, der, 0*der, n_evals)
+                return 'converged'
+            yield OptimizeState(i, y, yn, der, None, n_evals)
+            return 'line search failed'
+        new_xn = y - step*der
+        yield OptimizeState(i, y, yn, der, new_xn - y, n_evals)
+        if _converged(criterion, der, new_xn - xn, epsilon):
+            return 'converged'
+
+        # Backtracking can only shrink the step, so let it grow again,
+        # except with momentum, which needs non-increasing steps
+        alpha = 2*step if search is _armijo_search and not momentum else step
+
+        # Nesterov's momentum update, with the reset condition
+        new_t = 0.5*(1 + math.sqrt(1 + 4*t**2)) if momentum else 1.0
+        coefficient = (t - 1.0)/new_t
+        if np.dot(y - new_xn, new_xn - xn) > 0:
+            coefficient, new_t = 0.0, 1.0
+        if coefficient == 0:
+            y, yn, der = new_xn, new_yn, new_der
+        else:
+            y = new_xn + coefficient*(new_xn - xn)
+            yn, der = evaluate(y)
+            n_evals += 1
+        xn = new_xn
+        t = new_t
+    return 'max iters'
+
+
+def _descent_steps(f, x0, epsilon, max_iters, eta, criterion, line_search, momentum):
+    '''
+    Helper that parses 'f', checks the options of grad_descent and
+    nesterov_grad_descent, and returns the matching solver generator.
+    '''
+    # Create a DreamDiff object to access private methods
+    x = ad(1.0)
+
+    # Parse the input function string
+    f_parsed = x._parse_input(f) if isinstance(f, str) else f
+    if criterion not in ('step', 'grad'):
+        raise Exception(f'invalid convergence criterion: {criterion}')
+
+    # A 0-d array, e.g. np.array(1.0), is a scalar starting point
+    if not np.isscalar(x0) and np.ndim(x0) == 0:
+        x0 = float(x0)
+
+    # With a line search, each trial step costs one evaluation
+    if line_search is not None:
+        if line_search not in ('armijo', 'wolfe'):
+            raise Exception(f'invalid line search: {line_search}')
+        if np.isscalar(x0):
+            evaluate = lambda a: _evaluate_scalar(x, f_parsed, a)
+        else:
+            evaluate = lambda a: _evaluate_vector(f_parsed, a)
+        return _line_search_steps(evaluate, x0, epsilon, max_iters, eta, criterion, line_search, momentum)
+
+    # Vector starting points are updated in place
+    if not np.isscalar(x0):
+        return _vector_descent_steps(f_parsed, x0, epsilon, max_iters, eta, criterion, momentum)
+    return _scalar_descent_steps(x, f_parsed, x0, epsilon, max_iters, eta, criterion, momentum)
+
+
+def _newton_steps(x, function, x0, epsilon, max_iters):
+    '''
+    Helper generator for Newton's method from the scalar point 'x0'.
+    '''
+    xn = x0
+    for i in range(max_iters):
+        yn, der = _evaluate_scalar(x, function, xn)
+        if abs(yn) < epsilon:
+            yield OptimizeState(i, xn, yn, der, 0.0, i + 1)
+            return 'converged'
+        if der == 0:
+            yield OptimizeState(i, xn, yn, der, None, i + 1)
+            return 'zero derivative'
+        step = -yn/der
+        yield OptimizeState(i, xn, yn, der, step, i + 1)
+        xn = xn + step
+    return 'max iters'
+
+
+def _lbfgs_steps(function, x0, epsilon, max_iters, m):
+    '''
+    Helper generator for L-BFGS from the point 'x0'. The iterate, gradient,
+    and curvature pairs live in preallocated arrays, which the yielded
+    states share.
+    '''
+    evaluate = lambda point: _evaluate_vector(function, point)
+    xn = np.array(x0, dtype=float, ndmin=1)
+    n = len(xn)
+
+    # Ring buffer of curvature pairs s = x_new - x and y = g_new - g
+    S = np.empty((m, n))
+    Y = np.empty((m, n))
+    rho = np.empty(m)
+    a = np.empty(m)
+    q = np.empty(n)
+    stored = 0
+    newest = -1
+
+    yn, grad = evaluate(xn)
+    n_evals = 1
+
+    for i in range(max_iters + 1):
+        norm = np.linalg.norm(grad)
+        if norm < epsilon:
+            yield OptimizeState(i, xn, yn, grad, np.zeros(n), n_evals)
+            return 'converged'
+        if i == max_iters:
+            break
+
+        # Two-loop recursion for the direction -H g, newest pair first
+        np.copyto(q, grad)
+        for k in range(stored):
+            j = (newest - k) % m
+            a[j] = rho[j]*(S[j] @ q)
+            q -= a[j]*Y[j]
+        if stored:
+            q *= (S[newest] @ Y[newest]) / (Y[newest] @ Y[newest])
+        for k in range(stored - 1, -1, -1):
+            j = (newest - k) % m
+            q += (a[j] - rho[j]*(Y[j] @ q))*S[j]
+        d = np.negative(q, out=q)
+
+        # Without curvature information, scale the first step to unit length
+        alpha = 1.0 if stored else min(1.0, 1 / norm)
+        step, new_yn, new_grad, evals = _wolfe_search(evaluate, xn, yn, grad, d, alpha)
+        n_evals += evals
+        if step is None:
+            yield OptimizeState(i, xn, yn, grad, None, n_evals)
+            return 'line search failed'
+
+        # Store the new curvature pair, overwriting the oldest, unless
+        # it lacks positive curvature
+        slot = (newest + 1) % m
+        np.multiply(d, step, out=S[slot])
+        np.subtract(new_grad, grad, out=Y[slot])
+        yield OptimizeState(i, xn, yn, grad, S[slot], n_evals)
+        xn += S[slot]
+        sy = S[slot] @ Y[slot]
+        if sy > 0:
+            rho[slot] = 1 / sy
+            newest = slot
+            stored = min(stored + 1, m)
+        elif stored == m:
+            stored -= 1
+        yn, grad = new_yn, new_grad
+    return 'max iters'
+
+
+def _inverse_quadratic(a, fa, b, fb, c, fc):
+    '''
+    Helper that returns the root of the inverse quadratic through (a, fa),
+    (b, fb) and (c, fc), or of the secant through the first two points if
+    the function values are not distinct.
+    '''
+    if fa != fc and fb != fc and fa != fb:
+        return (a*fb*fc/((fa - fb)*(fa - fc)) + b*fa*fc/((fb - fa)*(fb - fc))
+                + c*fa*fb/((fc - fa)*(fc - fb)))
+    if fa != fb:
+        return a - fa*(a - b)/(fa - fb)
+    return math.nan
+
+
+def _hybrid_steps(function, lo, hi, f_lo, f_hi, epsilon, max_iters, x0, steps, evals=0):
+    '''
+    Helper generator that finds a root of 'function' in the bracket
+    [lo, hi], whose ends have function values 'f_lo' and 'f_hi' of opposite
+    sign, starting from 'x0' (the midpoint if None). Each evaluation gives
+    the value and derivative, and shrinks the bracket. The next point is
+    the Newton step if it lies inside the bracket, otherwise the inverse
+    quadratic (or secant) step through the last two points and the far
+    end, otherwise the midpoint. A bisection is forced whenever the bracket
+    has not halved over two steps, so the number of evaluations is bounded
+    by about 3*log2((hi - lo)/epsilon). Yields an OptimizeState per
+    evaluation, with 'evals' evaluations counted before the first, counts
+    the 'newton', 'interpolation' and 'bisection' steps in the dict
+    'steps', and returns the final status.
+    '''
+    xn = 0.5*(lo + hi) if x0 is None else x0
+    previous = None
+    widths = [math.inf, math.inf]
+    for i in range(max_iters):
+        yn, der = _evaluate_scalar(None, function, xn)
+        if abs(yn) < epsilon:
+            yield OptimizeState(i, xn, yn, der, 0.0, evals + i + 1)
+            return 'converged'
+
+        # Shrink the bracket, keeping the sign change inside
+        if (yn < 0) == (f_lo < 0):
+            lo, f_lo = xn, yn
+        else:
+            hi, f_hi = xn, yn
+        if hi - lo < epsilon:
+            yield OptimizeState(i, xn, yn, der, 0.5*(lo + hi) - xn, evals + i + 1)
+            return 'converged'
+
+        kind, new_xn = 'bisection', 0.5*(lo + hi)
+        if hi - lo <= 0.5*widths[0]:
+            candidate = xn - yn/der if der != 0 else math.nan
+            if lo < candidate < hi:
+                kind, new_xn = 'newton', candidate
+            elif previous is not None:
+                far, f_far = (hi, f_hi) if xn == lo else (lo, f_lo)
+                candidate = _inverse_quadratic(xn, yn, far, f_far, *previous)
+                if lo < candidate < hi:
+                    kind, new_xn = 'interpolation', candidate
+        steps[kind] += 1
+        widths = [widths[1], hi - lo]
+        previous = (xn, yn)
+        yield OptimizeState(i, xn, yn, der, new_xn - xn, evals + i + 1)
+        xn = new_xn
+    return 'max iters'
+
+
+def _hybrid_root(function, lo, hi, f_lo, f_hi, epsilon, max_iters, x0=None):
+    '''
+    Helper that runs _hybrid_steps to the end. Returns the 3-tuple (root,
+    number of evaluations, dict of the number of 'newton', 'interpolation'
+    and 'bisection' steps), where root is None if 'max_iters' is reached.
+    '''
+    steps = {'newton': 0, 'interpolation': 0, 'bisection': 0}
+    state, status = _finish(_hybrid_steps(function, lo, hi, f_lo, f_hi, epsilon, max_iters, x0, steps))
+    if status != 'converged':
+        return None, max_iters, steps
+    return state.x + state.step, state.evals, steps
+
+
+def _root_found(state):
+    '''
+    Helper generator that yields the single state of a root found without
+    iterating.
+    '''
+    yield state
+    return 'converged'
+
+
+def _bracketed_steps(f, a, b, x0, epsilon, max_iters, steps):
+    '''
+    Helper that parses 'f', checks the bracket [a, b] and 'x0' of
+    hybrid_newton, and returns its solver generator, which counts the kinds
+    of steps in the dict 'steps'.
+    '''
+    if a >= b:
+        raise AssertionError('a must be less than b')
+    if x0 is not None and not a <= x0 <= b:
+        raise AssertionError('x0 must lie in the bracket [a, b]')
+
+    # Create a DreamDiff object to access private methods
+    x = ad(1.0)
+
+    # Parse the input function string
+    f_parsed = x._parse_input(f) if isinstance(f, str) else f
+
+    # The ends of the bracket may already be roots
+    f_a, der_a = _evaluate_scalar(x, f_parsed, a)
+    f_b, der_b = _evaluate_scalar(x, f_parsed, b)
+    for end, value, der in ((a, f_a, der_a), (b, f_b, der_b)):
+        if abs(value) < epsilon:
+            return _root_found(OptimizeState(0, end, value, der, 0.0, 2))
+    if (f_a < 0) == (f_b < 0):
+        raise AssertionError('f(a) and f(b) must have opposite signs')
+    return _hybrid_steps(f_parsed, a, b, f_a, f_b, epsilon, max_iters, x0, steps, 2)
+
+
+def _init_root_worker(function, epsilon, max_iters):
+    '''
+    Helper that stores the function and settings in a worker process.
+    '''
+    _root_worker['function'] = function
+    _root_worker['epsilon'] = epsilon
+    _root_worker['max_iters'] = max_iters
+
+
+def _bracket_roots(function, epsilon, max_iters, lo, hi, f_lo, f_hi):
+    '''
+    Helper that runs _hybrid_root on each bracket [lo[j], hi[j]], with end
+    values f_lo[j] and f_hi[j], and returns the roots found. Sign changes
+    across a pole converge to the pole, where |f| grows rather than
+    shrinks, so those results are dropped.
+    '''
+    roots = []
+    for j in range(len(lo)):
+        root = _hybrid_root(function, lo[j], hi[j], f_lo[j], f_hi[j], epsilon, max_iters)[0]
+        if root is not None and abs(_evaluate_scalar(None, function, root)[0]) <= min(abs(f_lo[j]), abs(f_hi[j])):
+            roots.append(root)
+    return roots
+
+
+def _worker_roots(lo, hi, f_lo, f_hi):
+    '''
+    Helper that runs _bracket_roots in a worker process with the function
+    and settings stored by _init_root_worker.
+    '''
+    return _bracket_roots(_root_worker['function'], _root_worker['epsilon'], _root_worker['max_iters'],
+                          lo, hi, f_lo, f_hi)
+
+
 class Optimize:
     '''
     Class containing a suite of root-finding, optimization, and
@@ -35,48 +981,463 @@ class Optimize:
         If no root is found or a zero derivative is reacahed, None is 
         returned.
         '''
-        # Initialize xn at the starting point
-        xn = x0
+        state, status, history = _run(Optimize.newtons_method_iter(f, x0, epsilon, max_iters))
+        solution = _report(state, status)
+        if solution is None:
+            return None
+        return (solution,) + history
+
+
+    def newtons_method_iter(f, x0, epsilon=0.000001, max_iters=500, callback=None):
+        '''
+        Runs Newton's method as newtons_method does, but yields the state
+        of each iteration instead of printing and keeping a history.
 
+        INPUTS
+        ======
+        f: str, required
+            Input function on which to perform Newton's method.
+        x0: int or float, required
+            Starting x-value at which to initialize the algorithm.
+        epsilon: int or float, optional
+            Solution accuracy threshold.
+        max_iters: int, optional
+            The maximum number of times to run the algorithm.
+        callback: function, optional, default is None
+            Called with each state after it is yielded. If it returns
+            True, the iteration stops.
+
+        RETURNS
+        =======
+        A generator of OptimizeState tuples (iteration, x, f, grad, step,
+        evals), one per evaluation, where the next iterate is x + step.
+        The generator's return value is 'converged', 'max iters', 'zero
+        derivative', or 'stopped' (by the callback).
+
+        EXAMPLES
+        ========
+        >>> for state in Optimize.newtons_method_iter('x^2 - 2', 1.0):
+        ...     print(state.iteration, state.x)
+        0 1.0
+        1 1.5
+        2 1.4166666666666667
+        3 1.4142156862745099
+        4 1.4142135623746899
+        '''
         # Create a DreamDiff object to access private methods
-        x = ad(1.0) 
+        x = ad(1.0)
 
         # Parse the input function string
         f_parsed = x._parse_input(f)
+        return _with_callback(_newton_steps(x, f_parsed, x0, epsilon, max_iters), callback)
 
-        # Initialize empty lists to hold results
-        xn_history = []
-        yn_history = []
-        der_history = []
 
-        # Run the algorithm at most 'max_iters' times
-        for i in range(max_iters):
+    def newtons_system(f, x0, epsilon=0.000001, max_iters=100, refresh=1):
+        '''
+        Implements Newton's root-finding method for systems of equations
+        F(x) = 0. The Jacobian is computed with DreamDiff and LU-factorized,
+        and the factorization is reused for the following Newton steps:
+        refresh=1 gives Newton's method, refresh=m > 1 recomputes the
+        Jacobian every m iterations (Shamanskii's method), and refresh=None
+        keeps the first Jacobian (the chord method). A stale Jacobian is
+        also recomputed whenever the residual norm fails to decrease.
 
-            # Calculate values, derivatives, and store in lists
-            xn_history.append(xn)
-            new_f = x._evaluate_function(f_parsed, xn)
-            yn = new_f.val[0]
-            der = new_f.der[0]
-            yn_history.append(yn)
-            der_history.append(der)
-
-            # If threshold is met, terminate the algorithm and return results
-            if abs(yn) < epsilon:
-                print('Found solution after {} iterations.'.format(i))
-                print('Solution is: {}'.format(xn))
-                return (xn, xn_history, yn_history, der_history)
-            
-            # If a zero derivative is reached, terminate the algorithm and
-            # return None
-            if der == 0:
-                print('Reached zero derivative. No solution found.')
-                return None
+        INPUTS
+        ======
+        f: str or function, required
+            Vector function of 'n' variables, as a string in terms of x[0],
+            x[1], ... (e.g. '[x[0]^2 - 2, x[0]*x[1] - 1]'), or as a function
+            taking a list of variables and returning a DreamDiff object or
+            a list.
+        x0: list or np.ndarray, required
+            Starting point of length 'n'.
+        epsilon: int or float, optional
+            Solution accuracy threshold on the norm of F(x).
+        max_iters: int, optional
+            The maximum number of Newton steps.
+        refresh: int or None, optional, default is 1
+            Number of iterations between Jacobian evaluations, or None to
+            never recompute the Jacobian unless progress stalls.
+
+        RETURNS
+        =======
+        If a root is found, the algorithm returns it as an np.ndarray, a
+        list of the residual norms at each iteration, and the number of
+        Jacobian evaluations in a 3-tuple. If no root is found or a
+        singular Jacobian is reached, None is returned.
+
+        EXAMPLES
+        ========
+        >>> x, norms, n_jac = Optimize.newtons_system('[x[0]^2 - 2, x[0]*x[1] - 1]', [1.0, 1.0])
+        Found solution after 4 iterations.
+        >>> x
+        array([1.41421356, 0.70710678])
+        '''
+        steps = Optimize.newtons_system_iter(f, x0, epsilon, max_iters, refresh)
+        return _system_results(steps, ('jacobian',))
+
+
+    def newtons_system_iter(f, x0, epsilon=0.000001, max_iters=100, refresh=1, callback=None):
+        '''
+        Runs Newton's method for systems as newtons_system does, but yields
+        the state of each iteration instead of printing and keeping the
+        residual norms, so long runs use constant memory and can be
+        stopped early.
+
+        INPUTS
+        ======
+        f, x0, epsilon, max_iters, refresh: as for newtons_system.
+        callback: function, optional, default is None
+            Called with each state after it is yielded. If it returns
+            True, the iteration stops.
+
+        RETURNS
+        =======
+        A generator of SystemState tuples (iteration, x, residual, norm,
+        step, evals), one per iteration, where the next iterate is
+        x + step and evals is a dict with the number of 'jacobian'
+        evaluations. The generator's return value is 'converged', 'max
+        iters', 'singular jacobian', or 'stopped' (by the callback).
+
+        EXAMPLES
+        ========
+        >>> for state in Optimize.newtons_system_iter('[x[0]^2 - 2, x[0]*x[1] - 1]', [1.0, 1.0]):
+        ...     print(state.iteration, state.norm < 1e-6)
+        0 False
+        1 False
+        2 False
+        3 False
+        4 True
+        '''
+        if refresh is not None and refresh < 1:
+            raise AssertionError('refresh must be a positive integer or None')
+        function = _system_function(f)
+        xn = np.array(x0, dtype=float, ndmin=1)
+        F = _residual(function, xn)
+        if len(F) != len(xn):
+            raise Exception('newtons_system requires as many equations as unknowns')
+        return _with_callback(_newton_system_steps(function, xn, F, epsilon, max_iters, refresh), callback)
+
+
+    def broyden(f, x0, epsilon=0.000001, max_iters=100, method='good'):
+        '''
+        Implements Broyden's quasi-Newton root-finding method for systems of
+        equations F(x) = 0. The inverse Jacobian is seeded from a single
+        DreamDiff Jacobian and then updated with rank-one corrections, so
+        each iteration needs only one evaluation of F. The Jacobian is
+        recomputed with DreamDiff only when an update fails to reduce the
+        residual norm.
+
+        INPUTS
+        ======
+        f: str or function, required
+            Vector function of 'n' variables, as for newtons_system.
+        x0: list or np.ndarray, required
+            Starting point of length 'n'.
+        epsilon: int or float, optional
+            Solution accuracy threshold on the norm of F(x).
+        max_iters: int, optional
+            The maximum number of steps.
+        method: str, optional, default is 'good'
+            The update to use: 'good' for Broyden's first method, which
+            updates the Jacobian, or 'bad' for Broyden's second method,
+            which updates its inverse directly.
 
-            # Apply the Newton's method update to xn
-            xn = xn - yn/der
+        RETURNS
+        =======
+        If a root is found, the algorithm returns it as an np.ndarray, a
+        list of the residual norms at each iteration, the number of
+        Jacobian evaluations, and the number of evaluations of F (without
+        derivatives) in a 4-tuple. If no root is found or a singular
+        Jacobian is reached, None is returned.
+
+        EXAMPLES
+        ========
+        >>> x, norms, n_jac, n_eval = Optimize.broyden('[x[0]^2 - 2, x[0]*x[1] - 1]', [1.0, 1.0])
+        Found solution after 6 iterations.
+        >>> n_jac
+        1
+        '''
+        steps = Optimize.broyden_iter(f, x0, epsilon, max_iters, method)
+        return _system_results(steps, ('jacobian', 'residual'))
+
+
+    def broyden_iter(f, x0, epsilon=0.000001, max_iters=100, method='good', callback=None):
+        '''
+        Runs Broyden's method as broyden does, but yields the state of each
+        iteration as newtons_system_iter does.
 
-        # If no solution is found within 'max_iters', tell the user
-        print('No solution found after max iterations.')
+        INPUTS
+        ======
+        f, x0, epsilon, max_iters, method: as for broyden.
+        callback: function, optional, default is None
+            Called with each state after it is yielded. If it returns
+            True, the iteration stops.
+
+        RETURNS
+        =======
+        A generator of SystemState tuples, as for newtons_system_iter,
+        where evals is a dict with the number of 'jacobian' and 'residual'
+        evaluations.
+        '''
+        if method not in ('good', 'bad'):
+            raise Exception(f'invalid Broyden method: {method}')
+        function = _system_function(f)
+        xn = np.array(x0, dtype=float, ndmin=1)
+        F = _residual(function, xn)
+        if len(F) != len(xn):
+            raise Exception('broyden requires as many equations as unknowns')
+        return _with_callback(_broyden_steps(function, xn, F, epsilon, max_iters, method), callback)
+
+
+    def newton_krylov(f, x0, epsilon=0.000001, max_iters=100, restart=20, gmres_tol=0.01, max_restarts=50):
+        '''
+        Implements the Jacobian-free Newton-Krylov method for systems of
+        equations F(x) = 0. Each Newton step J(x) d = -F(x) is solved
+        approximately by restarted GMRES, where every product J v is one
+        DreamDiff forward pass seeded with the direction v. The Jacobian is
+        never formed, so memory is O(n*restart) rather than O(n^2). Steps
+        are shortened by backtracking until the residual norm decreases.
+
+        INPUTS
+        ======
+        f: str or function, required
+            Vector function of 'n' variables, as for newtons_system.
+        x0: list or np.ndarray, required
+            Starting point of length 'n'.
+        epsilon: int or float, optional
+            Solution accuracy threshold on the norm of F(x).
+        max_iters: int, optional
+            The maximum number of Newton steps.
+        restart: int, optional, default is 20
+            Number of Krylov vectors stored before GMRES restarts.
+        gmres_tol: int or float, optional, default is 0.01
+            Relative residual tolerance of each GMRES solve.
+        max_restarts: int, optional, default is 50
+            The maximum number of GMRES restarts per Newton step.
+
+        RETURNS
+        =======
+        If a root is found, the algorithm returns it as an np.ndarray, a
+        list of the residual norms at each iteration, and the number of
+        Jacobian-vector products in a 3-tuple. If no root is found or no
+        step reduces the residual, None is returned.
+
+        EXAMPLES
+        ========
+        >>> x, norms, n_jvp = Optimize.newton_krylov('[x[0]^2 - 2, x[0]*x[1] - 1]', [1.0, 1.0])
+        Found solution after 4 iterations.
+        >>> x
+        array([1.41421356, 0.70710678])
+        '''
+        steps = Optimize.newton_krylov_iter(f, x0, epsilon, max_iters, restart, gmres_tol, max_restarts)
+        return _system_results(steps, ('jvp',))
+
+
+    def newton_krylov_iter(f, x0, epsilon=0.000001, max_iters=100, restart=20, gmres_tol=0.01, max_restarts=50, callback=None):
+        '''
+        Runs the Jacobian-free Newton-Krylov method as newton_krylov does,
+        but yields the state of each iteration as newtons_system_iter does.
+
+        INPUTS
+        ======
+        f, x0, epsilon, max_iters, restart, gmres_tol, max_restarts: as
+            for newton_krylov.
+        callback: function, optional, default is None
+            Called with each state after it is yielded. If it returns
+            True, the iteration stops.
+
+        RETURNS
+        =======
+        A generator of SystemState tuples, as for newtons_system_iter,
+        where evals is a dict with the number of 'jvp' (Jacobian-vector
+        products). The generator's return value may also be 'line search
+        failed'.
+        '''
+        if restart < 1:
+            raise AssertionError('restart must be a positive integer')
+        if not 0 < gmres_tol < 1:
+            raise AssertionError('gmres_tol must be between 0 and 1')
+        function = _system_function(f)
+        xn = np.array(x0, dtype=float, ndmin=1)
+        F = _residual(function, xn)
+        if len(F) != len(xn):
+            raise Exception('newton_krylov requires as many equations as unknowns')
+        steps = _newton_krylov_steps(function, xn, F, epsilon, max_iters, restart, gmres_tol, max_restarts)
+        return _with_callback(steps, callback)
+
+
+    def hybrid_newton(f, a, b, x0=None, epsilon=0.000001, max_iters=100):
+        '''
+        Implements a safeguarded Newton root-finding method for scalar
+        functions on a bracket [a, b] where the function changes sign.
+        Newton steps, with derivatives from DreamDiff, are taken while they
+        stay inside the bracket, which shrinks at every evaluation; other
+        steps use inverse quadratic interpolation or bisection. Unlike
+        newtons_method, a zero derivative or an oscillating iteration
+        cannot stop it, and the number of evaluations is bounded by about
+        3*log2((b - a)/epsilon).
+
+        INPUTS
+        ======
+        f: str or function, required
+            Input function on which to perform the method.
+        a: int or float, required
+            Left end of the bracket.
+        b: int or float, required
+            Right end of the bracket, where f has the opposite sign to f(a).
+        x0: int or float, optional, default is None
+            Starting x-value inside the bracket. If None, the midpoint is
+            used.
+        epsilon: int or float, optional
+            Solution accuracy threshold, on |f| or on the bracket width.
+        max_iters: int, optional
+            The maximum number of evaluations inside the bracket.
+
+        RETURNS
+        =======
+        If a root is found, the algorithm returns its x-value, the number
+        of function evaluations (including the two ends), and a dict with
+        the number of 'newton', 'interpolation', and 'bisection' steps in a
+        3-tuple. If no root is found, None is returned.
+
+        EXAMPLES
+        ========
+        >>> root, n_evals, steps = Optimize.hybrid_newton('x^3 - 2*x + 2', -3, 0)
+        Found solution after 9 evaluations.
+        Solution is: -1.7692923542392525
+        >>> steps
+        {'newton': 4, 'interpolation': 1, 'bisection': 1}
+        '''
+        steps = {'newton': 0, 'interpolation': 0, 'bisection': 0}
+        state, status = _finish(_bracketed_steps(f, a, b, x0, epsilon, max_iters, steps))
+        if status != 'converged':
+            print(_FAILURES[status])
+            return None
+        root = state.x + state.step
+        print('Found solution after {} evaluations.'.format(state.evals))
+        print('Solution is: {}'.format(root))
+        return (root, state.evals, steps)
+
+
+    def hybrid_newton_iter(f, a, b, x0=None, epsilon=0.000001, max_iters=100, callback=None):
+        '''
+        Runs the safeguarded Newton method as hybrid_newton does, but
+        yields the state of each evaluation inside the bracket instead of
+        printing.
+
+        INPUTS
+        ======
+        f, a, b, x0, epsilon, max_iters: as for hybrid_newton.
+        callback: function, optional, default is None
+            Called with each state after it is yielded. If it returns
+            True, the iteration stops.
+
+        RETURNS
+        =======
+        A generator of OptimizeState tuples, as for grad_descent_iter,
+        where 'grad' is the derivative and 'evals' includes the two
+        evaluations at the ends of the bracket. If an end is a root, it is
+        the only state.
+
+        EXAMPLES
+        ========
+        >>> [round(state.x, 6) for state in Optimize.hybrid_newton_iter('x^2 - 2', 0, 2)]
+        [1.0, 1.5, 1.416667, 1.414216, 1.207108, 1.414213]
+        '''
+        steps = {'newton': 0, 'interpolation': 0, 'bisection': 0}
+        return _with_callback(_bracketed_steps(f, a, b, x0, epsilon, max_iters, steps), callback)
+
+
+    def find_roots(f, a, b, n_intervals=1000, epsilon=0.000001, max_iters=100, workers=None, tol=None):
+        '''
+        Finds all roots of a scalar function on the interval [a, b]. The
+        interval is split into 'n_intervals' subintervals, the function is
+        evaluated at their ends in one vectorized pass without derivatives,
+        and the safeguarded iteration of hybrid_newton is run on each
+        subinterval where the sign changes. The brackets are shared across
+        a pool of processes. Roots where the function touches zero without
+        changing sign are only found if they fall on a grid point.
+
+        INPUTS
+        ======
+        f: str or function, required
+            Input function of one variable.
+        a: int or float, required
+            Left end of the interval.
+        b: int or float, required
+            Right end of the interval.
+        n_intervals: int, optional, default is 1000
+            Number of subintervals to search. Should be large enough that
+            no subinterval contains more than one root.
+        epsilon: int or float, optional
+            Solution accuracy threshold.
+        max_iters: int, optional
+            The maximum number of iterations per bracket.
+        workers: int, optional, default is None
+            Number of worker processes. If None, the number of CPUs is
+            used. With one worker or fewer than 64 brackets, the search
+            runs serially.
+        tol: int or float, optional, default is None
+            Roots closer than 'tol' are reported once. If None, 10 times
+            'epsilon' is used.
+
+        RETURNS
+        =======
+        A sorted np.ndarray of the roots found (empty if there are none).
+
+        EXAMPLES
+        ========
+        >>> np.round(Optimize.find_roots('cos(x)', 0, 10), 6)
+        array([1.570796, 4.712389, 7.853982])
+        '''
+        if a >= b:
+            raise AssertionError('a must be less than b')
+        if n_intervals < 1:
+            raise AssertionError('n_intervals must be a positive integer')
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise AssertionError('workers must be a positive integer')
+        if tol is None:
+            tol = 10*epsilon
+
+        # Create a DreamDiff object to access private methods
+        x = ad(1.0)
+
+        # Parse the input function string
+        f_parsed = x._parse_input(f) if isinstance(f, str) else f
+
+        # Value-only evaluation of the grid
+        grid = np.linspace(a, b, n_intervals + 1)
+        with np.errstate(all='ignore'):
+            if hasattr(f_parsed, 'values'):
+                values = f_parsed.values(grid)
+            else:
+                values = x._evaluate_batch(f_parsed, grid).val
+        values = np.broadcast_to(np.asarray(values, dtype=float), grid.shape)
+
+        # Grid points that are roots, and brackets of sign changes
+        roots = list(grid[values == 0])
+        brackets = np.flatnonzero(np.sign(values[:-1])*np.sign(values[1:]) < 0)
+        args = (grid[brackets], grid[brackets + 1], values[brackets], values[brackets + 1])
+
+        if workers == 1 or len(brackets) < _SERIAL_BRACKETS:
+            roots += _bracket_roots(f_parsed, epsilon, max_iters, *args)
+        else:
+            chunks = np.array_split(np.arange(len(brackets)), workers)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_root_worker,
+                                     initargs=(f_parsed, epsilon, max_iters)) as executor:
+                for result in executor.map(_worker_roots, *[[arg[chunk] for chunk in chunks] for arg in args]):
+                    roots += result
+
+        # Sort, and report roots closer than 'tol' once
+        roots = np.sort(np.array(roots, dtype=float))
+        if len(roots) == 0:
+            return roots
+        return roots[np.concatenate(([True], np.diff(roots) > tol))]
 
 
     def animate_newtons(f, x0, epsilon=0.000001, max_iters=500, runtime=20): 
@@ -124,8 +1485,9 @@ class Optimize:
             # Parse the input function string
             f_parsed = x._parse_input(f)
 
-            # Calculate the values of the input function in the range of x-vals searched
-            f_vals = [x._evaluate_function(f_parsed, t).val[0] for t in t_vals]
+            # Calculate the values of the input function in the range of x-vals
+            # searched, in one vectorized value-only call with no derivatives
+            f_vals = f_parsed.values(t_vals)
           
             # Initialize the animation
             fig = plt.figure()
@@ -155,22 +1517,37 @@ class Optimize:
             return None
 
 
-    def grad_descent(f, x0, epsilon=0.000001, max_iters=500, eta=0.1):
+    def grad_descent(f, x0, epsilon=0.000001, max_iters=500, eta=0.1, criterion='step', line_search=None):
         '''
-        Implements the gradient descent optimization algorithm.
+        Implements the gradient descent optimization algorithm. If 'x0' is
+        a vector, the gradient is computed in one pass from a seeded
+        DreamDiff vector and the iterate is updated in place, so there is
+        no Python loop over the coordinates.
 
         INPUTS
         ======
-        f: str, required
-            Input function on which to perform gradient descent.
-        x0: int or float, required
-            Starting x-value at which to initialize the algorithm.
+        f: str or function, required
+            Input function on which to perform gradient descent. For a
+            vector 'x0', either a string in terms of x[0], x[1], ... or a
+            function of a DreamDiff vector, e.g.
+            lambda x: ((x - 1)**2).sum().
+        x0: int, float, list, or np.ndarray, required
+            Starting point at which to initialize the algorithm.
         epsilon: int or float, optional
             Solution accuracy threshold.
         max_iters: int, optional
             The maximum number of times to run the algorithm.
         eta: int or float, optional
             The learning rate, which controls the algorithm step size.
+        criterion: str, optional, default is 'step'
+            Stop when the norm of the step ('step') or of the gradient
+            ('grad') is below 'epsilon'.
+        line_search: str, optional, default is None
+            If 'armijo' (backtracking) or 'wolfe' (strong Wolfe), each step
+            length is found by a line search starting from 'eta', which
+            then only sets the initial trial step. Every trial step is
+            evaluated with its derivative in a single pass, and that
+            derivative is reused by the next iteration.
 
         RETURNS
         =======
@@ -178,67 +1555,74 @@ class Optimize:
         containing the previous points at which the derivative was 
         evaluated, a list of the function's values at those points, and
         a list of the function's derivatives at those points in a 4-tuple.
-        If no minimum is found, None is returned.
+        With a line search, the number of function evaluations is appended
+        as a fifth element. If no minimum is found, None is returned.
         '''
-        # Initialize xn at the starting point
-        xn = x0
+        steps = Optimize.grad_descent_iter(f, x0, epsilon, max_iters, eta, criterion, line_search)
+        return _descent_results(steps, line_search)
 
-        # Create a DreamDiff object to access private methods
-        x = ad(1.0)
-
-        # Parse the input function string
-        f_parsed = x._parse_input(f)
-
-        # Initialize empty lists to hold results
-        xn_history = []
-        yn_history = []
-        der_history = []
-        
-        # Run the algorithm at most 'max_iters' times
-        for i in range(max_iters):
-
-            # Calculate values, derivatives, and store in lists
-            xn_history.append(xn)
-            new_f = x._evaluate_function(f_parsed, xn)
-            yn = new_f.val[0]
-            der = new_f.der[0]
-            yn_history.append(yn)
-            der_history.append(der)
-            
-            # Apply the gradient descent update (scaled by learning rate)
-            new_xn = xn - eta*der
 
-            # If threshold is met, terminate the algorithm and return results
-            if abs(new_xn - xn) < epsilon:
-                print('Found solution after {} iterations.'.format(i))
-                print('Solution is: {}'.format(new_xn))
-                return (new_xn, xn_history, yn_history, der_history)
+    def grad_descent_iter(f, x0, epsilon=0.000001, max_iters=500, eta=0.1, criterion='step', line_search=None, callback=None):
+        '''
+        Runs gradient descent as grad_descent does, but yields the state of
+        each iteration instead of printing and keeping a history, so long
+        runs use constant memory and can be stopped early.
 
-            # Update xn
-            xn = new_xn
+        INPUTS
+        ======
+        f, x0, epsilon, max_iters, eta, criterion, line_search: as for
+            grad_descent.
+        callback: function, optional, default is None
+            Called with each state after it is yielded. If it returns
+            True, the iteration stops.
 
-        # If no solution is found within 'max_iters', tell the user and return None
-        print('No solution found after max iterations.')
-        return None
+        RETURNS
+        =======
+        A generator of OptimizeState tuples (iteration, x, f, grad, step,
+        evals), one per iteration, where the next iterate is x + step. For
+        a vector 'x0', the arrays in a state are updated in place by later
+        iterations and must be copied to be kept. The generator's return
+        value is 'converged', 'max iters', 'line search failed', or
+        'stopped' (by the callback).
+
+        EXAMPLES
+        ========
+        >>> steps = Optimize.grad_descent_iter('(x - 1)^2', 0.0, callback=lambda s: s.f < 0.01)
+        >>> [round(state.f, 4) for state in steps]
+        [1.0, 0.64, 0.4096, 0.2621, 0.1678, 0.1074, 0.0687, 0.044, 0.0281, 0.018, 0.0115, 0.0074]
+        '''
+        steps = _descent_steps(f, x0, epsilon, max_iters, eta, criterion, line_search, False)
+        return _with_callback(steps, callback)
 
 
-    def nesterov_grad_descent(f, x0, epsilon, max_iters, eta):
+    def nesterov_grad_descent(f, x0, epsilon, max_iters, eta, criterion='step', line_search=None):
         '''
         Implements Nesterov's accelerated gradient descent 
         optimization algorithm, which uses a momentum parameter 't'.
+        Vector starting points are handled as in grad_descent.
 
         INPUTS
         ======
-        f: str, required
-            Input function on which to perform gradient descent.
-        x0: int or float, required
-            Starting x-value at which to initialize the algorithm.
+        f: str or function, required
+            Input function on which to perform gradient descent, as for
+            grad_descent.
+        x0: int, float, list, or np.ndarray, required
+            Starting point at which to initialize the algorithm.
         epsilon: int or float, optional
             Solution accuracy threshold.
         max_iters: int, optional
             The maximum number of times to run the algorithm.
         eta: int or float, optional
             The learning rate, which controls the algorithm step size.
+        criterion: str, optional, default is 'step'
+            Stop when the norm of the step ('step') or of the gradient
+            ('grad') is below 'epsilon'.
+        line_search: str, optional, default is None
+            If 'armijo' (backtracking) or 'wolfe' (strong Wolfe), each step
+            length is found by a line search starting from 'eta', which
+            then only sets the initial trial step. Every trial step is
+            evaluated with its derivative in a single pass, and that
+            derivative is reused by the next iteration.
 
         RETURNS
         =======
@@ -246,66 +1630,207 @@ class Optimize:
         containing the previous points at which the derivative was 
         evaluated, a list of the function's values at those points, and
         a list of the function's derivatives at those points in a 4-tuple.
-        If no minimum is found, None is returned.
+        With a line search, the number of function evaluations is appended
+        as a fifth element. If no minimum is found, None is returned.
         '''
-        # Initialize xn at the starting point
-        xn = x0
+        steps = Optimize.nesterov_grad_descent_iter(f, x0, epsilon, max_iters, eta, criterion, line_search)
+        return _descent_results(steps, line_search)
 
-        # Create a DreamDiff object to access private methods
-        x = ad(1.0)
 
-        # Initialize the momentum coefficient
-        t = 1.0
+    def nesterov_grad_descent_iter(f, x0, epsilon, max_iters, eta, criterion='step', line_search=None, callback=None):
+        '''
+        Runs Nesterov's accelerated gradient descent as
+        nesterov_grad_descent does, but yields the state of each iteration
+        as grad_descent_iter does. The point 'x' of a state is the
+        extrapolated point at which the derivative was evaluated.
 
-        # Initialize the y-value
-        y = x0
+        INPUTS
+        ======
+        f, x0, epsilon, max_iters, eta, criterion, line_search: as for
+            nesterov_grad_descent.
+        callback: function, optional, default is None
+            Called with each state after it is yielded. If it returns
+            True, the iteration stops.
 
-        # Parse the input function string
-        f_parsed = x._parse_input(f)
+        RETURNS
+        =======
+        A generator of OptimizeState tuples, as for grad_descent_iter.
+        '''
+        steps = _descent_steps(f, x0, epsilon, max_iters, eta, criterion, line_search, True)
+        return _with_callback(steps, callback)
+    
+
+    def lbfgs(f, x0, epsilon=0.000001, max_iters=500, m=10):
+        '''
+        Implements the limited-memory BFGS optimization algorithm. The last
+        'm' curvature pairs are kept in a preallocated ring buffer and the
+        search direction comes from the two-loop recursion, so memory is
+        O(m*n). Each step is chosen by a strong Wolfe line search, and every
+        trial point is evaluated with its gradient in one DreamDiff pass.
+
+        INPUTS
+        ======
+        f: str or function, required
+            Input function to minimize, as for grad_descent.
+        x0: int, float, list, or np.ndarray, required
+            Starting point at which to initialize the algorithm.
+        epsilon: int or float, optional
+            Solution accuracy threshold on the gradient norm.
+        max_iters: int, optional
+            The maximum number of iterations.
+        m: int, optional, default is 10
+            The number of curvature pairs stored.
+
+        RETURNS
+        =======
+        If a minimum is found, the algorithm returns it as an np.ndarray, a
+        list of the function's values at each iterate, a list of the
+        gradient norms at each iterate, and the number of function and
+        gradient evaluations in a 4-tuple. If no minimum is found, None is
+        returned.
 
-        # Initialize empty lists to hold results
-        xn_history = []
+        EXAMPLES
+        ========
+        >>> x, ys, norms, n_evals = Optimize.lbfgs('100*(x[1] - x[0]^2)^2 + (1 - x[0])^2', [-1.2, 1.0])
+        Found solution after 36 iterations.
+        >>> np.round(x, 6)
+        array([1., 1.])
+        '''
         yn_history = []
-        der_history = []
+        norm_history = []
+        state = None
+        steps = Optimize.lbfgs_iter(f, x0, epsilon, max_iters, m)
+        while True:
+            try:
+                state = next(steps)
+            except StopIteration as stop:
+                status = stop.value
+                break
+            yn_history.append(state.f)
+            norm_history.append(np.linalg.norm(state.grad))
+
+        # If threshold is met, return the results
+        if status == 'converged':
+            print('Found solution after {} iterations.'.format(state.iteration))
+            return (state.x, yn_history, norm_history, state.evals)
+        print(_FAILURES[status])
+        return None
 
-        # Run the algorithm at most 'max_iters' times
-        for i in range(max_iters):
 
-            # Calculate values, derivatives, and store in lists
-            xn_history.append(xn)
-            new_f = x._evaluate_function(f_parsed, y)
-            yn = new_f.val[0]
-            der = new_f.der[0]
-            yn_history.append(yn)
-            der_history.append(der)
+    def lbfgs_iter(f, x0, epsilon=0.000001, max_iters=500, m=10, callback=None):
+        '''
+        Runs L-BFGS as lbfgs does, but yields the state of each iteration
+        instead of printing and keeping a history.
 
-            # Apply Nesterov's momentum update
-            new_t = 0.5*(1 + np.sqrt(1 + 4*t**2))
+        INPUTS
+        ======
+        f, x0, epsilon, max_iters, m: as for lbfgs.
+        callback: function, optional, default is None
+            Called with each state after it is yielded. If it returns
+            True, the iteration stops.
 
-            # Calculate the new gradient (scaled by learning rate)
-            new_xn = y - eta*der
-            new_y = new_xn + (t - 1.0)/(new_t)*(new_xn - xn)
+        RETURNS
+        =======
+        A generator of OptimizeState tuples, as for grad_descent_iter. The
+        step of a state is a row of the curvature pair buffer, which is
+        overwritten 'm' iterations later.
+
+        EXAMPLES
+        ========
+        >>> steps = Optimize.lbfgs_iter('100*(x[1] - x[0]^2)^2 + (1 - x[0])^2', [-1.2, 1.0])
+        >>> for state in steps:
+        ...     pass
+        >>> state.iteration, state.evals
+        (36, 45)
+        '''
+        if m < 1:
+            raise AssertionError('m must be a positive integer')
+        function = ad(1.0)._parse_input(f) if isinstance(f, str) else f
+        return _with_callback(_lbfgs_steps(function, x0, epsilon, max_iters, m), callback)
 
-            # If threshold is met, terminate the algorithm and return results
-            if abs(new_xn - xn) < epsilon:
-                print('Found solution after {} iterations.'.format(i))
-                print('Solution is: {}'.format(new_xn))
-                return (new_xn, xn_history, yn_history, der_history)
 
-            # Reset conditions
-            if np.dot(y - new_xn, new_xn - xn) > 0:
-                new_y = new_xn
-                new_t = 1
+    def multistart_grad_descent(f, x0, epsilon=0.000001, max_iters=500, eta=0.1, criterion='step'):
+        '''
+        Implements gradient descent from many starting points of a scalar
+        function at once. All starts advance in lockstep: each iteration is
+        a single batched DreamDiff evaluation over the starts that have not
+        converged, and each start stops when its own threshold is met.
 
-            # Update xn, y, t
-            xn = new_xn
-            y = new_y
-            t = new_t
+        INPUTS
+        ======
+        f: str or function, required
+            Input function of one variable on which to perform gradient
+            descent.
+        x0: list or np.ndarray, required
+            Starting x-values, one per run.
+        epsilon: int or float, optional
+            Solution accuracy threshold.
+        max_iters: int, optional
+            The maximum number of iterations of each run.
+        eta: int or float, optional
+            The learning rate, which controls the algorithm step size.
+        criterion: str, optional, default is 'step'
+            Stop a run when its step ('step') or derivative ('grad') is
+            below 'epsilon' in absolute value.
+
+        RETURNS
+        =======
+        A 6-tuple with, for each start, the final x-value, the function's
+        value there, the number of iterations, and whether the run
+        converged (as np.ndarrays), followed by the x-value and function
+        value of the best converged run (None and None if no run
+        converged).
+
+        EXAMPLES
+        ========
+        >>> results = Optimize.multistart_grad_descent('x^4 - 4*x^2 + x', [-3.0, 0.5, 3.0], eta=0.01)
+        Found solutions for 3 of 3 starts.
+        >>> results[0]
+        array([-1.47300182,  1.34699141,  1.3470035 ])
+        >>> results[4]
+        -1.4730018193634047
+        '''
+        if criterion not in ('step', 'grad'):
+            raise Exception(f'invalid convergence criterion: {criterion}')
+
+        # Create a DreamDiff object to access private methods
+        x = ad(1.0)
+
+        # Parse the input function string once for all starts
+        f_parsed = x._parse_input(f) if isinstance(f, str) else f
+
+        xn = np.array(x0, dtype=float).ravel()
+        iterations = np.zeros(len(xn), dtype=int)
+        active = np.ones(len(xn), dtype=bool)
+        converged = np.zeros(len(xn), dtype=bool)
+
+        for i in range(max_iters):
+            lanes = np.flatnonzero(active)
+            if len(lanes) == 0:
+                break
+
+            # One batched evaluation for every start still running
+            result = x._evaluate_batch(f_parsed, xn[lanes])
+            der = np.asarray(getattr(result, 'der', 0.0), dtype=float)
+            der = np.broadcast_to(der.reshape(len(lanes), -1)[:, 0] if der.ndim else der, lanes.shape)
+            step = eta*der
+            xn[lanes] -= step
+            iterations[lanes] += 1
+
+            # Freeze runs that meet the threshold or diverge
+            done = np.abs(der if criterion == 'grad' else step) < epsilon
+            converged[lanes[done]] = True
+            active[lanes[done | ~np.isfinite(xn[lanes])]] = False
+
+        result = x._evaluate_batch(f_parsed, xn)
+        values = np.array(getattr(result, 'val', result), dtype=float)
+        values = np.broadcast_to(values, xn.shape).copy()
+        print('Found solutions for {} of {} starts.'.format(converged.sum(), len(xn)))
+        if not converged.any():
+            return (xn, values, iterations, converged, None, None)
+        best = np.flatnonzero(converged)[np.argmin(values[converged])]
+        return (xn, values, iterations, converged, xn[best], values[best])
 
-        # If no solution is found within 'max_iters', tell the user and return None
-        print('No solution found after max iterations.')
-        return None
-    
 
     def animate_grad_desc(f, x0, epsilon=0.000001, max_iters=500, eta=0.1, method='grad', runtime=20): 
         '''
@@ -363,8 +1888,9 @@ class Optimize:
             # Parse the input function string
             f_parsed = x._parse_input(f)
 
-            # Calculate the values of the input function in the range of x-vals searched
-            f_vals = [x._evaluate_function(f_parsed, t).val[0] for t in t_vals]
+            # Calculate the values of the input function in the range of x-vals
+            # searched, in one vectorized value-only call with no derivatives
+            f_vals = f_parsed.values(t_vals)
           
             # Initialize the animation
             fig = plt.figure()
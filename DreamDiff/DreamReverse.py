@@ -0,0 +1,394 @@
+import numpy as np
+
+
+class Tape:
+    '''
+    Records the operations performed on DreamReverse variables. Each entry
+    of the tape is a node holding the (index, partial derivative) pairs of
+    the nodes it was computed from, so that gradients can be recovered with
+    a single backward sweep over the tape.
+    '''
+
+    def __init__(self):
+        self._parents = []
+        self._inputs = []
+
+    def __len__(self):
+        '''
+        Returns the number of nodes recorded on the tape.
+        '''
+        return len(self._parents)
+
+    def _record(self, val, parents):
+        '''
+        Internal method that appends a node computed from 'parents', a tuple
+        of (index, partial) pairs, and returns it as a DreamReverse object.
+        '''
+        self._parents.append(parents)
+        return DreamReverse(val, tape=self, _index=len(self._parents) - 1)
+
+    def _backward(self, index):
+        '''
+        Internal method that runs one backward sweep from the node at 'index'
+        and returns the adjoints of the tape's input variables.
+        '''
+        parents = self._parents
+        adjoint = [0.0]*(index + 1)
+        adjoint[index] = 1.0
+        for i in range(index, -1, -1):
+            a = adjoint[i]
+            if a == 0.0:
+                continue
+            for j, partial in parents[i]:
+                adjoint[j] += a*partial
+        return np.array([adjoint[k] if k <= index else 0.0 for k in self._inputs])
+
+
+class DreamReverse:
+
+    def __init__(self, val, tape=None, _index=None):
+        '''
+        Constructs a DreamReverse object on which to perform reverse mode
+        automatic differentiation. Every operation on DreamReverse objects
+        is recorded on a shared Tape, and the derivative of any result with
+        respect to all input variables is computed with one backward sweep.
+
+        INPUTS
+        ======
+        val: int or float, required
+            Value of the input variable.
+        tape: Tape, optional, default is None
+            Tape on which to record the variable. Variables of the same
+            function must share a tape; if None, a new tape is created.
+
+        RETURNS
+        =======
+        A DreamReverse object registered as an input variable of its tape.
+
+        EXAMPLES
+        ========
+        # Gradient of a scalar function of two inputs
+        >>> from DreamDiff.DreamDiff import Function
+        >>> x, y = DreamReverse.variables([2.0, 3.0])
+        >>> f = x*y + Function.sin(x)
+        >>> print(f)
+        Values:
+        [6.90929743]
+        Jacobian:
+        [2.58385316 2.        ]
+        '''
+        if isinstance(val, (list, np.ndarray)):
+            if len(val) != 1:
+                raise AssertionError('DreamReverse values must be scalars, use DreamReverse.variables for vector inputs')
+            val = val[0]
+        self._val = np.float64(val)
+        if tape is None:
+            tape = Tape()
+        self._tape = tape
+        if _index is None:
+            tape._parents.append(())
+            _index = len(tape._parents) - 1
+            tape._inputs.append(_index)
+        self._index = _index
+        self._grad = None
+
+    @staticmethod
+    def variables(values):
+        '''
+        Returns a list of DreamReverse input variables, one per element of
+        'values', recorded on a new shared tape.
+        '''
+        tape = Tape()
+        return [DreamReverse(v, tape=tape) for v in values]
+
+    @property
+    def tape(self):
+        '''
+        Returns the Tape on which the DreamReverse object is recorded.
+        '''
+        return self._tape
+
+    @property
+    def val(self):
+        '''
+        Returns the value of the DreamReverse object.
+        '''
+        return np.array([self._val])
+
+    @property
+    def der(self):
+        '''
+        Returns the gradient of the DreamReverse object with respect to the
+        input variables of its tape, in the order they were created. This
+        matches the Jacobian row of the equivalent DreamDiff object.
+        '''
+        if self._grad is None:
+            self._grad = self._tape._backward(self._index)
+        return self._grad
+
+    def _unary(self, val, partial):
+        '''
+        Internal method that records the result of a unary operation.
+        '''
+        return self._tape._record(val, ((self._index, partial),))
+
+    def _binary(self, other, val, partial_self, partial_other):
+        '''
+        Internal method that records the result of a binary operation.
+        '''
+        if other._tape is not self._tape:
+            raise Exception('DreamReverse variables must be recorded on the same tape')
+        return self._tape._record(val, ((self._index, partial_self), (other._index, partial_other)))
+
+    def __add__(self, other):
+        '''
+        Performs addition of self and other.
+        '''
+        try:
+            return self._binary(other, self._val + other._val, 1.0, 1.0)
+        except AttributeError:
+            return self._unary(self._val + other, 1.0)
+
+    def __radd__(self, other):
+        '''
+        Performs addition of other and self (commutative).
+        '''
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        '''
+        Performs subtraction of other from self.
+        '''
+        try:
+            return self._binary(other, self._val - other._val, 1.0, -1.0)
+        except AttributeError:
+            return self._unary(self._val - other, 1.0)
+
+    def __rsub__(self, other):
+        '''
+        Performs subtraction of self from other.
+        '''
+        return self._unary(other - self._val, -1.0)
+
+    def __mul__(self, other):
+        '''
+        Performs multiplication of self with other.
+        '''
+        try:
+            return self._binary(other, self._val*other._val, other._val, self._val)
+        except AttributeError:
+            return self._unary(self._val*other, other)
+
+    def __rmul__(self, other):
+        '''
+        Performs multiplication of other with self (commutative).
+        '''
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        '''
+        Performs division of self by other.
+        '''
+        try:
+            return self._binary(other, self._val / other._val, 1 / other._val, -self._val / other._val**2)
+        except AttributeError:
+            return self._unary(self._val / other, 1 / other)
+
+    def __rtruediv__(self, other):
+        '''
+        Performs division of other by self.
+        '''
+        return self._unary(other / self._val, -other / self._val**2)
+
+    def __pow__(self, other):
+        '''
+        Raises self to the power of other.
+        '''
+        try:
+            val = np.power(self._val, other._val)
+            return self._binary(other, val, other._val*np.power(self._val, other._val - 1), np.log(np.abs(self._val))*val)
+        except AttributeError:
+            if other == 0:
+                return self._unary(1.0, 0.0)
+            return self._unary(np.power(self._val, other), other*np.power(self._val, other - 1))
+
+    def __rpow__(self, other):
+        '''
+        Raises other to the power of self.
+        '''
+        val = np.power(other, self._val)
+        return self._unary(val, np.log(other)*val)
+
+    def __neg__(self):
+        '''
+        Negates the function value and derivative.
+        '''
+        return self._unary(-self._val, -1.0)
+
+    def __pos__(self):
+        '''
+        Applies the unary + operator to self.
+        '''
+        return self
+
+    def __abs__(self):
+        '''
+        Applies the absolute value to the function.
+        '''
+        return self._unary(abs(self._val), np.sign(self._val))
+
+    def __eq__(self, other):
+        '''
+        Returns True if self and other have the same values and derivatives,
+        False otherwise.
+        '''
+        try:
+            return (np.all(np.equal(self.val, other.val)) and np.all(np.equal(self.der, other.der)))
+        except AttributeError:
+            return ((self._val == other) and np.all(self.der == 1))
+
+    def __ne__(self, other):
+        '''
+        Returns False if self and other have the same values and derivatives,
+        True otherwise.
+        '''
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        '''
+        Returns True if the value of self is less than the value of other.
+        '''
+        try:
+            return self._val < other._val
+        except AttributeError:
+            return self._val < other
+
+    def __gt__(self, other):
+        '''
+        Returns True if the value of self is greater than the value of other.
+        '''
+        try:
+            return self._val > other._val
+        except AttributeError:
+            return self._val > other
+
+    def __le__(self, other):
+        '''
+        Returns True if the value of self is less than or equal to the value
+        of other.
+        '''
+        return not self.__gt__(other)
+
+    def __ge__(self, other):
+        '''
+        Returns True if the value of self is greater than or equal to the
+        value of other.
+        '''
+        return not self.__lt__(other)
+
+    def sin(self):
+        '''
+        Returns the sine of the DreamReverse object, recorded on its tape.
+        '''
+        return self._unary(np.sin(self._val), np.cos(self._val))
+
+    def cos(self):
+        '''
+        Returns the cosine of the DreamReverse object, recorded on its tape.
+        '''
+        return self._unary(np.cos(self._val), -np.sin(self._val))
+
+    def tan(self):
+        '''
+        Returns the tangent of the DreamReverse object, recorded on its tape.
+        '''
+        return self._unary(np.tan(self._val), 1 / np.cos(self._val)**2)
+
+    def arcsin(self):
+        '''
+        Returns the arcsine of the DreamReverse object, recorded on its tape.
+        '''
+        return self._unary(np.arcsin(self._val), 1 / np.sqrt(1 - self._val**2))
+
+    def arccos(self):
+        '''
+        Returns the arccosine of the DreamReverse object, recorded on its
+        tape.
+        '''
+        return self._unary(np.arccos(self._val), -1 / np.sqrt(1 - self._val**2))
+
+    def arctan(self):
+        '''
+        Returns the arctangent of the DreamReverse object, recorded on its
+        tape.
+        '''
+        return self._unary(np.arctan(self._val), 1 / (1 + self._val**2))
+
+    def sinh(self):
+        '''
+        Returns the sinh of the DreamReverse object, recorded on its tape.
+        '''
+        return self._unary(np.sinh(self._val), np.cosh(self._val))
+
+    def cosh(self):
+        '''
+        Returns the cosh of the DreamReverse object, recorded on its tape.
+        '''
+        return self._unary(np.cosh(self._val), np.sinh(self._val))
+
+    def tanh(self):
+        '''
+        Returns the tanh of the DreamReverse object, recorded on its tape.
+        '''
+        return self._unary(np.tanh(self._val), 1 / np.cosh(self._val)**2)
+
+    def sqrt(self):
+        '''
+        Returns the square root of the DreamReverse object, recorded on its
+        tape.
+        '''
+        val = np.sqrt(self._val)
+        return self._unary(val, 0.5 / val)
+
+    def exp(self):
+        '''
+        Returns the exponential of the DreamReverse object, recorded on its
+        tape.
+        '''
+        val = np.exp(self._val)
+        return self._unary(val, val)
+
+    def log(self):
+        '''
+        Returns the log (base e) of the DreamReverse object, recorded on its
+        tape.
+        '''
+        return self._unary(np.log(self._val), 1 / self._val)
+
+    def log2(self):
+        '''
+        Returns the log (base 2) of the DreamReverse object, recorded on its
+        tape.
+        '''
+        return self._unary(np.log2(self._val), 1 / (self._val*np.log(2)))
+
+    def log10(self):
+        '''
+        Returns the log (base 10) of the DreamReverse object, recorded on its
+        tape.
+        '''
+        return self._unary(np.log10(self._val), 1 / (self._val*np.log(10)))
+
+    def logistic(self):
+        '''
+        Returns the logistic function of the DreamReverse object, recorded on
+        its tape.
+        '''
+        val = 1 / (1 + np.exp(-self._val))
+        return self._unary(val, val*(1 - val))
+
+    def __str__(self):
+        '''
+        Returns a string representation of the function value and gradient.
+        '''
+        return 'Values:\n{}\nJacobian:\n{}'.format(self.val, self.der)
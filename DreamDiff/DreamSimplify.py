@@ -0,0 +1,218 @@
+import ast
+import numpy as np
+
+
+# Numeric versions of the graph operations, used for constant folding and
+# for the value-only evaluation of LazyDiff graphs
+NUMERIC_OPERATIONS = {
+    'add': np.add, 'sub': np.subtract, 'mul': np.multiply, 'div': np.divide,
+    'pow': np.power, 'neg': np.negative, 'abs': np.abs,
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'arcsin': np.arcsin,
+    'arccos': np.arccos, 'arctan': np.arctan, 'sinh': np.sinh, 'cosh': np.cosh,
+    'tanh': np.tanh, 'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log,
+    'log2': np.log2, 'log10': np.log10,
+    'logistic': lambda a: 1 / (1 + np.exp(-a)),
+}
+
+# Constant operands that leave the other operand unchanged, as
+# (operation, position of the constant, value)
+_IDENTITIES = {('add', 0, 0), ('add', 1, 0), ('sub', 1, 0), ('mul', 0, 1),
+               ('mul', 1, 1), ('div', 1, 1), ('pow', 1, 1)}
+
+_COMMUTATIVE = {'add', 'mul'}
+
+
+def _needed_nodes(graph, outputs):
+    '''
+    Helper that returns the indices of the nodes the outputs depend on.
+    '''
+    needed = set(outputs)
+    for k in range(len(graph.nodes) - 1, -1, -1):
+        op, args = graph.nodes[k]
+        if k in needed and op not in ('input', 'const'):
+            needed.update(args)
+    return needed
+
+
+def optimize_graph(graph, outputs):
+    '''
+    Optimizes a traced Graph (see DreamCompile) by removing nodes the outputs
+    do not depend on, folding operations on constants, dropping operations
+    with an identity constant (e.g. x + 0, x*1, x**1), and merging identical
+    subexpressions, including commuted sums and products.
+
+    INPUTS
+    ======
+    graph: Graph, required
+        The traced graph.
+    outputs: list, required
+        Indices of the output nodes.
+
+    RETURNS
+    =======
+    A new Graph, the indices of the outputs in it, and the number of nodes
+    eliminated, in a 3-tuple.
+    '''
+    new = graph.__class__()
+    table = {}
+    remap = {}
+
+    def add(key, op, args):
+        if key not in table:
+            new.nodes.append((op, args))
+            table[key] = len(new.nodes) - 1
+        return table[key]
+
+    def constant(value):
+        if np.ndim(value) == 0:
+            return add(('const', float(value)), 'const', value)
+        new.nodes.append(('const', value))
+        return len(new.nodes) - 1
+
+    needed = _needed_nodes(graph, outputs)
+    for k in sorted(needed):
+        op, args = graph.nodes[k]
+        if op == 'input':
+            remap[k] = add(('input', args), op, args)
+            continue
+        if op == 'const':
+            remap[k] = constant(args)
+            continue
+        args = tuple(remap[a] for a in args)
+        consts = [new.nodes[a][1] if new.nodes[a][0] == 'const' else None for a in args]
+        if all(c is not None for c in consts):
+            with np.errstate(all='ignore'):
+                remap[k] = constant(NUMERIC_OPERATIONS[op](*[np.float64(c) if np.ndim(c) == 0 else c for c in consts]))
+            continue
+        identity = None
+        for i, c in enumerate(consts):
+            if c is not None and np.ndim(c) == 0 and (op, i, c) in _IDENTITIES:
+                identity = args[1 - i]
+        if identity is not None:
+            remap[k] = identity
+            continue
+        key = (op, tuple(sorted(args)) if op in _COMMUTATIVE else args)
+        remap[k] = add(key, op, args)
+
+    # Drop the constants left unused by folding and identities
+    new_outputs = [remap[k] for k in outputs]
+    kept = sorted(_needed_nodes(new, new_outputs))
+    position = {k: i for i, k in enumerate(kept)}
+    result = graph.__class__()
+    for k in kept:
+        op, args = new.nodes[k]
+        if op not in ('input', 'const'):
+            args = tuple(position[a] for a in args)
+        result.nodes.append((op, args))
+    eliminated = len(graph.nodes) - len(result.nodes)
+    return result, [position[k] for k in new_outputs], eliminated
+
+
+def _count_operations(tree):
+    '''
+    Helper that counts the operations (calls, unary and binary operations)
+    in an AST.
+    '''
+    return sum(isinstance(node, (ast.Call, ast.BinOp, ast.UnaryOp)) for node in ast.walk(tree))
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    '''
+    Replaces arithmetic on numeric constants in an AST with its result.
+    '''
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
+            return self._fold(node)
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.operand, ast.Constant):
+            return self._fold(node)
+        return node
+
+    def _fold(self, node):
+        try:
+            value = eval(compile(ast.Expression(body=node), '<fold>', 'eval'), {})
+        except Exception:
+            return node
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return node
+        return ast.copy_location(ast.Constant(value=value), node)
+
+
+def optimize_expression(expression, name='function', argument='x'):
+    '''
+    Optimizes a Python expression over 'argument', e.g. the translated string
+    function of DreamDiff._parse_input, by folding constant arithmetic and
+    computing every repeated subexpression only once.
+
+    INPUTS
+    ======
+    expression: str, required
+        The expression to optimize.
+    name: str, optional, default is 'function'
+        The name of the generated function.
+    argument: str, optional, default is 'x'
+        The name of the function's argument.
+
+    RETURNS
+    =======
+    The source code of a function evaluating the expression, and the number
+    of operations eliminated, in a 2-tuple.
+
+    EXAMPLES
+    ========
+    >>> source, eliminated = optimize_expression('Function.sin(x)**2 + Function.sin(x) + 2*3')
+    >>> print(source)
+    def function(x):
+        _t0 = Function.sin(x)
+        return _t0 ** 2 + _t0 + 6
+    <BLANKLINE>
+    >>> eliminated
+    2
+    '''
+    if not hasattr(ast, 'unparse'):
+        # Python < 3.9 cannot turn the optimized AST back into source
+        return 'def {}({}):\n    return {}\n'.format(name, argument, expression.strip()), 0
+    tree = ast.parse(expression.strip(), mode='eval')
+    before = _count_operations(tree)
+    tree = ast.fix_missing_locations(_ConstantFolder().visit(tree))
+
+    # Count each subexpression, keyed by its AST dump
+    counts = {}
+    for node in ast.walk(tree.body):
+        if isinstance(node, (ast.Call, ast.BinOp, ast.UnaryOp)):
+            key = ast.dump(node)
+            counts[key] = counts.get(key, 0) + 1
+
+    assignments = []
+    temps = {}
+
+    def hoist(node):
+        if not isinstance(node, ast.AST):
+            return node
+        key = ast.dump(node) if isinstance(node, (ast.Call, ast.BinOp, ast.UnaryOp)) else None
+        if key is not None and key in temps:
+            return ast.Name(id=temps[key], ctx=ast.Load())
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                setattr(node, field, [hoist(v) for v in value])
+            elif isinstance(value, ast.AST):
+                setattr(node, field, hoist(value))
+        if key is not None and counts[key] > 1:
+            temps[key] = '_t{}'.format(len(temps))
+            assignments.append((temps[key], node))
+            return ast.Name(id=temps[key], ctx=ast.Load())
+        return node
+
+    body = hoist(tree.body)
+    lines = ['def {}({}):'.format(name, argument)]
+    for temp, node in assignments:
+        lines.append('    {} = {}'.format(temp, ast.unparse(node)))
+    lines.append('    return {}'.format(ast.unparse(body)))
+
+    after = _count_operations(body) + sum(_count_operations(node) for temp, node in assignments)
+    return '\n'.join(lines) + '\n', before - after
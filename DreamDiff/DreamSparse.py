@@ -0,0 +1,230 @@
+import numpy as np
+
+
+class SparseDer:
+    '''
+    Sparse storage for the derivative (Jacobian) of a DreamDiff object. Only
+    the nonzero entries are kept, as flat indices into the dense shape and
+    their values, so that operations on variables seeded with input_pos cost
+    work proportional to the number of nonzeros rather than the number of
+    inputs. Operations that cannot be done sparsely fall back to dense arrays.
+
+    EXAMPLES
+    ========
+    >>> d = SparseDer((5,), [1, 3], [2.0, -1.0])
+    >>> print(3*d + d)
+    [ 0.  8.  0. -4.  0.]
+    '''
+
+    # Make numpy defer to the reflected operators below, e.g. for
+    # np.ndarray * SparseDer, instead of building an object array
+    __array_ufunc__ = None
+
+    def __init__(self, shape, index, data):
+        '''
+        Constructs a SparseDer object.
+
+        INPUTS
+        ======
+        shape: tuple, required
+            Shape of the dense derivative, (n,) for a scalar function or
+            (m, n) for a vector function of 'n' variables.
+        index: list or np.ndarray, required
+            Sorted, unique flat indices of the nonzero entries.
+        data: list or np.ndarray, required
+            Values of the nonzero entries.
+        '''
+        self.shape = tuple(shape)
+        self.index = np.asarray(index, dtype=np.intp)
+        self.data = np.asarray(data, dtype=float)
+
+    @property
+    def ndim(self):
+        '''
+        Returns the number of dimensions of the dense derivative.
+        '''
+        return len(self.shape)
+
+    @property
+    def nnz(self):
+        '''
+        Returns the number of stored entries.
+        '''
+        return len(self.index)
+
+    def toarray(self):
+        '''
+        Returns the derivative as a dense np.ndarray.
+        '''
+        dense = np.zeros(self.shape)
+        dense.flat[self.index] = self.data
+        return dense
+
+    @staticmethod
+    def _coalesce(shape, index, data):
+        '''
+        Helper that sums duplicate indices and returns a new SparseDer.
+        '''
+        index, inverse = np.unique(index, return_inverse=True)
+        return SparseDer(shape, index, np.bincount(inverse, weights=data, minlength=len(index)))
+
+    @staticmethod
+    def vstack(rows, n):
+        '''
+        Stacks the derivatives of the elements of a vector function into a
+        (m, n) SparseDer. Each row may be a SparseDer, a dense array, or None
+        for a constant element, whose row is left implicitly zero.
+        '''
+        indices = []
+        datas = []
+        offset = 0
+        for row in rows:
+            if row is None:
+                offset += n
+                continue
+            if not isinstance(row, SparseDer):
+                row = np.asarray(row, dtype=float)
+                row = SparseDer(row.shape, np.flatnonzero(row), row[row != 0])
+            indices.append(row.index + offset)
+            datas.append(row.data)
+            offset += int(np.prod(row.shape))
+        if not indices:
+            return SparseDer((offset // n, n), [], [])
+        return SparseDer((offset // n, n), np.concatenate(indices), np.concatenate(datas))
+
+    def _combine(self, other, sign):
+        '''
+        Helper for addition and subtraction of self and other.
+        '''
+        if isinstance(other, SparseDer) and other.shape == self.shape:
+            if len(other.index) == len(self.index) and np.array_equal(other.index, self.index):
+                return SparseDer(self.shape, self.index, self.data + sign*other.data)
+            return SparseDer._coalesce(self.shape, np.concatenate([self.index, other.index]),
+                                       np.concatenate([self.data, sign*other.data]))
+        if isinstance(other, SparseDer):
+            other = other.toarray()
+        return self.toarray() + sign*np.asarray(other)
+
+    def __add__(self, other):
+        '''
+        Performs addition of self and other.
+        '''
+        return self._combine(other, 1)
+
+    def __radd__(self, other):
+        '''
+        Performs addition of other and self (commutative).
+        '''
+        return self._combine(other, 1)
+
+    def __sub__(self, other):
+        '''
+        Performs subtraction of other from self.
+        '''
+        return self._combine(other, -1)
+
+    def __rsub__(self, other):
+        '''
+        Performs subtraction of self from other.
+        '''
+        return (-self)._combine(other, 1)
+
+    def __neg__(self):
+        '''
+        Negates the stored entries.
+        '''
+        return SparseDer(self.shape, self.index, -self.data)
+
+    def __mul__(self, other):
+        '''
+        Performs multiplication of self with a scalar, a column of per-row
+        factors, or an array of the same shape. Any other operand is
+        multiplied with the dense derivative.
+        '''
+        if isinstance(other, SparseDer):
+            other = other.toarray()
+        other = np.asarray(other)
+        if other.size == 1:
+            return SparseDer(self.shape, self.index, self.data*other.reshape(()))
+        if self.ndim == 2 and other.shape == (self.shape[0], 1):
+            return SparseDer(self.shape, self.index, self.data*other[self.index // self.shape[1], 0])
+        if self.ndim == 2 and self.shape[0] == 1 and other.ndim == 2 and other.shape[1] == 1:
+            # Repeat a single row, scaled by each factor of the column
+            m, n = other.shape[0], self.shape[1]
+            index = (np.arange(m)[:, None]*n + self.index).ravel()
+            return SparseDer((m, n), index, (other*self.data).ravel())
+        if other.shape == self.shape:
+            return SparseDer(self.shape, self.index, self.data*other.flat[self.index])
+        return self.toarray()*other
+
+    def __rmul__(self, other):
+        '''
+        Performs multiplication of other with self (commutative).
+        '''
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        '''
+        Performs division of self by a scalar; any other operand divides the
+        dense derivative.
+        '''
+        other = np.asarray(other)
+        if other.size == 1:
+            return SparseDer(self.shape, self.index, self.data / other.reshape(()))
+        return self.toarray() / other
+
+    def __rtruediv__(self, other):
+        '''
+        Performs division of other by the dense derivative.
+        '''
+        return np.asarray(other) / self.toarray()
+
+    def __getitem__(self, key):
+        '''
+        Selects rows of a (m, n) derivative with an int, slice, or index
+        array, as for np.ndarray. An int gives a (n,) SparseDer. Indexing a
+        (n,) derivative returns dense entries.
+        '''
+        if self.ndim == 1:
+            return self.toarray()[key]
+        m, n = self.shape
+        rows = np.arange(m)[key]
+        single = np.ndim(rows) == 0
+        rows = np.atleast_1d(rows)
+
+        # The flat indices are sorted, so each row's entries are contiguous
+        starts = np.searchsorted(self.index, rows*n)
+        counts = np.searchsorted(self.index, (rows + 1)*n) - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        cols = self.index[positions] % n
+        if single:
+            return SparseDer((n,), cols, self.data[positions])
+        index = np.repeat(np.arange(len(rows)), counts)*n + cols
+        return SparseDer((len(rows), n), index, self.data[positions])
+
+    def sum(self, axis=0):
+        '''
+        Sums a (m, n) derivative over its rows, returning a (n,) SparseDer.
+        '''
+        if self.ndim == 1:
+            return np.array([self.data.sum()])
+        if axis != 0:
+            raise Exception('SparseDer only supports sums over axis 0')
+        return SparseDer._coalesce(self.shape[1:], self.index % self.shape[1], self.data)
+
+    def __rmatmul__(self, other):
+        '''
+        Performs the matrix product of a dense (k, m) array with a (m, n)
+        derivative, returning a dense (k, n) np.ndarray.
+        '''
+        other = np.asarray(other, dtype=float)
+        m, n = self.shape
+        result = np.zeros((other.shape[0], n))
+        np.add.at(result.T, self.index % n, (other[:, self.index // n]*self.data).T)
+        return result
+
+    def __str__(self):
+        '''
+        Returns a string representation of the dense derivative.
+        '''
+        return str(self.toarray())
@@ -0,0 +1,253 @@
+from DreamDiff.DreamDiff import DreamDiff, ElementaryRecorder, ValueFunction
+from DreamDiff.DreamSparse import SparseDer
+import numpy as np
+
+
+class SparsityTracer(ElementaryRecorder):
+    '''
+    Variable type used to detect the sparsity pattern of a Jacobian. Instead
+    of derivatives, a SparsityTracer carries the set of input variables its
+    value depends on, which is all that is needed to know which entries of
+    the Jacobian can be nonzero. Values are still propagated so that
+    functions that branch on them can be traced.
+    '''
+
+    def __init__(self, val, deps, n):
+        '''
+        Constructs a SparsityTracer object.
+
+        INPUTS
+        ======
+        val: int or float, required
+            Value of the variable.
+        deps: frozenset, required
+            Indices of the input variables the value depends on.
+        n: int, required
+            Total number of input variables.
+        '''
+        self._val = np.float64(val)
+        self.deps = deps
+        self.n = n
+
+    @property
+    def val(self):
+        '''
+        Returns the value of the SparsityTracer object.
+        '''
+        return np.array([self._val])
+
+    @property
+    def der(self):
+        '''
+        Returns the sparsity pattern of the variable's gradient as a
+        SparseDer object with ones at the possibly nonzero entries.
+        '''
+        index = np.array(sorted(self.deps), dtype=np.intp)
+        return SparseDer((self.n,), index, np.ones(len(index)))
+
+    def _unary(self, val):
+        '''
+        Internal method that returns the result of a unary operation.
+        '''
+        return SparsityTracer(val, self.deps, self.n)
+
+    def _binary(self, other, op):
+        '''
+        Internal method that returns the result of a binary operation.
+        '''
+        try:
+            return SparsityTracer(op(self._val, other._val), self.deps | other.deps, self.n)
+        except AttributeError:
+            return SparsityTracer(op(self._val, other), self.deps, self.n)
+
+    def __add__(self, other):
+        return self._binary(other, lambda a, b: a + b)
+
+    def __radd__(self, other):
+        return self._binary(other, lambda a, b: b + a)
+
+    def __sub__(self, other):
+        return self._binary(other, lambda a, b: a - b)
+
+    def __rsub__(self, other):
+        return self._binary(other, lambda a, b: b - a)
+
+    def __mul__(self, other):
+        return self._binary(other, lambda a, b: a*b)
+
+    def __rmul__(self, other):
+        return self._binary(other, lambda a, b: b*a)
+
+    def __truediv__(self, other):
+        return self._binary(other, lambda a, b: a / b)
+
+    def __rtruediv__(self, other):
+        return self._binary(other, lambda a, b: b / a)
+
+    def __pow__(self, other):
+        return self._binary(other, np.power)
+
+    def __rpow__(self, other):
+        return self._binary(other, lambda a, b: np.power(b, a))
+
+    def __neg__(self):
+        return self._unary(-self._val)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self._unary(abs(self._val))
+
+    def __lt__(self, other):
+        return self._val < getattr(other, '_val', other)
+
+    def __gt__(self, other):
+        return self._val > getattr(other, '_val', other)
+
+    def __le__(self, other):
+        return self._val <= getattr(other, '_val', other)
+
+    def __ge__(self, other):
+        return self._val >= getattr(other, '_val', other)
+
+    def _elementary(self, name):
+        '''
+        Internal method that returns the result of the elementary function
+        'name'.
+        '''
+        return self._unary(getattr(ValueFunction, name)(self._val))
+
+def color_columns(pattern):
+    '''
+    Groups the columns of a sparsity pattern so that no two columns in the
+    same group have a nonzero in the same row (greedy distance-1 coloring of
+    the column intersection graph, largest columns first).
+
+    INPUTS
+    ======
+    pattern: SparseDer, required
+        The (m, n) sparsity pattern of a Jacobian.
+
+    RETURNS
+    =======
+    An np.ndarray of length n holding the color (group) of each column.
+    '''
+    m, n = pattern.shape
+    rows = pattern.index // n
+    cols = pattern.index % n
+    cols_of_row = [[] for _ in range(m)]
+    rows_of_col = [[] for _ in range(n)]
+    for r, c in zip(rows.tolist(), cols.tolist()):
+        cols_of_row[r].append(c)
+        rows_of_col[c].append(r)
+
+    colors = np.full(n, -1, dtype=np.intp)
+    for c in sorted(range(n), key=lambda k: -len(rows_of_col[k])):
+        forbidden = set()
+        for r in rows_of_col[c]:
+            for k in cols_of_row[r]:
+                forbidden.add(colors[k])
+        color = 0
+        while color in forbidden:
+            color += 1
+        colors[c] = color
+    return colors
+
+
+class SparseJacobian:
+
+    def __init__(self, f, n):
+        '''
+        Computes sparse Jacobians by compressed forward mode. On first use,
+        the sparsity pattern of 'f' is found with one SparsityTracer pass and
+        its columns are grouped by color_columns. Each Jacobian is then
+        recovered from a single DreamDiff pass seeded with one direction per
+        color rather than one per input. The pattern and coloring are cached
+        on the object and reused for every later evaluation.
+
+        INPUTS
+        ======
+        f: function, required
+            Function taking a list of 'n' variables and returning a DreamDiff
+            object, e.g. lambda x: DreamDiff([x[0]*x[1], x[1] - x[2]]).
+        n: int, required
+            Number of input variables.
+
+        RETURNS
+        =======
+        A SparseJacobian object, which is called with a point to evaluate
+        the function and its Jacobian there.
+
+        EXAMPLES
+        ========
+        >>> f = lambda x: DreamDiff([x[0]**2, x[0]*x[1], x[2] - x[1]])
+        >>> jac = SparseJacobian(f, 3)
+        >>> print(jac([1.0, 2.0, 3.0]))
+        Values:
+        [[1.]
+         [2.]
+         [1.]]
+        Jacobian:
+        [[ 2.  0.  0.]
+         [ 2.  1.  0.]
+         [ 0. -1.  1.]]
+        >>> jac.n_colors
+        2
+        '''
+        self.f = f
+        self.n = n
+        self._pattern = None
+        self._colors = None
+
+    def pattern(self, x):
+        '''
+        Returns the (m, n) sparsity pattern of the Jacobian as a SparseDer
+        with ones at the possibly nonzero entries, tracing 'f' at 'x' on the
+        first call and returning the cached pattern afterwards.
+        '''
+        if self._pattern is None:
+            tracers = [SparsityTracer(x[j], frozenset([j]), self.n) for j in range(self.n)]
+            result = self.f(tracers)
+            pattern = result._der if isinstance(result, DreamDiff) else result.der
+            if pattern.ndim == 1:
+                pattern = SparseDer.vstack([pattern], self.n)
+            self._pattern = pattern
+            self._colors = color_columns(pattern)
+        return self._pattern
+
+    @property
+    def colors(self):
+        '''
+        Returns the cached color of each column, or None before the first
+        evaluation.
+        '''
+        return self._colors
+
+    @property
+    def n_colors(self):
+        '''
+        Returns the number of compressed seed directions, or None before the
+        first evaluation.
+        '''
+        if self._colors is None:
+            return None
+        return int(self._colors.max()) + 1 if self.n else 0
+
+    def __call__(self, x):
+        '''
+        Evaluates 'f' and its Jacobian at 'x'. Returns a DreamDiff object
+        whose derivative is stored as a SparseDer.
+        '''
+        pattern = self.pattern(x)
+        seeds = np.zeros((self.n, self.n_colors))
+        seeds[np.arange(self.n), self._colors] = 1
+        result = self.f([DreamDiff(x[j], seeds[j]) for j in range(self.n)])
+        compressed = np.array(result.der, ndmin=2)
+        rows = pattern.index // self.n
+        cols = pattern.index % self.n
+        jacobian = SparseDer(pattern.shape, pattern.index, compressed[rows, self._colors[cols]])
+        val = result.val
+        if pattern.shape[0] == 1 and np.ndim(result.der) == 1:
+            return DreamDiff(val, SparseDer((self.n,), cols, jacobian.data))
+        return DreamDiff(val, jacobian)
@@ -0,0 +1,516 @@
+from math import factorial
+import numpy as np
+
+
+def _taylor(coeffs):
+    '''
+    Helper that creates a Taylor object directly from a coefficient array.
+    '''
+    result = object.__new__(Taylor)
+    result.coeffs = coeffs
+    return result
+
+
+def _cauchy(a, b, j):
+    '''
+    Helper that returns coefficient 'j' of the product of the series with
+    coefficients 'a' and 'b'.
+    '''
+    return (a[:j + 1]*b[j::-1]).sum(axis=0)
+
+
+def _integrate(a, h, g0):
+    '''
+    Helper that returns the series g with g(0) = g0 and g' = h a', i.e. the
+    composition of a function with derivative h with the series a. Each
+    coefficient is g_j = 1/j sum_{i=1..j} i a_i h_{j-i}.
+    '''
+    g = np.empty_like(a)
+    g[0] = g0
+    for j in range(1, len(a)):
+        i = np.arange(1, j + 1)[:, None]
+        g[j] = (i*a[1:j + 1]*h[j - 1::-1]).sum(axis=0) / j
+    return g
+
+
+class Taylor:
+
+    def __init__(self, val, der=1.0, order=2):
+        '''
+        Constructs a Taylor object, a truncated Taylor polynomial of a
+        function along one or several directions. Operators and Function
+        elementaries propagate all coefficients up to 'order' in one pass,
+        with O(order^2) work per operation. Coefficient j is the j-th
+        directional derivative divided by j!. Several directions are
+        propagated at once by giving one seed per direction.
+
+        INPUTS
+        ======
+        val: int or float, required
+            Value of the input variable.
+        der: int, float, list, or np.ndarray, optional, default is 1.0
+            Seed of the variable along each of the p directions.
+        order: int, optional, default is 2
+            Highest derivative order kept.
+
+        RETURNS
+        =======
+        A Taylor object with coefficients of shape (order + 1, p).
+
+        EXAMPLES
+        ========
+        >>> from DreamDiff.DreamDiff import Function
+        >>> x = Taylor(0.0, order=4)
+        >>> f = Function.exp(x)*Function.sin(x)
+        >>> f.derivatives()
+        array([0., 1., 2., 2., 0.])
+        '''
+        if order < 1:
+            raise AssertionError('order must be at least 1')
+        der = np.array(der, dtype=float, ndmin=1)
+        self.coeffs = np.zeros((order + 1, len(der)))
+        self.coeffs[0] = val
+        self.coeffs[1] = der
+
+    @property
+    def order(self):
+        '''
+        Returns the highest derivative order kept.
+        '''
+        return len(self.coeffs) - 1
+
+    @property
+    def val(self):
+        '''
+        Returns the value of the function.
+        '''
+        return self.coeffs[0, :1].copy()
+
+    @property
+    def der(self):
+        '''
+        Returns the first directional derivative along each direction.
+        '''
+        return self.coeffs[1].copy()
+
+    def derivatives(self):
+        '''
+        Returns the directional derivatives of orders 0 to 'order', with one
+        row per order and, for several directions, one column per direction.
+        '''
+        scale = np.array([factorial(j) for j in range(self.order + 1)], dtype=float)
+        result = self.coeffs*scale[:, None]
+        return result[:, 0] if result.shape[1] == 1 else result
+
+    def _constant(self, c):
+        '''
+        Internal method that returns the series of the constant 'c'.
+        '''
+        coeffs = np.zeros_like(self.coeffs)
+        coeffs[0] = c
+        return coeffs
+
+    def _coeffs_of(self, other):
+        '''
+        Internal method that returns the coefficients of 'other', which is a
+        Taylor object or a constant.
+        '''
+        try:
+            return other.coeffs
+        except AttributeError:
+            return self._constant(other)
+
+    def __add__(self, other):
+        '''
+        Performs addition of self and other.
+        '''
+        return _taylor(self.coeffs + self._coeffs_of(other))
+
+    def __radd__(self, other):
+        '''
+        Performs addition of other and self (commutative).
+        '''
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        '''
+        Performs subtraction of other from self.
+        '''
+        return _taylor(self.coeffs - self._coeffs_of(other))
+
+    def __rsub__(self, other):
+        '''
+        Performs subtraction of self from other.
+        '''
+        return _taylor(self._coeffs_of(other) - self.coeffs)
+
+    def __mul__(self, other):
+        '''
+        Performs multiplication of self with other, as a Cauchy product.
+        '''
+        if not isinstance(other, Taylor):
+            return _taylor(self.coeffs*other)
+        a, b = self.coeffs, other.coeffs
+        c = np.empty(np.broadcast(a, b).shape)
+        for j in range(len(c)):
+            c[j] = _cauchy(a, b, j)
+        return _taylor(c)
+
+    def __rmul__(self, other):
+        '''
+        Performs multiplication of other with self (commutative).
+        '''
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        '''
+        Performs division of self by other.
+        '''
+        if not isinstance(other, Taylor):
+            return _taylor(self.coeffs / other)
+        return self*other._reciprocal()
+
+    def __rtruediv__(self, other):
+        '''
+        Performs division of other by self.
+        '''
+        return self._reciprocal()*other
+
+    def _reciprocal(self):
+        '''
+        Internal method that returns the series of 1 / self, from
+        c_0 = 1 / a_0 and c_j = -1/a_0 sum_{i=1..j} a_i c_{j-i}.
+        '''
+        a = self.coeffs
+        c = np.empty_like(a)
+        c[0] = 1 / a[0]
+        for j in range(1, len(a)):
+            c[j] = -(a[1:j + 1]*c[j - 1::-1]).sum(axis=0) / a[0]
+        return _taylor(c)
+
+    def __pow__(self, other):
+        '''
+        Raises self to the power of other.
+        '''
+        if isinstance(other, Taylor):
+            return (other*self.log()).exp()
+        if other == 0:
+            return _taylor(self._constant(1.0))
+        if float(other).is_integer() and 0 < other <= 16:
+            # Repeated products stay exact where the value is zero
+            result = self
+            for _ in range(int(other) - 1):
+                result = result*self
+            return result
+        # p_j = 1/(j a_0) sum_{i=1..j} ((r + 1) i - j) a_i p_{j-i}
+        a = self.coeffs
+        p = np.empty_like(a)
+        p[0] = a[0]**other
+        for j in range(1, len(a)):
+            i = np.arange(1, j + 1)[:, None]
+            p[j] = (((other + 1)*i - j)*a[1:j + 1]*p[j - 1::-1]).sum(axis=0) / (j*a[0])
+        return _taylor(p)
+
+    def __rpow__(self, other):
+        '''
+        Raises other to the power of self.
+        '''
+        return (self*np.log(other)).exp()
+
+    def __neg__(self):
+        '''
+        Negates the series.
+        '''
+        return _taylor(-self.coeffs)
+
+    def __pos__(self):
+        '''
+        Applies the unary + operator to self.
+        '''
+        return self
+
+    def __abs__(self):
+        '''
+        Applies the absolute value to the series.
+        '''
+        return _taylor(np.sign(self.coeffs[0])*self.coeffs)
+
+    def __lt__(self, other):
+        '''
+        Returns True if the value of self is less than the value of other.
+        '''
+        return self.coeffs[0, 0] < getattr(other, 'coeffs', np.array([[other]]))[0, 0]
+
+    def __gt__(self, other):
+        '''
+        Returns True if the value of self is greater than the value of other.
+        '''
+        return self.coeffs[0, 0] > getattr(other, 'coeffs', np.array([[other]]))[0, 0]
+
+    def __le__(self, other):
+        '''
+        Returns True if the value of self is less than or equal to the value
+        of other.
+        '''
+        return not self.__gt__(other)
+
+    def __ge__(self, other):
+        '''
+        Returns True if the value of self is greater than or equal to the
+        value of other.
+        '''
+        return not self.__lt__(other)
+
+    def _sincos(self, sign):
+        '''
+        Internal method that returns the series of (sin, cos) of self for
+        sign = -1, or (sinh, cosh) for sign = 1, from the coupled recurrences
+        s_j = 1/j sum i a_i c_{j-i} and c_j = sign/j sum i a_i s_{j-i}.
+        '''
+        a = self.coeffs
+        s = np.empty_like(a)
+        c = np.empty_like(a)
+        if sign < 0:
+            s[0], c[0] = np.sin(a[0]), np.cos(a[0])
+        else:
+            s[0], c[0] = np.sinh(a[0]), np.cosh(a[0])
+        for j in range(1, len(a)):
+            i = np.arange(1, j + 1)[:, None]
+            s[j] = (i*a[1:j + 1]*c[j - 1::-1]).sum(axis=0) / j
+            c[j] = sign*(i*a[1:j + 1]*s[j - 1::-1]).sum(axis=0) / j
+        return _taylor(s), _taylor(c)
+
+    def sin(self):
+        '''
+        Returns the Taylor series of the sine of the Taylor object.
+        '''
+        return self._sincos(-1)[0]
+
+    def cos(self):
+        '''
+        Returns the Taylor series of the cosine of the Taylor object.
+        '''
+        return self._sincos(-1)[1]
+
+    def tan(self):
+        '''
+        Returns the Taylor series of the tangent of the Taylor object.
+        '''
+        s, c = self._sincos(-1)
+        return s / c
+
+    def arcsin(self):
+        '''
+        Returns the Taylor series of the arcsine of the Taylor object.
+        '''
+        h = (1 - self*self)**-0.5
+        return _taylor(_integrate(self.coeffs, h.coeffs, np.arcsin(self.coeffs[0])))
+
+    def arccos(self):
+        '''
+        Returns the Taylor series of the arccosine of the Taylor object.
+        '''
+        h = -(1 - self*self)**-0.5
+        return _taylor(_integrate(self.coeffs, h.coeffs, np.arccos(self.coeffs[0])))
+
+    def arctan(self):
+        '''
+        Returns the Taylor series of the arctangent of the Taylor object.
+        '''
+        h = 1 / (1 + self*self)
+        return _taylor(_integrate(self.coeffs, h.coeffs, np.arctan(self.coeffs[0])))
+
+    def sinh(self):
+        '''
+        Returns the Taylor series of the sinh of the Taylor object.
+        '''
+        return self._sincos(1)[0]
+
+    def cosh(self):
+        '''
+        Returns the Taylor series of the cosh of the Taylor object.
+        '''
+        return self._sincos(1)[1]
+
+    def tanh(self):
+        '''
+        Returns the Taylor series of the tanh of the Taylor object.
+        '''
+        s, c = self._sincos(1)
+        return s / c
+
+    def sqrt(self):
+        '''
+        Returns the Taylor series of the square root of the Taylor object.
+        '''
+        return self**0.5
+
+    def exp(self):
+        '''
+        Returns the Taylor series of the exponential of the Taylor object.
+        '''
+        # e_j = 1/j sum_{i=1..j} i a_i e_{j-i}
+        a = self.coeffs
+        e = np.empty_like(a)
+        e[0] = np.exp(a[0])
+        for j in range(1, len(a)):
+            i = np.arange(1, j + 1)[:, None]
+            e[j] = (i*a[1:j + 1]*e[j - 1::-1]).sum(axis=0) / j
+        return _taylor(e)
+
+    def log(self):
+        '''
+        Returns the Taylor series of the log (base e) of the Taylor object.
+        '''
+        # l_j = (a_j - 1/j sum_{i=1..j-1} i l_i a_{j-i}) / a_0
+        a = self.coeffs
+        l = np.empty_like(a)
+        l[0] = np.log(a[0])
+        for j in range(1, len(a)):
+            i = np.arange(1, j)[:, None]
+            l[j] = (a[j] - (i*l[1:j]*a[j - 1:0:-1]).sum(axis=0) / j) / a[0]
+        return _taylor(l)
+
+    def log2(self):
+        '''
+        Returns the Taylor series of the log (base 2) of the Taylor object.
+        '''
+        return self.log() / np.log(2)
+
+    def log10(self):
+        '''
+        Returns the Taylor series of the log (base 10) of the Taylor object.
+        '''
+        return self.log() / np.log(10)
+
+    def logistic(self):
+        '''
+        Returns the Taylor series of the logistic function of the Taylor
+        object.
+        '''
+        return 1 / (1 + (-self).exp())
+
+    def __str__(self):
+        '''
+        Returns a string representation of the directional derivatives.
+        '''
+        return 'Derivatives:\n{}'.format(self.derivatives())
+
+
+def derivatives(f, x, order):
+    '''
+    Computes the derivatives of a scalar function of one variable up to
+    'order' in a single Taylor-mode pass.
+
+    INPUTS
+    ======
+    f: function, required
+        Function of one variable built from operators and Function
+        elementaries, e.g. lambda x: Function.exp(x)*Function.sin(x).
+    x: int or float, required
+        Point at which to evaluate.
+    order: int, required
+        Highest derivative order.
+
+    RETURNS
+    =======
+    An np.ndarray holding f(x), f'(x), ..., up to the derivative of order
+    'order'.
+
+    EXAMPLES
+    ========
+    >>> derivatives(lambda x: x**3, 2.0, 4)
+    array([ 8., 12., 12.,  6.,  0.])
+    '''
+    result = f(Taylor(x, 1.0, order))
+    if not isinstance(result, Taylor):
+        return np.concatenate([[result], np.zeros(order)]).astype(float)
+    return result.derivatives()
+
+
+def _second_directional(f, x, U):
+    '''
+    Helper that returns the value, the first and the second directional
+    derivatives of 'f' at 'x' along each column of 'U', in one pass.
+    '''
+    result = f([Taylor(x[i], U[i], order=2) for i in range(len(x))])
+    if not isinstance(result, Taylor):
+        p = U.shape[1]
+        return np.array([result], dtype=float), np.zeros(p), np.zeros(p)
+    return result.val, result.coeffs[1], 2*result.coeffs[2]
+
+
+def hessian(f, x):
+    '''
+    Computes the Hessian of a scalar function of 'n' variables with second
+    order Taylor mode. The second directional derivatives along the n unit
+    vectors and the n(n - 1)/2 sums of pairs are propagated together in one
+    pass, and the mixed entries are recovered by polarization:
+    H_ij = (D2[e_i + e_j] - D2[e_i] - D2[e_j]) / 2.
+
+    INPUTS
+    ======
+    f: function, required
+        Function taking a list of 'n' variables and returning a scalar, e.g.
+        lambda x: x[0]**2*x[1] + Function.sin(x[1]).
+    x: list or np.ndarray, required
+        Point of length 'n' at which to evaluate.
+
+    RETURNS
+    =======
+    The (n, n) Hessian as an np.ndarray.
+
+    EXAMPLES
+    ========
+    >>> hessian(lambda x: x[0]**2*x[1] + x[1]**3, [1.0, 2.0])
+    array([[ 4.,  2.],
+           [ 2., 12.]])
+    '''
+    x = np.array(x, dtype=float, ndmin=1)
+    n = len(x)
+    pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+    U = np.zeros((n, n + len(pairs)))
+    U[np.arange(n), np.arange(n)] = 1
+    for k, (i, j) in enumerate(pairs):
+        U[[i, j], n + k] = 1
+    val, first, second = _second_directional(f, x, U)
+    H = np.diag(second[:n])
+    for k, (i, j) in enumerate(pairs):
+        H[i, j] = H[j, i] = (second[n + k] - second[i] - second[j]) / 2
+    return H
+
+
+def hvp(f, x, v):
+    '''
+    Computes the Hessian-vector product H v of a scalar function of 'n'
+    variables with second order Taylor mode, without forming H. The 2n
+    directions v + e_i and v - e_i are propagated in one pass, and
+    (H v)_i = (D2[v + e_i] - D2[v - e_i]) / 4.
+
+    INPUTS
+    ======
+    f: function, required
+        Function taking a list of 'n' variables and returning a scalar.
+    x: list or np.ndarray, required
+        Point of length 'n' at which to evaluate.
+    v: list or np.ndarray, required
+        Vector of length 'n'.
+
+    RETURNS
+    =======
+    The product H v as an np.ndarray of length 'n'.
+
+    EXAMPLES
+    ========
+    >>> hvp(lambda x: x[0]**2*x[1] + x[1]**3, [1.0, 2.0], [1.0, 0.0])
+    array([4., 2.])
+    '''
+    x = np.array(x, dtype=float, ndmin=1)
+    v = np.array(v, dtype=float, ndmin=1)
+    n = len(x)
+    if len(v) != n:
+        raise AssertionError('v must have the same length as x')
+    I = np.eye(n)
+    U = np.concatenate([v[:, None] + I, v[:, None] - I], axis=1)
+    val, first, second = _second_directional(f, x, U)
+    return (second[:n] - second[n:]) / 4
@@ -0,0 +1,37 @@
+# Test suite for the LRU cache of compiled string functions using pytest
+
+import pytest
+
+from DreamDiff.DreamCache import LRUCache
+
+
+def test_get_put():
+    cache = LRUCache(maxsize=2)
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    assert 'a' in cache
+    assert len(cache) == 1
+    assert cache.info() == (1, 1, 0, 2, 1)
+
+def test_eviction_order():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.info().evictions == 1
+
+def test_clear():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info() == (0, 0, 0, 2, 0)
+
+def test_invalid_size():
+    with pytest.raises(AssertionError):
+        LRUCache(maxsize=0)
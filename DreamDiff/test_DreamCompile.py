@@ -0,0 +1,70 @@
+# Test suite for the trace-and-codegen compiler using pytest
+
+import pytest
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff as ad
+from DreamDiff.DreamDiff import Function as fun
+from DreamDiff.DreamCompile import compile, trace
+
+
+def interpreted(f, x):
+    n = len(x)
+    return f([ad(x[j], np.eye(n)[j]) for j in range(n)])
+
+
+# Test tracing
+
+def test_trace():
+    graph, outputs, vector = trace(lambda x: fun.sin(x[0]*x[1]) + 2, 2)
+    ops = [op for op, args in graph.nodes]
+    assert ops == ['input', 'input', 'mul', 'sin', 'const', 'add']
+    assert outputs == [5]
+    assert not vector
+
+def test_branching():
+    with pytest.raises(Exception):
+        compile(lambda x: x[0] if x[0] > 0 else -x[0], 1)
+
+
+# Test compiled functions against the interpreted path
+
+def test_scalar_function():
+    f = lambda x: x[0]*fun.exp(x[1]) - x[1] / x[0] + x[0]**x[1]
+    g = compile(f, 2)
+    x = np.array([1.5, 0.3])
+    val, jac = g(x)
+    result = interpreted(f, x)
+    assert jac.shape == (2,)
+    assert np.allclose(val, result.val)
+    assert np.allclose(jac, result.der)
+
+def test_elementary_functions():
+    names = ['sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'sinh', 'cosh',
+             'tanh', 'sqrt', 'exp', 'log', 'log2', 'log10', 'logistic']
+    for name in names:
+        f = lambda x: getattr(fun, name)(x[0]*x[1]) - abs(-x[1])
+        val, jac = compile(f, 2)([0.3, 0.5])
+        result = interpreted(f, [0.3, 0.5])
+        assert np.allclose(val, result.val)
+        assert np.allclose(jac, result.der)
+
+def test_vector_function():
+    f = lambda x: ad([x[0] + x[1]*x[0], 2**x[1], 4.0, -x[2]])
+    g = compile(f, 3)
+    val, jac = g([2.0, 3.0, 1.0])
+    assert np.all(val == np.array([8, 8, 4, -1]))
+    assert np.allclose(jac, np.array([[4, 2, 0], [0, 8*np.log(2), 0], [0, 0, 0], [0, 0, -1]]))
+
+def test_output_buffers():
+    g = compile(lambda x: [x[0]*x[1], x[0] - x[1]], 2)
+    val = np.empty(2)
+    jac = np.full((2, 2), 7.0)
+    out = g([3.0, 4.0], val, jac)
+    assert out[0] is val and out[1] is jac
+    assert np.all(jac == np.array([[4, 3], [1, -1]]))
+
+def test_source():
+    g = compile(lambda x: x[0]**2, 1)
+    assert 'def compiled(x' in g.source
+    assert g([3.0])[1] == [6]
@@ -355,3 +355,137 @@ def test_vector_input_vector_function():
     assert np.all(np.ravel(f.val) == np.array([8, 9]))
     assert np.all(f.der == np.array([[4, 2], [0, 6]]))
 
+
+
+# Test batched evaluation
+
+def test_batch_scalar_function():
+    t = np.linspace(0.1, 2.0, 50)
+    x = ad.batch(t)
+    f = fun.sin(x)*x**2 + fun.exp(x) / x
+    assert f.val.shape == (50,)
+    assert f.der.shape == (50, 1)
+    for i in [0, 17, 49]:
+        g = fun.sin(ad(t[i]))*ad(t[i])**2 + fun.exp(ad(t[i])) / ad(t[i])
+        assert np.isclose(f.val[i], g.val[0])
+        assert np.isclose(f.der[i, 0], g.der[0])
+
+def test_batch_vector_input():
+    points = np.array([[1.0, 2.0], [3.0, 0.5], [0.2, 0.7]])
+    x, y = ad.batch(points)
+    f = x*y + fun.log(y) - 3 / x + y**x
+    assert f.der.shape == (3, 2)
+    for i in range(3):
+        x1 = ad(points[i, 0], [1, 0])
+        y1 = ad(points[i, 1], [0, 1])
+        g = x1*y1 + fun.log(y1) - 3 / x1 + y1**x1
+        assert np.isclose(f.val[i], g.val[0])
+        assert np.all(np.isclose(f.der[i], g.der))
+
+def test_evaluate_batch():
+    x = ad(1.0)
+    f_parsed = x._parse_input('x^3 - 3*x^2 + 4')
+    f = x._evaluate_batch(f_parsed, np.arange(-1, 1, 0.5))
+    assert np.all(f.val == np.array([0, 3.125, 4, 3.375]))
+    assert np.all(np.ravel(f.der) == np.array([9, 3.75, 0, -2.25]))
+    assert np.all((x._evaluate_batch(f_parsed, [1.0, 2.0])**0).der == 0)
+
+
+# Test parsing of string functions
+
+def test_parse_input():
+    x = ad(1.0)
+    f = x._evaluate_function(x._parse_input('x^2 + sin(x) + cos(log(x))'), 2.0)
+    g = ad(2.0)**2 + fun.sin(ad(2.0)) + fun.cos(fun.log(ad(2.0)))
+    assert np.isclose(f.val, g.val)
+    assert np.isclose(f.der, g.der)
+
+def test_parse_input_long_names():
+    x = ad(1.0)
+    f = x._evaluate_function(x._parse_input('arcsin(x) + sqrt(x) + logistic(x) + log10(x)'), 0.5)
+    g = fun.arcsin(ad(0.5)) + fun.sqrt(ad(0.5)) + fun.logistic(ad(0.5)) + fun.log10(ad(0.5))
+    assert np.isclose(f.val, g.val)
+    assert np.isclose(f.der, g.der)
+
+def test_parse_cache():
+    ad.parse_cache_clear()
+    x = ad(1.0)
+    f1 = x._parse_input('x^3 - tan(x)')
+    f2 = x._parse_input('x^3 - tan(x)')
+    assert f1 is f2
+    assert f1.expression == 'x**3 - Function.tan(x)'
+    info = ad.parse_cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+
+def test_parse_input_values():
+    x = ad(1.0)
+    f = x._parse_input('x^2 + sin(x)*logistic(x) - log10(x)')
+    t = np.arange(0.5, 3.0, 0.1)
+    vals = f.values(t)
+    assert isinstance(vals, np.ndarray)
+    assert np.allclose(vals, t**2 + np.sin(t) / (1 + np.exp(-t)) - np.log10(t))
+    assert np.allclose(vals, x._evaluate_batch(f, t).val)
+    assert np.isclose(f.values(2.0), f(ad(2.0)).val[0])
+
+
+# Test the slotted layout and the internal constructor of results
+
+def test_slots():
+    x = ad(2.0)
+    assert not hasattr(x, '__dict__')
+    with pytest.raises(AttributeError):
+        x.other = 1
+
+def test_results_adopt_arrays():
+    x = ad(2.0, [1, 0])
+    y = ad(3.0, [0, 1])
+    f = fun.sin(x*y) + 1
+    assert isinstance(f, ad)
+    assert isinstance(f.val, np.ndarray) and isinstance(f.der, np.ndarray)
+    assert np.isclose(f.val, np.sin(6) + 1)
+    assert np.allclose(f.der, np.cos(6)*np.array([3, 2]))
+
+
+# Test vector variables, indexing, reductions and matmul
+
+def test_variables():
+    x = ad.variables([1.0, 2.0, 3.0])
+    assert len(x) == 3
+    assert np.array_equal(x.der, np.eye(3))
+    f = (x*x).sum() + x[0]*x[2]
+    assert np.allclose(f.val, [17.0])
+    assert np.allclose(f.der, [5.0, 4.0, 7.0])
+
+def test_getitem():
+    x = ad.variables([1.0, 2.0, 3.0])
+    y = fun.exp(x)
+    assert np.allclose(y[1].val, [np.exp(2)])
+    assert np.allclose(y[1].der, [0, np.exp(2), 0])
+    assert np.allclose(y[1:].der, np.diag(np.exp([1.0, 2.0, 3.0]))[1:])
+    assert [v.val[0] for v in x] == [1.0, 2.0, 3.0]
+    z = ad(np.array([1.0, 2.0]))**2
+    assert np.allclose(z[1].der, [4.0])
+
+def test_broadcasting():
+    x = ad.variables([1.0, 2.0, 3.0])
+    f = x[1]*x + x
+    assert np.allclose(f.der, [[3, 1, 0], [0, 5, 0], [0, 3, 3]])
+    g = x[0] / (x + 1)
+    assert np.allclose(g.der, np.eye(3)[0] / np.array([2.0, 3.0, 4.0])[:, None] - np.diag([1 / 4, 1 / 9, 1 / 16]))
+    h = x[2]*np.array([1.0, 2.0])
+    assert np.allclose(h.der, [[0, 0, 1], [0, 0, 2]])
+    assert np.allclose((x[0] + np.array([1.0, 2.0])).der, [[1, 0, 0], [1, 0, 0]])
+
+def test_dot_matmul():
+    x = ad.variables([1.0, 2.0, 3.0])
+    A = np.arange(6.0).reshape(2, 3)
+    f = A @ fun.sin(x)
+    assert np.allclose(f.val, A @ np.sin([1.0, 2.0, 3.0]))
+    assert np.allclose(f.der, A*np.cos([1.0, 2.0, 3.0]))
+    g = x @ A.T
+    assert np.allclose(g.der, A)
+    assert np.allclose(x.dot(x).der, [2.0, 4.0, 6.0])
+    assert np.allclose((x @ x).val, [14.0])
+    assert np.allclose((np.array([1.0, 0.0, 2.0]) @ x).der, [1.0, 0.0, 2.0])
@@ -0,0 +1,72 @@
+# Test suite for the ScalarDual scalar dual numbers using pytest
+
+import pytest
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff as ad, Function
+from DreamDiff.DreamDual import ScalarDual
+
+
+def compare(f, a):
+    '''
+    Checks that f gives the same value and derivative with ScalarDual as
+    with DreamDiff at 'a'.
+    '''
+    with np.errstate(all='ignore'):
+        expected = f(ad(a))
+    result = f(ScalarDual(a))
+    assert isinstance(result, ScalarDual)
+    assert np.allclose(result.val, expected.val, equal_nan=True)
+    assert np.allclose(result.der, expected.der, equal_nan=True)
+
+@pytest.mark.parametrize('f', [
+    lambda x: x + 2 - x*3,
+    lambda x: 2 + x,
+    lambda x: 5 - x,
+    lambda x: x*x / (x + 1),
+    lambda x: 3 / x,
+    lambda x: x**3 - x**0.5 + x**0,
+    lambda x: 2**x + x**x,
+    lambda x: -abs(x),
+    lambda x: +x,
+])
+def test_operators(f):
+    compare(f, 1.7)
+
+@pytest.mark.parametrize('name', ['sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'sinh', 'cosh',
+                                  'tanh', 'sqrt', 'exp', 'log', 'log2', 'log10', 'logistic'])
+def test_elementary(name):
+    compare(lambda x: getattr(Function, name)(x*0.5), 0.8)
+
+@pytest.mark.parametrize('f, a', [
+    (Function.log, 0.0),
+    (Function.log, -1.0),
+    (Function.sqrt, -4.0),
+    (Function.sqrt, 0.0),
+    (Function.arcsin, 2.0),
+    (Function.exp, 1000.0),
+    (Function.cosh, 1000.0),
+    (Function.tanh, 1000.0),
+    (Function.logistic, -1000.0),
+    (Function.sin, np.inf),
+    (lambda x: 1 / x, 0.0),
+    (lambda x: x / 0, 1.0),
+    (lambda x: x**0.5, -8.0),
+    (lambda x: x**-1, 0.0),
+    (lambda x: x**400, 10.0),
+    (lambda x: (-2)**x, 0.5),
+    (lambda x: abs(x), 0.0),
+])
+def test_numpy_edge_cases(f, a):
+    compare(f, a)
+
+def test_comparisons():
+    x = ScalarDual(2.0)
+    assert x > 1 and x < 3 and x <= 2 and x >= ScalarDual(2.0)
+    assert x == 2.0
+    assert x != ScalarDual(2.0, 0.0)
+
+def test_plain_floats():
+    f = Function.exp(ScalarDual(1)) * 2
+    assert type(f._val) is float and type(f._der) is float
+    assert str(f) == 'Values:\n{}\nJacobian:\n{}'.format(f.val, f.der)
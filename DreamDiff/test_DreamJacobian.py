@@ -0,0 +1,83 @@
+# Test suite for chunked forward-mode Jacobians using pytest
+
+import pytest
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff, Function
+from DreamDiff.DreamJacobian import jacobian, jvp, default_chunk_size, parallel_jacobian
+
+
+def f_vector(x):
+    return DreamDiff([x[0]*x[1] + Function.sin(x[2]), Function.exp(x[3]) - x[0]**2, x[1] / x[4]])
+
+def expected_jacobian(x):
+    return np.array([[x[1], x[0], np.cos(x[2]), 0, 0],
+                     [-2*x[0], 0, 0, np.exp(x[3]), 0],
+                     [0, 1 / x[4], 0, 0, -x[1] / x[4]**2]])
+
+def test_jvp_single_direction():
+    x = [1.0, 2.0, 0.5, 0.0, 4.0]
+    v = np.array([1.0, -1.0, 2.0, 0.5, 1.0])
+    result = jvp(f_vector, x, v)
+    assert np.allclose(result.der.ravel(), expected_jacobian(x) @ v)
+
+def test_jvp_block():
+    x = [1.0, 2.0, 0.5, 0.0, 4.0]
+    V = np.arange(15.0).reshape(5, 3)
+    result = jvp(f_vector, x, V)
+    assert result.der.shape == (3, 3)
+    assert np.allclose(result.der, expected_jacobian(x) @ V)
+
+def test_jvp_wrong_shape():
+    with pytest.raises(AssertionError):
+        jvp(f_vector, [1.0, 2.0], np.eye(3))
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8, None])
+def test_jacobian_chunks(chunk_size):
+    x = [1.0, 2.0, 0.5, 0.0, 4.0]
+    result = jacobian(f_vector, x, chunk_size=chunk_size)
+    assert np.allclose(result.val.ravel(), [2 + np.sin(0.5), 0.0, 0.5])
+    assert np.allclose(result.der, expected_jacobian(x))
+
+def test_jacobian_scalar():
+    result = jacobian(lambda x: x[0]*Function.log(x[1]) + x[2]**3, [2.0, np.e, 1.0], chunk_size=2)
+    assert result.der.shape == (3,)
+    assert np.allclose(result.der, [1.0, 2 / np.e, 3.0])
+
+def test_jacobian_bad_chunk():
+    with pytest.raises(AssertionError):
+        jacobian(f_vector, [1.0, 2.0, 0.5, 0.0, 4.0], chunk_size=0)
+
+def test_default_chunk_size():
+    assert default_chunk_size(1) == 1
+    assert 1 <= default_chunk_size(10**7) <= 10**7
+    assert default_chunk_size(10) <= 10
+
+def f_chain(x):
+    return DreamDiff([x[j]*Function.sin(x[j + 1]) for j in range(len(x) - 1)])
+
+@pytest.mark.parametrize('chunk_size', [None, 1, 4])
+def test_parallel_jacobian(chunk_size):
+    x = np.linspace(0.1, 1.2, 12)
+    result = parallel_jacobian(f_chain, x, workers=2, chunk_size=chunk_size)
+    serial = jacobian(f_chain, x)
+    assert np.allclose(result.val, serial.val)
+    assert np.allclose(result.der, serial.der)
+
+def test_parallel_jacobian_serial_fallback():
+    x = [1.0, 2.0, 0.5, 0.0, 4.0]
+    result = parallel_jacobian(f_vector, x, workers=4)
+    assert np.allclose(result.der, expected_jacobian(x))
+
+def test_parallel_jacobian_lambda():
+    f = lambda x: DreamDiff([x[j]*x[j + 1] for j in range(9)])
+    result = parallel_jacobian(f, np.arange(10.0), workers=2)
+    assert np.allclose(result.der[0], np.eye(10)[0])
+    assert np.allclose(result.der[8], 9*np.eye(10)[8] + 8*np.eye(10)[9])
+
+def test_parallel_jacobian_bad_arguments():
+    x = np.linspace(0.1, 1.2, 12)
+    with pytest.raises(AssertionError):
+        parallel_jacobian(f_chain, x, workers=0)
+    with pytest.raises(AssertionError):
+        parallel_jacobian(f_chain, x, workers=2, chunk_size=0)
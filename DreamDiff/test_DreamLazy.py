@@ -0,0 +1,68 @@
+# Test suite for the lazy LazyDiff graph using pytest
+
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff as ad, Function
+from DreamDiff.DreamLazy import LazyDiff
+
+
+def test_val_matches_dreamdiff():
+    x = LazyDiff(np.array([0.5, 1.0, 2.0]))
+    x1 = ad(np.array([0.5, 1.0, 2.0]))
+    f = Function.exp(x) - x**2 / (1 + Function.sin(x))
+    f1 = Function.exp(x1) - x1**2 / (1 + Function.sin(x1))
+    assert np.allclose(f.val, f1.val)
+    assert np.allclose(f.der, f1.der)
+
+def test_val_does_not_compute_der():
+    x = LazyDiff(1.0)
+    f = Function.log(x + 2) * 3
+    assert np.allclose(f.val, np.log(3) * 3)
+    assert f._dual is None
+    assert np.allclose(f.der, [1])
+    assert f._dual is not None
+
+def test_der_cached():
+    x = LazyDiff(2.0)
+    f = Function.sqrt(x)
+    dual = f.dual
+    assert f.dual is dual
+    assert np.allclose(f.der, [0.5 / np.sqrt(2)])
+
+def test_multivariate():
+    x = LazyDiff(2.0, input_pos=[2, 0])
+    y = LazyDiff(3.0, input_pos=[2, 1])
+    f = x**y + 2**x - Function.arctan(y) * x
+    x1 = ad(2.0, input_pos=[2, 0])
+    y1 = ad(3.0, input_pos=[2, 1])
+    f1 = x1**y1 + 2**x1 - Function.arctan(y1) * x1
+    assert np.allclose(f.val, f1.val)
+    assert np.allclose(f.der, f1.der)
+    assert f == f1
+
+def test_shared_subexpression():
+    x = LazyDiff(1.0)
+    s = Function.tanh(x)
+    f = s*s + s
+    assert np.allclose(f.val, np.tanh(1)**2 + np.tanh(1))
+    assert np.allclose(f.der, (2*np.tanh(1) + 1) / np.cosh(1)**2)
+
+def test_deep_graph():
+    x = LazyDiff(1.0)
+    f = x
+    for _ in range(5000):
+        f = f + x*0.001
+    assert np.allclose(f.val, [6.0])
+    assert np.allclose(f.der, [6.0])
+
+def test_comparisons():
+    x = LazyDiff(1.0)
+    assert x + 1 > 1.5
+    assert x < LazyDiff(2.0)
+    assert -x <= -1
+    assert abs(-x) >= 1
+    assert x != LazyDiff(2.0)
+
+def test_str():
+    x = LazyDiff(2.0)
+    assert str(x**2) == str(ad(2.0)**2)
@@ -8,6 +8,7 @@
 #from DreamDiff import DreamDiff as ad
 #from DreamOptimize import Optimize
 from DreamDiff.DreamDiff import DreamDiff as ad
+from DreamDiff.DreamDiff import Function as fun
 from DreamDiff.DreamOptimize import Optimize
 
 import numpy as np
@@ -15,6 +16,25 @@ import pytest
 import math
 import matplotlib.pyplot as plt
 
+
+def tridiagonal_system(n):
+    '''
+    Returns a nonlinear system of 'n' equations with a cyclic tridiagonal
+    Jacobian, shared by the tests of the system solvers.
+    '''
+    b = np.random.default_rng(1).random(n)
+    def f(x):
+        return ad([4*x[i] - x[i - 1] - x[(i + 1) % n] + 0.1*fun.sin(x[i])**2*x[i] - b[i] for i in range(n)])
+    return f
+
+def ill_conditioned_quadratic(n):
+    '''
+    Returns a convex quadratic of 'n' variables with curvatures from 1 to
+    100, and its minimizer.
+    '''
+    d = np.logspace(0, 2, n)
+    return lambda x: 0.5*(d*x*x).sum() - x.sum(), 1 / d
+
 # Test 1: Newton's method
 def test_Newton():
 
@@ -68,3 +88,376 @@ def test_animate_gradient():
 def test_animate_newtons():
     f = 'x^3 - 3*x^2 + 4'
     assert(Optimize.animate_newtons(f, 0.3, epsilon=0.000001, max_iters=500, runtime=20) == None)
+
+
+# Test 8: Scalar solvers evaluate with ScalarDual and match DreamDiff
+def test_scalar_fast_path():
+    from DreamDiff.DreamOptimize import _evaluate_scalar
+    x = ad(1.0)
+    f = x._parse_input('x^3 - 3*x + sin(x) + exp(x)/2')
+    yn, der = _evaluate_scalar(x, f, 1.3)
+    expected = x._evaluate_function(f, 1.3)
+    assert type(yn) is float and type(der) is float
+    assert np.isclose(yn, expected.val[0]) and np.isclose(der, expected.der[0])
+    yn, der = _evaluate_scalar(x, f, np.array([1.3]))
+    assert np.isclose(yn, expected.val[0]) and np.isclose(der, expected.der[0])
+    root, xs, ys, ders = Optimize.newtons_method('log(x) - 1', 2.0, 1e-10, 100)
+    assert np.isclose(root, np.e)
+    assert all(type(d) is float for d in ders)
+
+
+# Test 9: Newton's method for systems of equations
+def test_lu_factor_solve():
+    from DreamDiff.DreamOptimize import _lu_factor, _lu_solve
+    rng = np.random.default_rng(0)
+    A = rng.random((30, 30))
+    b = rng.random(30)
+    assert np.allclose(_lu_solve(_lu_factor(A), b), np.linalg.solve(A, b))
+    assert _lu_factor(np.array([[1.0, 2.0], [2.0, 4.0]])) is None
+
+def test_newtons_system():
+    x, norms, n_jac = Optimize.newtons_system('[x[0]^2 - 2, x[0]*x[1] - 1]', [1.0, 1.0])
+    assert np.allclose(x, [np.sqrt(2), 1 / np.sqrt(2)])
+    assert norms[-1] < 1e-6 and n_jac == len(norms) - 1
+    f = lambda x: [x[0] + x[1] + x[2] - 6, x[0]*x[1]*x[2] - 6, x[0]**2 - x[1]]
+    x, norms, n_jac = Optimize.newtons_system(f, [0.8, 1.5, 3.5], 1e-10)
+    assert np.allclose([x.sum(), x.prod(), x[0]**2 - x[1]], [6, 6, 0])
+
+def test_newtons_system_reuse():
+    n = 40
+    f = tridiagonal_system(n)
+    newton = Optimize.newtons_system(f, np.zeros(n), 1e-10, 50)
+    chord = Optimize.newtons_system(f, np.zeros(n), 1e-10, 50, refresh=None)
+    shamanskii = Optimize.newtons_system(f, np.zeros(n), 1e-10, 50, refresh=3)
+    for x, norms, n_jac in (newton, chord, shamanskii):
+        assert norms[-1] < 1e-10
+        assert np.allclose(x, newton[0])
+    assert chord[2] == 1
+    assert shamanskii[2] < newton[2]
+
+def test_newtons_system_failures():
+    assert Optimize.newtons_system(lambda x: [x[0]**2 + 1, x[1]], [1.0, 1.0], max_iters=10) is None
+    with pytest.raises(Exception):
+        Optimize.newtons_system('[x[0] - 1, x[1] - 1, x[0]*x[1]]', [0.0, 0.0])
+    with pytest.raises(AssertionError):
+        Optimize.newtons_system('[x[0] - 1]', [0.0], refresh=0)
+
+# Test 10: Broyden's quasi-Newton method
+def test_broyden():
+    for method in ('good', 'bad'):
+        x, norms, n_jac, n_eval = Optimize.broyden('[x[0]^2 - 2, x[0]*x[1] - 1]', [1.0, 1.0], method=method)
+        assert np.allclose(x, [np.sqrt(2), 1 / np.sqrt(2)])
+        assert norms[-1] < 1e-6
+        assert n_jac == 1 and n_eval == len(norms)
+
+def test_broyden_fewer_jacobians():
+    n = 40
+    f = tridiagonal_system(n)
+    newton = Optimize.newtons_system(f, np.zeros(n), 1e-10, 50)
+    x, norms, n_jac, n_eval = Optimize.broyden(f, np.zeros(n), 1e-10, 50)
+    assert np.allclose(x, newton[0])
+    assert n_jac < newton[2]
+
+def test_broyden_refresh():
+    # A poor initial Jacobian forces the DreamDiff Jacobian to be recomputed
+    f = lambda x: [fun.exp(x[0]) - 2 + x[1], x[0]**3 + x[1]]
+    x, norms, n_jac, n_eval = Optimize.broyden(f, [3.0, 3.0], 1e-10)
+    assert np.allclose([np.exp(x[0]) - 2 + x[1], x[0]**3 + x[1]], [0, 0])
+    assert 1 < n_jac < len(norms)
+
+def test_broyden_failures():
+    assert Optimize.broyden('[x[0] - x[1], 2*x[0] - 2*x[1] - 1]', [1.0, 1.0]) is None
+    with pytest.raises(Exception):
+        Optimize.broyden('[x[0] - 1]', [0.0], method='ugly')
+    with pytest.raises(Exception):
+        Optimize.broyden('[x[0] - 1, x[1] - 1, x[0]*x[1]]', [0.0, 0.0])
+
+# Test 11: Jacobian-free Newton-Krylov
+def test_gmres():
+    from DreamDiff.DreamOptimize import _gmres
+    rng = np.random.default_rng(0)
+    A = 5*np.eye(60) + 0.3*rng.random((60, 60))
+    b = rng.random(60)
+    for restart in (3, 10, 60):
+        x, n_matvec = _gmres(lambda v: A @ v, b, 1e-10, restart, 100)
+        assert np.linalg.norm(A @ x - b) <= 1e-10*np.linalg.norm(b)
+    x, n_matvec = _gmres(lambda v: v, b, 1e-10, 5, 5)
+    assert np.allclose(x, b)
+    x, n_matvec = _gmres(lambda v: A @ v, np.zeros(60), 1e-10, 5, 5)
+    assert not x.any() and n_matvec == 0
+
+def test_newton_krylov():
+    x, norms, n_jvp = Optimize.newton_krylov('[x[0]^2 - 2, x[0]*x[1] - 1]', [1.0, 1.0])
+    assert np.allclose(x, [np.sqrt(2), 1 / np.sqrt(2)])
+    assert norms[-1] < 1e-6 and n_jvp > 0
+    n = 100
+    f = tridiagonal_system(n)
+    newton = Optimize.newtons_system(f, np.zeros(n), 1e-10, 50)
+    for restart in (2, 20):
+        x, norms, n_jvp = Optimize.newton_krylov(f, np.zeros(n), 1e-10, 50, restart=restart, gmres_tol=1e-4)
+        assert np.allclose(x, newton[0])
+
+def test_newton_krylov_failures():
+    assert Optimize.newton_krylov(lambda x: [x[0]**2 + 1, x[1]], [1.0, 1.0], max_iters=10) is None
+    with pytest.raises(Exception):
+        Optimize.newton_krylov('[x[0] - 1, x[1] - 1, x[0]*x[1]]', [0.0, 0.0])
+    with pytest.raises(AssertionError):
+        Optimize.newton_krylov('[x[0] - 1]', [0.0], restart=0)
+    with pytest.raises(AssertionError):
+        Optimize.newton_krylov('[x[0] - 1]', [0.0], gmres_tol=1.5)
+
+# Test 12: Gradient descent and Nesterov on vector parameters
+def test_grad_descent_vector():
+    f = '(x[0] - 1)^2 + 10*(x[1] + 2)^2'
+    for method in (Optimize.grad_descent, Optimize.nesterov_grad_descent):
+        x, xs, ys, ders = method(f, [0.0, 0.0], 1e-8, 2000, 0.04)
+        assert np.allclose(x, [1, -2], atol=1e-6)
+        assert len(xs) == len(ys) == len(ders)
+        assert np.allclose(xs[0], [0, 0]) and np.allclose(ders[0], [-2, 40])
+
+def test_grad_descent_many_parameters():
+    n = 2000
+    c = np.linspace(-1, 1, n)
+    f = lambda x: ((x - c)**2).sum() + 0.1*fun.log(1 + x*x).sum()
+    x0 = np.zeros(n)
+    x, xs, ys, ders = Optimize.grad_descent(f, x0, 1e-8, 500, 0.2, criterion='grad')
+    assert np.linalg.norm(ders[-1]) < 1e-8
+    assert np.allclose(2*(x - c) + 0.2*x / (1 + x*x), 0, atol=1e-7)
+    assert not x0.any()
+    x1 = Optimize.nesterov_grad_descent(f, x0, 1e-8, 500, 0.2, criterion='grad')[0]
+    assert np.allclose(x, x1)
+
+def test_grad_descent_criterion():
+    x, xs, ys, ders = Optimize.grad_descent('x^2', 1.0, 0.001, 5000, 0.1, criterion='grad')
+    assert abs(ders[-1]) < 0.001
+    with pytest.raises(Exception):
+        Optimize.grad_descent('x^2', 1.0, criterion='value')
+
+def test_grad_descent_0d_start():
+    for method in (Optimize.grad_descent, Optimize.nesterov_grad_descent):
+        for line_search in (None, 'wolfe'):
+            x = method('(x - 2)^2', np.array(0.0), 1e-8, 1000, 0.1, line_search=line_search)[0]
+            assert np.isclose(x, 2)
+
+# Test 13: L-BFGS with a strong Wolfe line search
+def test_wolfe_search():
+    from DreamDiff.DreamOptimize import _wolfe_search
+    evaluate = lambda x: (float(np.sum(x**4 - 3*x)), 4*x**3 - 3)
+    x = np.array([0.0, 2.0])
+    f0, g0 = evaluate(x)
+    for alpha in (0.001, 1.0, 100.0):
+        step, f, g, n_evals = _wolfe_search(evaluate, x, f0, g0, -g0, alpha)
+        assert f <= f0 + 0.0001*step*(g0 @ -g0)
+        assert abs(g @ g0) <= 0.9*(g0 @ g0)
+        assert np.allclose(f, evaluate(x - step*g0)[0])
+        assert np.allclose(g, evaluate(x - step*g0)[1])
+
+def test_lbfgs():
+    f = '100*(x[1] - x[0]^2)^2 + (1 - x[0])^2'
+    x, ys, norms, n_evals = Optimize.lbfgs(f, [-1.2, 1.0])
+    assert np.allclose(x, [1, 1], atol=1e-6)
+    assert norms[-1] < 1e-6 and len(ys) == len(norms) <= n_evals
+    x = Optimize.lbfgs('x^2 - 2*x', 5.0)[0]
+    assert np.allclose(x, [1])
+
+def test_lbfgs_fewer_iterations():
+    n = 500
+    f, minimum = ill_conditioned_quadratic(n)
+    x, ys, norms, n_evals = Optimize.lbfgs(f, np.zeros(n), 1e-6, 1000, m=5)
+    assert np.allclose(x, minimum)
+    descent = Optimize.grad_descent(f, np.zeros(n), 1e-6, 20000, 0.01, criterion='grad')
+    assert 10*len(norms) < len(descent[1])
+
+def test_lbfgs_failures():
+    assert Optimize.lbfgs(lambda x: -x.sum()**2, [1.0], max_iters=5) is None
+    with pytest.raises(AssertionError):
+        Optimize.lbfgs('x^2', 1.0, m=0)
+
+# Test 14: Armijo and Wolfe line searches for gradient descent
+def test_armijo_search():
+    from DreamDiff.DreamOptimize import _armijo_search
+    evaluate = lambda x: (x**4 - 3*x, 4*x**3 - 3)
+    f0, g0 = evaluate(2.0)
+    step, f, g, n_evals = _armijo_search(evaluate, 2.0, f0, g0, -g0, 1.0)
+    assert f <= f0 - 0.0001*step*g0**2
+    assert (f, g) == evaluate(2.0 - step*g0)
+    assert n_evals == 1 - np.log2(step)
+
+def test_line_search_descent():
+    for method in (Optimize.grad_descent, Optimize.nesterov_grad_descent):
+        for line_search in ('armijo', 'wolfe'):
+            x, xs, ys, ders, n_evals = method('x^4 - 3*x', 5.0, 1e-8, 1000, 1.0, line_search=line_search)
+            assert np.isclose(x, 0.75**(1 / 3))
+            assert len(xs) <= n_evals < 150
+
+def test_line_search_vector():
+    n = 200
+    f, minimum = ill_conditioned_quadratic(n)
+    for method in (Optimize.grad_descent, Optimize.nesterov_grad_descent):
+        for line_search in ('armijo', 'wolfe'):
+            x, xs, ys, ders, n_evals = method(f, np.zeros(n), 1e-6, 5000, 1.0, 'grad', line_search)
+            assert np.allclose(x, minimum)
+
+def test_line_search_fewer_evaluations():
+    # One fixed-step run per learning rate in a sweep, against one searched run
+    sweep = 0
+    for eta in (1.0, 0.3, 0.1, 0.03, 0.01):
+        result = Optimize.grad_descent('x^4 - 3*x', 5.0, 1e-8, 1000, eta)
+        sweep += 1000 if result is None else len(result[1])
+    n_evals = Optimize.grad_descent('x^4 - 3*x', 5.0, 1e-8, 1000, 1.0, line_search='wolfe')[4]
+    assert 10*n_evals < sweep
+    with pytest.raises(Exception):
+        Optimize.grad_descent('x^2', 1.0, line_search='exact')
+
+# Test 15: Multi-start gradient descent in lockstep
+def test_multistart_grad_descent():
+    f = 'x^4 - 4*x^2 + x'
+    x0 = np.array([-3.0, 0.5, 3.0])
+    x, values, iterations, converged, best_x, best_f = Optimize.multistart_grad_descent(f, x0, 1e-6, 500, 0.01)
+    assert converged.all()
+    for j in range(3):
+        single = Optimize.grad_descent(f, x0[j], 1e-6, 500, 0.01)
+        assert np.isclose(x[j], single[0])
+        assert iterations[j] == len(single[1])
+    assert np.allclose(values, x**4 - 4*x**2 + x)
+    assert best_x == x[0] and best_f == values.min()
+
+def test_multistart_many_starts():
+    x0 = np.linspace(-3, 3, 2000)
+    f = lambda x: fun.sin(3*x) + 0.1*x**2
+    x, values, iterations, converged, best_x, best_f = Optimize.multistart_grad_descent(f, x0, 1e-8, 2000, 0.05)
+    assert converged.all() and iterations.min() < iterations.max()
+    assert np.allclose(3*np.cos(3*x) + 0.2*x, 0, atol=1e-6)
+    assert np.isclose(best_x, -0.5122, atol=1e-4)
+
+def test_multistart_freezes_lanes():
+    x, values, iterations, converged, best_x, best_f = Optimize.multistart_grad_descent('x^3', [1.0, 0.0], 1e-6, 50, 1.0)
+    assert list(converged) == [False, True]
+    assert iterations[1] == 1 and iterations[0] < 50
+    assert best_x == 0 and best_f == 0
+    assert Optimize.multistart_grad_descent('x^3', [1.0], 1e-6, 50, 1.0)[4] is None
+
+# Test 16: All roots on an interval
+def test_hybrid_root():
+    from DreamDiff.DreamOptimize import _hybrid_root
+    f = ad(1.0)._parse_input('x^3 - 2*x - 5')
+    root, n_evals, steps = _hybrid_root(f, 2.0, 3.0, -1.0, 16.0, 1e-12, 100)
+    assert np.isclose(root**3 - 2*root - 5, 0)
+    assert n_evals == sum(steps.values()) + 1
+    # Newton from the midpoint of this bracket would leave it
+    f = ad(1.0)._parse_input('arctan(x)')
+    assert abs(_hybrid_root(f, -20.0, 4.0, np.arctan(-20), np.arctan(4), 1e-12, 100)[0]) < 1e-10
+    assert _hybrid_root(f, -20.0, 4.0, np.arctan(-20), np.arctan(4), 1e-12, 3)[0] is None
+
+def test_find_roots():
+    roots = Optimize.find_roots('cos(x)', 0, 10)
+    assert np.allclose(roots, [np.pi / 2, 3*np.pi / 2, 5*np.pi / 2])
+    assert np.allclose(Optimize.find_roots(lambda x: x**2 - 2, -3, 3), [-np.sqrt(2), np.sqrt(2)])
+    assert len(Optimize.find_roots('x^2 + 1', -3, 3)) == 0
+    assert np.allclose(Optimize.find_roots('x^2', -1, 1, n_intervals=10), [0])
+    # The sign change at the pole of tan is not a root
+    assert np.allclose(Optimize.find_roots('tan(x)', 0.5, 5), [np.pi])
+
+def test_find_roots_parallel():
+    f = 'sin(x^2)'
+    serial = Optimize.find_roots(f, 0, 30, 20000, epsilon=1e-10, workers=1)
+    assert np.allclose(serial, np.sqrt(np.pi*np.arange(len(serial))))
+    assert len(serial) == 287
+    parallel = Optimize.find_roots(f, 0, 30, 20000, epsilon=1e-10, workers=2)
+    assert np.allclose(serial, parallel)
+    with pytest.raises(AssertionError):
+        Optimize.find_roots(f, 1, 0)
+    with pytest.raises(AssertionError):
+        Optimize.find_roots(f, 0, 1, n_intervals=0)
+    with pytest.raises(AssertionError):
+        Optimize.find_roots(f, 0, 1, workers=0)
+
+# Test 17: Safeguarded hybrid Newton root finder
+def test_hybrid_newton():
+    f = 'x^3 - 2*x + 2'
+    # Plain Newton cycles between 0 and 1 from x0 = 0
+    assert Optimize.newtons_method(f, 0.0, max_iters=50) is None
+    root, n_evals, steps = Optimize.hybrid_newton(f, -3, 3, x0=0.0)
+    assert np.isclose(root**3 - 2*root + 2, 0, atol=1e-6)
+    assert n_evals < 15 and steps['newton'] > 0
+    assert set(steps) == {'newton', 'interpolation', 'bisection'}
+
+def test_hybrid_newton_bounded():
+    # Zero derivative at the start and a multiple root
+    for f, a, b in (('x^3', -1, 2), ('(x - 1)^9', -1, 2), ('arctan(x)', -20, 4)):
+        root, n_evals, steps = Optimize.hybrid_newton(f, a, b, x0=0.0, epsilon=1e-12)
+        assert n_evals <= 2 + 3*np.log2((b - a) / 1e-12) + 3
+    assert Optimize.hybrid_newton('x - 1', 0, 2)[0] == 1
+    assert Optimize.hybrid_newton('x - 1', 1, 2)[:2] == (1, 2)
+    assert Optimize.hybrid_newton('x - 1', 0, 2, max_iters=0) is None
+    with pytest.raises(AssertionError):
+        Optimize.hybrid_newton('x^2 + 1', -1, 1)
+    with pytest.raises(AssertionError):
+        Optimize.hybrid_newton('x - 1', 0, 2, x0=3)
+    with pytest.raises(AssertionError):
+        Optimize.hybrid_newton('x - 1', 2, 0)
+
+# Test 18: Solver iterators
+def test_grad_descent_iter():
+    f = lambda x: ((x - 1)**2).sum()
+    steps = Optimize.grad_descent_iter(f, np.zeros(3), max_iters=1000)
+    states = [(s.iteration, s.f, np.linalg.norm(s.grad)) for s in steps]
+    classic = Optimize.grad_descent(f, np.zeros(3), max_iters=1000)
+    assert len(states) == len(classic[2])
+    assert np.allclose([s[1] for s in states], classic[2])
+    assert np.allclose(classic[0], [1, 1, 1], atol=1e-5)
+    # The generator returns its status once exhausted
+    steps = Optimize.grad_descent_iter('(x - 1)^2', 0.0)
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            state = next(steps)
+    assert stop.value.value == 'converged'
+    assert np.isclose(state.x + state.step, 1, atol=1e-5)
+
+def test_iter_callback_stops():
+    seen = []
+    steps = Optimize.nesterov_grad_descent_iter('(x - 3)^2', 0.0, 1e-6, 500, 0.1,
+                                                callback=lambda s: seen.append(s.f) or s.f < 1e-3)
+    states = list(steps)
+    assert len(states) == len(seen) and states[-1].f < 1e-3 <= states[-2].f
+    steps = Optimize.lbfgs_iter('(x[0] - 1)^2 + 10*(x[1] + 2)^2', [0.0, 0.0], callback=lambda s: s.iteration == 1)
+    assert [s.iteration for s in steps] == [0, 1]
+    # Line search states count the evaluations
+    evals = [s.evals for s in Optimize.grad_descent_iter('x^4', 2.0, line_search='wolfe')]
+    assert evals == sorted(evals) and evals[-1] == Optimize.grad_descent('x^4', 2.0, line_search='wolfe')[-1]
+
+def test_newtons_method_iter():
+    states = list(Optimize.newtons_method_iter('x^2 - 2', 1.0))
+    assert np.isclose(states[-1].x, np.sqrt(2)) and states[-1].step == 0
+    assert [s.x for s in states] == Optimize.newtons_method('x^2 - 2', 1.0)[1]
+    states = list(Optimize.newtons_method_iter('x^2 + 1', 0.0))
+    assert len(states) == 1 and states[0].step is None
+    with pytest.raises(Exception):
+        Optimize.grad_descent_iter('x^2', 1.0, criterion='value')
+
+def test_system_iter():
+    n = 40
+    f = tridiagonal_system(n)
+    x, norms, n_jac = Optimize.newtons_system(f, np.zeros(n), 1e-10, 50, refresh=3)
+    states = list(Optimize.newtons_system_iter(f, np.zeros(n), 1e-10, 50, refresh=3))
+    assert [s.norm for s in states] == norms
+    assert np.array_equal(states[-1].x, x) and states[-1].evals == {'jacobian': n_jac}
+    for method in (Optimize.broyden_iter, Optimize.newton_krylov_iter):
+        states = list(method(f, np.zeros(n), 1e-10, 50, callback=lambda s: s.norm < 1e-3))
+        assert states[-1].norm < 1e-3 <= min(s.norm for s in states[:-1])
+    # A singular Jacobian leaves no step to take
+    states = list(Optimize.newtons_system_iter(lambda x: [x[0]**2 + 1, x[1]], [0.0, 1.0]))
+    assert len(states) == 1 and states[0].step is None
+    # Options are checked before the first iteration
+    with pytest.raises(Exception):
+        Optimize.broyden_iter('[x[0] - 1]', [0.0], method='ugly')
+
+def test_hybrid_newton_iter():
+    f = 'x^3 - 2*x + 2'
+    states = list(Optimize.hybrid_newton_iter(f, -3, 0))
+    root, n_evals, steps = Optimize.hybrid_newton(f, -3, 0)
+    assert states[-1].x + states[-1].step == root
+    assert states[-1].evals == n_evals == len(states) + 2
+    assert [s.x for s in Optimize.hybrid_newton_iter('x - 1', 1, 2)] == [1]
+    with pytest.raises(AssertionError):
+        Optimize.hybrid_newton_iter('x^2 + 1', -1, 1)
@@ -0,0 +1,92 @@
+# Test suite for DreamReverse using pytest
+
+import pytest
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff as ad
+from DreamDiff.DreamDiff import Function as fun
+from DreamDiff.DreamReverse import DreamReverse as rev
+
+
+# Test initialization
+
+def test_scalar_input():
+    x = rev(2.0)
+    assert x.val == [2]
+    assert x.der == [1]
+
+def test_variables():
+    x, y, z = rev.variables([1.0, 2.0, 3.0])
+    assert x.tape is y.tape is z.tape
+    assert np.all(y.der == np.array([0, 1, 0]))
+
+    with pytest.raises(AssertionError):
+        rev([1.0, 2.0])
+
+
+# Test operations against forward mode
+
+def test_basic_operations():
+    x, y = rev.variables([2.0, 4.0])
+    x1 = ad(2.0, [1, 0])
+    y1 = ad(4.0, [0, 1])
+    for f in [lambda a, b: a + b, lambda a, b: 3 - a*b, lambda a, b: a / b,
+              lambda a, b: 1 / a - b, lambda a, b: a**b, lambda a, b: 2**a + b**3,
+              lambda a, b: abs(-a) + (-b), lambda a, b: (a + 1)*(b - 2)*a]:
+        r = f(x, y)
+        d = f(x1, y1)
+        assert np.allclose(r.val, d.val)
+        assert np.allclose(r.der, d.der)
+
+def test_elementary_functions():
+    names = ['sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'sinh', 'cosh',
+             'tanh', 'sqrt', 'exp', 'log', 'log2', 'log10', 'logistic']
+    for name in names:
+        x, y = rev.variables([0.3, 0.5])
+        x1 = ad(0.3, [1, 0])
+        y1 = ad(0.5, [0, 1])
+        r = getattr(fun, name)(x*y)
+        d = getattr(fun, name)(x1*y1)
+        assert np.allclose(r.val, d.val)
+        assert np.allclose(r.der, d.der)
+
+def test_shared_subexpression():
+    x, y = rev.variables([1.5, -0.5])
+    s = fun.sin(x*y)
+    f = s*s + s*x
+    x1 = ad(1.5, [1, 0])
+    y1 = ad(-0.5, [0, 1])
+    s1 = fun.sin(x1*y1)
+    f1 = s1*s1 + s1*x1
+    assert np.allclose(f.der, f1.der)
+
+def test_many_inputs():
+    xs = rev.variables(np.arange(1.0, 101.0))
+    f = 0
+    for v in xs:
+        f = f + v**2
+    assert np.allclose(f.der, 2*np.arange(1.0, 101.0))
+
+def test_vector_function():
+    x, y = rev.variables([2.0, 3.0])
+    f = ad([x + y*x, y**2])
+    assert np.all(np.ravel(f.val) == np.array([8, 9]))
+    assert np.all(f.der == np.array([[4, 2], [0, 6]]))
+
+def test_different_tapes():
+    x = rev(1.0)
+    y = rev(2.0)
+    with pytest.raises(Exception):
+        x + y
+
+
+# Test comparison operators
+
+def test_comparisons():
+    x, y = rev.variables([2.0, 3.0])
+    assert x < y
+    assert y > 2
+    assert x <= 2
+    assert y >= x
+    assert rev(2.0) == rev(2.0)
+    assert x != y
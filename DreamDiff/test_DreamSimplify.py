@@ -0,0 +1,62 @@
+# Test suite for expression graph optimization using pytest
+
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff as ad
+from DreamDiff.DreamDiff import Function as fun
+from DreamDiff.DreamCompile import compile, trace
+from DreamDiff.DreamSimplify import optimize_graph, optimize_expression
+
+
+# Test graph optimization
+
+def test_common_subexpressions():
+    graph, outputs, vector = trace(lambda x: fun.sin(x[0]*x[1]) + fun.sin(x[1]*x[0]), 2)
+    new, new_outputs, eliminated = optimize_graph(graph, outputs)
+    ops = [op for op, args in new.nodes]
+    assert ops.count('sin') == 1
+    assert ops.count('mul') == 1
+    assert eliminated == 2
+
+def test_constant_folding():
+    graph, outputs, vector = trace(lambda x: (x[0] + 0)*1 + 2*3, 1)
+    new, new_outputs, eliminated = optimize_graph(graph, outputs)
+    ops = [op for op, args in new.nodes]
+    assert ops == ['input', 'const', 'add']
+    assert new.nodes[1][1] == 6
+
+def test_dead_nodes():
+    def f(x):
+        unused = fun.exp(x[0])
+        return x[0]*x[1]
+    graph, outputs, vector = trace(f, 2)
+    new, new_outputs, eliminated = optimize_graph(graph, outputs)
+    assert eliminated == 1
+
+def test_compile_optimized():
+    f = lambda x: ad([fun.sin(x[0]*x[1])*fun.cos(x[1]*x[0]) + (x[0] + 0)*1, fun.sin(x[1]*x[0])])
+    g = compile(f, 2)
+    assert g.eliminated > 0
+    x = np.array([0.4, 1.1])
+    result = f([ad(x[0], [1, 0]), ad(x[1], [0, 1])])
+    val, jac = g(x)
+    assert np.allclose(val, np.ravel(result.val))
+    assert np.allclose(jac, result.der)
+
+
+# Test string expression optimization
+
+def test_optimize_expression():
+    source, eliminated = optimize_expression('Function.sin(x)**2 + Function.sin(x) + 2*3')
+    assert source.count('Function.sin') == 1
+    assert '6' in source
+    assert eliminated == 2
+
+def test_parsed_function():
+    x = ad(1.0)
+    f = x._parse_input('sin(x)^2 + sin(x)*cos(x) + cos(x) + 2^3')
+    assert f.eliminated == 3
+    y = x._evaluate_function(f, 0.3)
+    g = fun.sin(ad(0.3))**2 + fun.sin(ad(0.3))*fun.cos(ad(0.3)) + fun.cos(ad(0.3)) + 8
+    assert np.isclose(y.val, g.val)
+    assert np.isclose(y.der, g.der)
@@ -0,0 +1,101 @@
+# Test suite for sparse derivative storage using pytest
+
+import pytest
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff as ad
+from DreamDiff.DreamDiff import Function as fun
+from DreamDiff.DreamSparse import SparseDer
+
+
+# Test SparseDer arithmetic
+
+def test_toarray():
+    d = SparseDer((5,), [1, 3], [2.0, -1.0])
+    assert np.all(d.toarray() == np.array([0, 2, 0, -1, 0]))
+    assert d.nnz == 2
+    assert d.ndim == 1
+
+def test_add_sub():
+    a = SparseDer((5,), [1, 3], [2.0, -1.0])
+    b = SparseDer((5,), [0, 3], [1.0, 4.0])
+    assert isinstance(a + b, SparseDer)
+    assert np.all((a + b).toarray() == np.array([1, 2, 0, 3, 0]))
+    assert np.all((a - b).toarray() == np.array([-1, 2, 0, -5, 0]))
+    assert np.all((a + np.ones(5)) == np.array([1, 3, 1, 0, 1]))
+    assert np.all((np.ones(5) - a) == np.array([1, -1, 1, 2, 1]))
+
+def test_mul_div():
+    a = SparseDer((2, 3), [1, 5], [2.0, -1.0])
+    assert isinstance(np.array([3.0])*a, SparseDer)
+    assert np.all((np.array([3.0])*a).toarray() == np.array([[0, 6, 0], [0, 0, -3]]))
+    assert np.all((np.array([[2.0], [5.0]])*a).toarray() == np.array([[0, 4, 0], [0, 0, -5]]))
+    assert np.all((a / 2).toarray() == np.array([[0, 1, 0], [0, 0, -0.5]]))
+    assert np.all((-a).toarray() == np.array([[0, -2, 0], [0, 0, 1]]))
+
+def test_vstack():
+    rows = [SparseDer((4,), [2], [1.0]), None, np.array([0.0, 3.0, 0.0, 0.0])]
+    d = SparseDer.vstack(rows, 4)
+    assert d.shape == (3, 4)
+    assert np.all(d.toarray() == np.array([[0, 0, 1, 0], [0, 0, 0, 0], [0, 3, 0, 0]]))
+
+
+# Test sparse seeds in DreamDiff
+
+def test_input_pos_is_sparse():
+    x = ad(3.0, input_pos=[10000, 7])
+    assert isinstance(x._der, SparseDer)
+    assert x._der.nnz == 1
+    assert x.der.shape == (10000,)
+    assert x.der[7] == 1
+
+def test_sparse_matches_dense():
+    n = 4
+    xs = [ad(v, input_pos=[n, i]) for i, v in enumerate([0.5, 1.5, 2.0, 0.3])]
+    ds = [ad(v, np.eye(n)[i]) for i, v in enumerate([0.5, 1.5, 2.0, 0.3])]
+    for v in [xs, ds]:
+        v.append(fun.sin(v[0]*v[1]) + v[2]**v[3] - 1 / v[0] + fun.exp(v[3]) / v[2] + abs(-v[1])**2)
+    assert isinstance(xs[-1]._der, SparseDer)
+    assert np.allclose(xs[-1].val, ds[-1].val)
+    assert np.allclose(xs[-1].der, ds[-1].der)
+
+def test_sparse_vector_function():
+    n = 1000
+    x = ad(2.0, input_pos=[n, 0])
+    y = ad(3.0, input_pos=[n, n - 1])
+    f = ad([x*y, 5.0, y**2])
+    assert isinstance(f._der, SparseDer)
+    assert f._der.nnz == 3
+    assert f.der.shape == (3, n)
+    assert f.der[0, 0] == 3 and f.der[0, n - 1] == 2 and f.der[2, n - 1] == 6
+    assert np.sum(f.der != 0) == 3
+
+def random_sparse(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    dense = rng.random(shape)*(rng.random(shape) < 0.4)
+    return dense, SparseDer(shape, np.flatnonzero(dense), dense[dense != 0])
+
+@pytest.mark.parametrize('key', [2, -1, slice(1, 4), [4, 1, 1], np.array([True, False, True, False, False, True])])
+def test_sparse_rows(key):
+    dense, d = random_sparse((6, 5))
+    assert np.allclose(d[key].toarray(), dense[key])
+
+def test_sparse_sum_matmul():
+    dense, d = random_sparse((6, 5), seed=1)
+    assert np.allclose(d.sum(axis=0).toarray(), dense.sum(axis=0))
+    A = np.arange(12.0).reshape(2, 6)
+    assert np.allclose(A @ d, A @ dense)
+
+def test_sparse_repeat_row():
+    d = SparseDer((1, 4), [1, 3], [2.0, -1.0])
+    assert np.allclose((np.array([[1.0], [3.0]])*d).toarray(), [[0, 2, 0, -1], [0, 6, 0, -3]])
+
+def test_sparse_vector_variables():
+    n = 10000
+    values = np.linspace(0.1, 1.0, n)
+    x = ad.variables(values, sparse=True)
+    f = (fun.sin(x)*x + x[0]*x).sum() + x.dot(x)
+    assert isinstance(f._der, SparseDer)
+    expected = np.cos(values)*values + np.sin(values) + values[0] + 2*values
+    expected[0] += values.sum()
+    assert np.allclose(f.der, expected)
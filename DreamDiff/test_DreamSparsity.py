@@ -0,0 +1,72 @@
+# Test suite for Jacobian sparsity detection and compression using pytest
+
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff as ad
+from DreamDiff.DreamDiff import Function as fun
+from DreamDiff.DreamSparse import SparseDer
+from DreamDiff.DreamSparsity import SparsityTracer, SparseJacobian, color_columns
+
+
+def banded(x):
+    n = len(x)
+    return ad([(x[i-1] if i > 0 else 0) - 2*x[i] + (x[i+1] if i < n - 1 else 0) + fun.sin(x[i])**2
+               for i in range(n)])
+
+def dense_jacobian(f, x):
+    n = len(x)
+    return f([ad(x[j], np.eye(n)[j]) for j in range(n)]).der
+
+
+# Test the tracer
+
+def test_tracer_dependencies():
+    x = SparsityTracer(1.0, frozenset([0]), 3)
+    y = SparsityTracer(2.0, frozenset([2]), 3)
+    f = fun.exp(x*y) + 3
+    assert f.deps == {0, 2}
+    assert np.all(f.der.toarray() == np.array([1, 0, 1]))
+    assert f.val == [3 + np.exp(2)]
+    assert (x - 1).deps == {0}
+
+def test_pattern():
+    jac = SparseJacobian(lambda x: ad([x[0]**2, x[0]*x[1], 4.0, x[2] - x[1]]), 3)
+    pattern = jac.pattern([1.0, 2.0, 3.0])
+    assert np.all(pattern.toarray() == np.array([[1, 0, 0], [1, 1, 0], [0, 0, 0], [0, 1, 1]]))
+
+
+# Test coloring
+
+def test_color_columns():
+    pattern = SparseDer((2, 4), [0, 1, 6, 7], np.ones(4))
+    colors = color_columns(pattern)
+    assert colors[0] != colors[1]
+    assert colors[2] != colors[3]
+    assert colors.max() == 1
+
+
+# Test compressed Jacobians
+
+def test_banded_jacobian():
+    n = 100
+    x = np.linspace(0, 1, n)
+    jac = SparseJacobian(banded, n)
+    result = jac(x)
+    assert jac.n_colors == 3
+    assert isinstance(result._der, SparseDer)
+    assert np.allclose(result.der, dense_jacobian(banded, x))
+
+def test_cached_pattern():
+    n = 30
+    jac = SparseJacobian(banded, n)
+    jac(np.zeros(n))
+    pattern = jac.pattern(None)
+    x = np.random.rand(n)
+    assert np.allclose(jac(x).der, dense_jacobian(banded, x))
+    assert jac.pattern(None) is pattern
+
+def test_scalar_function():
+    f = lambda x: x[0]*x[1] + fun.exp(x[2])
+    jac = SparseJacobian(f, 4)
+    result = jac([1.0, 2.0, 3.0, 4.0])
+    assert np.allclose(result.der, np.array([2, 1, np.exp(3), 0]))
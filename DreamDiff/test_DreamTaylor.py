@@ -0,0 +1,87 @@
+# Test suite for Taylor-mode higher-order derivatives using pytest
+
+import math
+import pytest
+import numpy as np
+
+from DreamDiff.DreamDiff import DreamDiff as ad, Function
+from DreamDiff.DreamTaylor import Taylor, derivatives, hessian, hvp
+
+
+a = 0.3
+cases = {
+    'sin': [math.sin(a), math.cos(a), -math.sin(a), -math.cos(a)],
+    'cos': [math.cos(a), -math.sin(a), -math.cos(a), math.sin(a)],
+    'tan': [math.tan(a), 1 / math.cos(a)**2, 2*math.tan(a) / math.cos(a)**2, (4*math.sin(a)**2 + 2) / math.cos(a)**4],
+    'arcsin': [math.asin(a), (1 - a*a)**-0.5, a*(1 - a*a)**-1.5, (2*a*a + 1)*(1 - a*a)**-2.5],
+    'arccos': [math.acos(a), -(1 - a*a)**-0.5, -a*(1 - a*a)**-1.5, -(2*a*a + 1)*(1 - a*a)**-2.5],
+    'arctan': [math.atan(a), 1 / (1 + a*a), -2*a / (1 + a*a)**2, (6*a*a - 2) / (1 + a*a)**3],
+    'sinh': [math.sinh(a), math.cosh(a), math.sinh(a), math.cosh(a)],
+    'cosh': [math.cosh(a), math.sinh(a), math.cosh(a), math.sinh(a)],
+    'sqrt': [a**0.5, 0.5*a**-0.5, -0.25*a**-1.5, 0.375*a**-2.5],
+    'exp': [math.exp(a)]*4,
+    'log': [math.log(a), 1 / a, -1 / a**2, 2 / a**3],
+    'log2': [math.log2(a), 1 / (a*math.log(2)), -1 / (a**2*math.log(2)), 2 / (a**3*math.log(2))],
+    'log10': [math.log10(a), 1 / (a*math.log(10)), -1 / (a**2*math.log(10)), 2 / (a**3*math.log(10))],
+}
+
+@pytest.mark.parametrize('name', sorted(cases))
+def test_elementary_derivatives(name):
+    assert np.allclose(derivatives(getattr(Function, name), a, 3), cases[name])
+
+@pytest.mark.parametrize('name', ['tanh', 'logistic'])
+def test_first_derivative_matches_dreamdiff(name):
+    f = getattr(Function, name)
+    d = derivatives(f, a, 4)
+    assert np.isclose(d[0], f(ad(a)).val[0])
+    assert np.isclose(d[1], f(ad(a)).der[0])
+    # The second derivative is the derivative of the first, by central differences
+    h = 1e-5
+    assert np.isclose(d[2], (derivatives(f, a + h, 1)[1] - derivatives(f, a - h, 1)[1]) / (2*h), atol=1e-6)
+
+def test_operators():
+    f = lambda x: x**2.5 + 2**x + x**x + abs(-x) + 1 / x - 3*x / (x + 1)
+    g = lambda x: x**2.5 + 2**x + x**x + x + 1 / x - 3*x / (x + 1)
+    b = 1.5
+    d = derivatives(f, b, 2)
+    assert np.isclose(d[0], g(b))
+    h = 1e-4
+    assert np.isclose(d[1], (g(b + h) - g(b - h)) / (2*h))
+    assert np.isclose(d[2], (g(b + h) - 2*g(b) + g(b - h)) / h**2, rtol=1e-5)
+
+def test_polynomial_exact():
+    assert np.allclose(derivatives(lambda x: x**3, 2.0, 4), [8, 12, 12, 6, 0])
+    assert np.allclose(derivatives(lambda x: x**3, 0.0, 3), [0, 0, 0, 6])
+    assert np.allclose(derivatives(lambda x: x**0 + 4, 1.0, 2), [5, 0, 0])
+    assert np.allclose(derivatives(lambda x: 7.0, 1.0, 2), [7, 0, 0])
+
+def test_product_series():
+    x = Taylor(0.0, order=4)
+    assert np.allclose((Function.exp(x)*Function.sin(x)).derivatives(), [0, 1, 2, 2, 0])
+    with pytest.raises(AssertionError):
+        Taylor(0.0, order=0)
+
+def rosenbrock(x):
+    return (1 - x[0])**2 + 100*(x[1] - x[0]**2)**2 + Function.sin(x[0]*x[2])
+
+def rosenbrock_hessian(x):
+    s = np.sin(x[0]*x[2])
+    return np.array([[2 - 400*(x[1] - x[0]**2) + 800*x[0]**2 - x[2]**2*s, -400*x[0], np.cos(x[0]*x[2]) - x[0]*x[2]*s],
+                     [-400*x[0], 200, 0],
+                     [np.cos(x[0]*x[2]) - x[0]*x[2]*s, 0, -x[0]**2*s]])
+
+def test_hessian():
+    x = [0.5, 1.2, -0.7]
+    assert np.allclose(hessian(rosenbrock, x), rosenbrock_hessian(x))
+    assert np.allclose(hessian(lambda x: x[0]**2*x[1] + x[1]**3, [1.0, 2.0]), [[4, 2], [2, 12]])
+
+def test_hvp():
+    x = [0.5, 1.2, -0.7]
+    v = np.array([1.0, -2.0, 0.5])
+    assert np.allclose(hvp(rosenbrock, x, v), rosenbrock_hessian(x) @ v)
+    with pytest.raises(AssertionError):
+        hvp(rosenbrock, x, [1.0])
+
+def test_comparisons():
+    x = Taylor(2.0)
+    assert x > 1 and x < 3 and x >= 2 and x <= Taylor(2.0)
@@ -0,0 +1,63 @@
+'''
+Microbenchmark of the per-operation overhead of DreamDiff arithmetic.
+
+Times each operation on a scalar input and on a vector input with a
+Jacobian of 'n' variables, and prints the time per operation in
+microseconds for two paths measured in the same run: 'before' builds the
+result with the checked DreamDiff(val, der) constructor, as operations
+did before DreamDiff used __slots__ and the internal constructor _new(),
+and 'now' runs the operator itself.
+
+Usage: python benchmarks/bench_dreamdiff.py [n]
+'''
+import os
+import sys
+import timeit
+import numpy as np
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from DreamDiff.DreamDiff import DreamDiff, Function
+
+
+# Operations, with the same result built through the DreamDiff constructor
+CASES = [
+    ('{a} + {b}', 'DreamDiff({a}.val + {b}.val, {a}.der + {b}.der)'),
+    ('{a}*{b}', 'DreamDiff({a}.val*{b}.val, {a}.val[:, None]*{b}.der + {b}.val[:, None]*{a}.der)'),
+    ('{a} / {b}', 'DreamDiff({a}.val / {b}.val, ({b}.val[:, None]*{a}.der - {a}.val[:, None]*{b}.der) / {b}.val[:, None]**2)'),
+    ('{a} + 1.0', 'DreamDiff({a}.val + 1.0, {a}.der)'),
+    ('{a}**2', 'DreamDiff({a}.val**2, 2*{a}.val[:, None]*{a}.der)'),
+    ('-{a}', 'DreamDiff(-1*{a}.val, -1*{a}.der)'),
+    ('Function.sin({a})', 'DreamDiff(np.sin({a}.val), np.cos({a}.val)[:, None]*{a}.der)'),
+    ('Function.exp({a})', 'DreamDiff(np.exp({a}.val), np.exp({a}.val)[:, None]*{a}.der)'),
+]
+
+
+def bench(stmt, namespace, number=20000):
+    '''
+    Returns the best time per call of 'stmt' in microseconds over five
+    repeats.
+    '''
+    return 1e6*min(timeit.repeat(stmt, globals=namespace, number=number, repeat=5)) / number
+
+
+def main(n=10):
+    x = DreamDiff(2.0)
+    y = DreamDiff(3.0)
+    u = DreamDiff(np.linspace(1.0, 2.0, n), np.eye(n))
+    v = DreamDiff(np.linspace(2.0, 3.0, n), np.eye(n))
+    namespace = {'x': x, 'y': y, 'u': u, 'v': v, 'np': np, 'DreamDiff': DreamDiff, 'Function': Function}
+    for title, a, b in (('Scalar input', 'x', 'y'), ('Vector input, n = {}'.format(n), 'u', 'v')):
+        print('{:<20}{:>10}{:>10}'.format(title, 'before', 'now'))
+        for now, before in CASES:
+            if a == 'x':
+                # Scalar derivatives are 1-D, so the partials need no new axis
+                before = before.replace('[:, None]', '')
+            stmt = now.format(a=a, b=b)
+            print('{:<20}{:>10.2f}{:>10.2f}'.format(stmt, bench(before.format(a=a, b=b), namespace),
+                                                    bench(stmt, namespace)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)